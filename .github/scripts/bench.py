@@ -0,0 +1,96 @@
+"""Benchmarks the generator on synthetic corpora.
+
+    python .github/scripts/bench.py [--sizes 500 2000 8000] [--stream]
+
+Each size gets a fresh site in a temporary directory with that many articles.
+The generator runs there in a child process, once cold and once more with
+nothing changed, and the wall time and peak RSS of each run are reported.
+Run with and without --stream to compare the memory use of the two build modes.
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORDS = ('äpple päron plommon honung bikupa jordgubbe hallon blåbär odling skörd gård butik café '
+         'säsong kompost jord sol regn vinter vår sommar höst träd blomma pollinering must sylt').split()
+CATEGORIES = ('Odling', 'Café', 'Om oss', 'Recept')
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="sv">
+<head><meta charset="UTF-8"><title>{{ title }}</title><link rel="stylesheet" href="/assets/css/style.css"></head>
+<body>
+<nav>{% for link in nav_links %}<a href="/{{ link.url }}">{{ link.text }}</a>{% endfor %}</nav>
+<main>{{ content }}</main>
+{% if related_articles %}<ul>{% for article in related_articles %}<li><a href="{{ article.url }}">{{ article.title }}</a></li>{% endfor %}</ul>{% endif %}
+<footer>&copy; {{ now().year }}</footer>
+</body>
+</html>
+"""
+
+
+def write_corpus(site_dir, size, seed=1):
+    """Creates a minimal site with `size` generated articles in docs/."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(site_dir, 'docs'))
+    os.makedirs(os.path.join(site_dir, 'assets', 'css'))
+    with open(os.path.join(site_dir, 'template.html'), 'w', encoding='utf-8') as f:
+        f.write(TEMPLATE)
+    with open(os.path.join(site_dir, '_config.yml'), 'w', encoding='utf-8') as f:
+        f.write('title: "Bench"\nurl: "https://bench.example"\n')
+    with open(os.path.join(site_dir, 'assets', 'css', 'style.css'), 'w', encoding='utf-8') as f:
+        f.write('body { font-family: sans-serif; }\n')
+    for page in ('index.html', 'about.html', 'products.html', 'cafe.html', 'contact.html'):
+        with open(os.path.join(site_dir, page), 'w', encoding='utf-8') as f:
+            f.write(f"<!DOCTYPE html>\n<html><head><title>{page}</title></head><body><h1>{page}</h1></body></html>\n")
+    for number in range(size):
+        paragraphs = '\n\n'.join(' '.join(rng.choices(WORDS, k=80)).capitalize() + '.' for _ in range(6))
+        with open(os.path.join(site_dir, 'docs', f"article-{number:06d}.md"), 'w', encoding='utf-8') as f:
+            f.write(f"---\ntitle: Artikel {number}\ndate: 2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}\n"
+                    f"category: {rng.choice(CATEGORIES)}\ntags: {', '.join(rng.sample(WORDS, 2))}\n---\n\n"
+                    f"# Artikel {number}\n\n{paragraphs}\n")
+
+
+def run_build(site_dir, stream):
+    """Runs generate_pages.py in site_dir and returns (seconds, peak RSS in MiB)."""
+    command = [sys.executable, os.path.join(site_dir, '.github', 'scripts', 'generate_pages.py')]
+    if stream:
+        command.append('--stream')
+    env = dict(os.environ, SOURCE_DATE_EPOCH='1700000000')
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=site_dir, env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"Build failed with exit code {process.returncode} in {site_dir}")
+    return elapsed, usage.ru_maxrss / 1024  # ru_maxrss is in KiB on Linux
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 8000])
+    parser.add_argument('--stream', action='store_true', help='benchmark the streaming build mode')
+    args = parser.parse_args(argv)
+
+    print(f"{'articles':>8}  {'cold s':>7}  {'cold MiB':>8}  {'warm s':>7}  {'warm MiB':>8}")
+    for size in args.sizes:
+        site_dir = tempfile.mkdtemp(prefix='bench-site-')
+        try:
+            write_corpus(site_dir, size)
+            shutil.copytree(SCRIPTS_DIR, os.path.join(site_dir, '.github', 'scripts'),
+                            ignore=shutil.ignore_patterns('__pycache__'))
+            cold = run_build(site_dir, args.stream)
+            warm = run_build(site_dir, args.stream)
+        finally:
+            shutil.rmtree(site_dir)
+        print(f"{size:>8}  {cold[0]:>7.2f}  {cold[1]:>8.1f}  {warm[0]:>7.2f}  {warm[1]:>8.1f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Measures the weight of every page and checks it against per-route budgets.
+
+A page's weight is the HTML itself plus every local resource it loads:
+stylesheets, scripts, images and the fonts its stylesheets refer to. Each URL
+is counted once per page, and external resources count as requests of unknown
+size. Prefetched pages are not part of the weight, they load after the page.
+
+Budgets are set in _config.yml, and the first route that matches a page applies:
+
+    budgets:
+      fail: true  # Fail the build instead of only warning
+      routes:
+        - match: index.html  # A glob on the output path...
+          html: 20000
+          requests: 12
+        - match: articles  # ...or one of ROUTE_GROUPS
+          total: 150000
+
+Sizes are bytes as served without compression. The measurements are written
+to build-reports/budgets.json on every build, whether budgets are set or not.
+"""
+import fnmatch
+import os
+from html.parser import HTMLParser
+
+from buildcache import load_state, save_state, scan_pages, write_report
+from hints import stylesheet_fonts
+from linkcheck import emitted_paths, resolve
+
+METRICS = ('html', 'css', 'js', 'images', 'fonts', 'total', 'requests')
+ROUTE_GROUPS = ('articles', 'pages', 'listings')  # Articles from docs/, root Jekyll pages, listing pages
+REPORT_FILE = 'budgets.json'
+
+
+class _ResourceParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.resources = []  # [kind, url]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        rel = (attrs.get('rel') or '').split()
+        if tag == 'link' and 'stylesheet' in rel and attrs.get('href'):
+            self.resources.append(['css', attrs['href']])
+        elif tag == 'link' and 'icon' in rel and attrs.get('href'):
+            self.resources.append(['images', attrs['href']])
+        elif tag == 'script' and attrs.get('src'):
+            self.resources.append(['js', attrs['src']])
+        elif tag in ('img', 'source') and (attrs.get('src') or attrs.get('srcset')):
+            # Only the first srcset candidate is counted, the browser loads one of them
+            url = attrs.get('src') or attrs['srcset'].split(',')[0].split()[0]
+            self.resources.append(['images', url])
+
+
+def page_resources(page_html):
+    """Returns the resources one HTML page loads. Runs in a worker process."""
+    parser = _ResourceParser()
+    parser.feed(page_html)
+    parser.close()
+    return {'resources': parser.resources}
+
+
+def measure_pages(output_dir):
+    """Returns {path: {metric: value}} for every HTML page in output_dir.
+
+    Resource lists are cached per page, see scan_pages().
+    """
+    paths = emitted_paths(output_dir)
+    entries, _ = scan_pages(output_dir, sorted(p for p in paths if p.endswith('.html')), load_state('budgets', {}),
+                            page_resources)
+    sizes = {}
+    fonts = {}
+    weights = {}
+    for path, entry in entries.items():
+        resources = list(entry['resources'])
+        for kind, url in entry['resources']:
+            resolved = resolve(path, url, paths) if kind == 'css' else None
+            if resolved:
+                if resolved[0] not in fonts:
+                    fonts[resolved[0]] = [font_url for font_url, _ in stylesheet_fonts(output_dir, resolved[0])]
+                resources += [['fonts', font_url] for font_url in fonts[resolved[0]]]
+
+        weight = dict.fromkeys(METRICS, 0)
+        weight['html'] = entry['size']
+        weight['requests'] = 1
+        seen = set()
+        for kind, url in resources:
+            if url.startswith('data:'):
+                continue
+            resolved = resolve(path, url, paths)
+            target = resolved[0] if resolved else url
+            if target in seen:
+                continue
+            seen.add(target)
+            weight['requests'] += 1
+            if resolved and target in paths:
+                if target not in sizes:
+                    sizes[target] = os.path.getsize(os.path.join(output_dir, target.lstrip('/')))
+                weight[kind] += sizes[target]
+        weight['total'] = sum(weight[metric] for metric in ('html', 'css', 'js', 'images', 'fonts'))
+        weights[path] = weight
+    save_state('budgets', entries)
+    return weights
+
+
+def route_of(path, budgets, groups):
+    """Returns the first budget route matching a page, or None."""
+    for route in budgets.get('routes') or []:
+        match = str(route.get('match', ''))
+        if match in ROUTE_GROUPS:
+            if groups.get(path) == match:
+                return route
+        elif fnmatch.fnmatch(path.lstrip('/'), match):
+            return route
+    return None
+
+
+def check_budgets(output_dir, budgets, groups):
+    """Measures every page, writes the report and returns one string per exceeded budget.
+
+    budgets is the `budgets` mapping from _config.yml (or None), and groups maps
+    page paths to their entry in ROUTE_GROUPS.
+    """
+    weights = measure_pages(output_dir)
+    budgets = budgets or {}
+    problems = []
+    report = {}
+    for path, weight in weights.items():
+        route = route_of(path, budgets, groups)
+        limits = {metric: route[metric] for metric in METRICS if route and isinstance(route.get(metric), int)}
+        exceeded = [metric for metric, limit in limits.items() if weight[metric] > limit]
+        problems += [f"{path.lstrip('/')}: {metric} is {weight[metric]}, over the budget of {limits[metric]}"
+                     f" for {route['match']}" for metric in exceeded]
+        report[path.lstrip('/')] = {'group': groups.get(path), 'route': route['match'] if route else None,
+                                    'weight': weight, 'budget': limits, 'exceeded': exceeded}
+    write_report(REPORT_FILE, report)
+    print(f"Budgets: measured {len(weights)} pages, {len(problems)} over budget")
+    return problems
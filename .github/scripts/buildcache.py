@@ -0,0 +1,102 @@
+"""Helpers for the state the generator keeps between builds."""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+CACHE_DIR = '.build-cache'
+REPORT_DIR = 'build-reports'  # Build reports for CI artifacts, kept out of the deployed output
+
+
+def content_hash(data):
+    """Returns a stable hex digest for a string or bytes value."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Returns content_hash() of a file's bytes, reading it a chunk at a time."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_state(name, default=None, cache_dir=None):
+    """Loads a JSON state file from cache_dir (CACHE_DIR by default), or returns default."""
+    path = os.path.join(cache_dir or CACHE_DIR, f"{name}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_state(name, data, cache_dir=None):
+    """Writes a JSON state file atomically so an aborted build never leaves half a file."""
+    os.makedirs(cache_dir or CACHE_DIR, exist_ok=True)
+    path = os.path.join(cache_dir or CACHE_DIR, f"{name}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+def _scan_page(process, filepath, cached_hash):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    page_hash = content_hash(content)
+    return page_hash, None if page_hash == cached_hash else process(content)
+
+
+def scan_pages(output_dir, paths, cached, process, workers=None):
+    """Runs process(content) over the pages at the given site paths (e.g. /about.html) that changed.
+
+    cached is the {path: entry} this returned on the last build. A page whose
+    mtime and size match its entry is not read, and one whose content hash
+    matches is not processed again. The rest are processed in a process pool,
+    so process must be a module-level function; it returns a dict that is
+    stored in the page's entry next to 'hash', 'mtime' and 'size'.
+    Returns ({path: entry}, [paths that were processed]).
+    """
+    entries = {}
+    to_read = []
+    for path in paths:
+        stat = os.stat(os.path.join(output_dir, path.lstrip('/')))
+        entry = cached.get(path)
+        if entry and entry.get('mtime') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            entries[path] = entry
+        else:
+            to_read.append(path)
+
+    processed = []
+    if to_read:
+        filepaths = [os.path.join(output_dir, path.lstrip('/')) for path in to_read]
+        cached_hashes = [cached.get(path, {}).get('hash') for path in to_read]
+        if len(filepaths) == 1:
+            results = [_scan_page(process, filepaths[0], cached_hashes[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_scan_page, repeat(process), filepaths, cached_hashes, chunksize=16))
+        for path, filepath, (page_hash, result) in zip(to_read, filepaths, results):
+            stat = os.stat(filepath)
+            if result is None:
+                entries[path] = dict(cached[path], mtime=stat.st_mtime_ns, size=stat.st_size)
+            else:
+                entries[path] = dict(result, hash=page_hash, mtime=stat.st_mtime_ns, size=stat.st_size)
+                processed.append(path)
+    return entries, processed
+
+
+def write_report(name, data):
+    """Writes a JSON build report to REPORT_DIR and returns its path."""
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + '\n')
+    os.replace(tmp_path, path)
+    return path
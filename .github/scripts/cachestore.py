@@ -0,0 +1,140 @@
+"""A content-addressed store for build results, portable between machines.
+
+    python cachestore.py export build-cache.tar.gz
+    python cachestore.py import build-cache.tar.gz
+    python cachestore.py prune [--max-bytes N]
+
+Objects are stored under a key derived from their inputs and GENERATOR_VERSION
+(a hash of the generator's own source), so an entry can be reused by any build
+with the same inputs, whatever its mtimes, and no code change can serve stale
+output. Objects are written atomically, so parallel workers and shards can read
+and fill the store at the same time. Every hit refreshes the object's mtime, and
+prune() evicts the least recently used objects above STORE_LIMIT.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tarfile
+
+from buildcache import CACHE_DIR, content_hash
+
+STORE_DIR = os.path.join(CACHE_DIR, 'store')  # Shared by all shards, unlike the per-shard state files
+STORE_LIMIT = 256 * 1024 * 1024  # Bytes kept after prune()
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _generator_version():
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(SCRIPTS_DIR)):
+        if filename.endswith('.py'):
+            with open(os.path.join(SCRIPTS_DIR, filename), 'rb') as f:
+                digest.update(filename.encode('utf-8') + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+
+GENERATOR_VERSION = _generator_version()
+
+
+def store_key(kind, *inputs):
+    """Returns the key for an object of the given kind (e.g. 'html') built from the given inputs."""
+    return f"{kind}-{content_hash(repr((GENERATOR_VERSION, kind) + inputs))}"
+
+
+def _object_path(key, store_dir):
+    return os.path.join(store_dir, key[-2:], key)
+
+
+def get(key, store_dir=STORE_DIR):
+    """Returns the stored text for key, or None."""
+    path = _object_path(key, store_dir)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        os.utime(path)  # Marks the object as recently used
+    except OSError:
+        return None
+    return text
+
+
+def put(key, text, store_dir=STORE_DIR):
+    path = _object_path(key, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # Unique per process, several workers may store the same key
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def prune(max_bytes=STORE_LIMIT, store_dir=STORE_DIR):
+    """Deletes the least recently used objects until the store holds at most max_bytes.
+
+    Returns (objects removed, bytes kept).
+    """
+    objects = []
+    for dirpath, dirnames, filenames in os.walk(store_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            objects.append((stat.st_mtime_ns, stat.st_size, path))
+    objects.sort(reverse=True)
+    kept, removed = 0, 0
+    for mtime, size, path in objects:
+        if kept + size <= max_bytes:
+            kept += size
+        else:
+            os.remove(path)
+            removed += 1
+    return removed, kept
+
+
+def export_store(archive_path, store_dir=STORE_DIR):
+    """Packs the whole store into one .tar.gz, e.g. for a CI cache step."""
+    with tarfile.open(archive_path, 'w:gz') as tar:
+        if os.path.isdir(store_dir):
+            tar.add(store_dir, arcname='store')
+
+
+def import_store(archive_path, store_dir=STORE_DIR):
+    """Merges an exported store into the local one. Objects already present are kept."""
+    count = 0
+    with tarfile.open(archive_path, 'r:gz') as tar:
+        for member in tar:
+            parts = member.name.split('/')
+            if not member.isfile() or len(parts) != 3 or parts[0] != 'store' or '..' in parts:
+                continue
+            path = _object_path(parts[2], store_dir)
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(tar.extractfile(member).read())
+            os.replace(f"{path}.tmp", path)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('export', help='pack the store into an archive').add_argument('archive')
+    commands.add_parser('import', help='merge an archive into the store').add_argument('archive')
+    prune_parser = commands.add_parser('prune', help='evict least recently used objects')
+    prune_parser.add_argument('--max-bytes', type=int, default=STORE_LIMIT)
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        export_store(args.archive)
+        print(f"Exported {STORE_DIR} to {args.archive}")
+    elif args.command == 'import':
+        if not os.path.exists(args.archive):
+            print(f"Error: {args.archive} does not exist")
+            return 1
+        print(f"Imported {import_store(args.archive)} objects into {STORE_DIR}")
+    else:
+        removed, kept = prune(args.max_bytes)
+        print(f"Removed {removed} objects, {kept} bytes kept")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
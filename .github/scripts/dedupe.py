@@ -0,0 +1,140 @@
+"""Finds duplicate and near-duplicate pages in the generated site.
+
+Only the text inside <main> (or <body> on pages without one) is compared, so
+the shared header, navigation and footer do not make every page look alike.
+Exact duplicates are pages whose normalised text hashes the same. Near
+duplicates are found with MinHash signatures over word shingles: the
+signatures are split into LSH bands and only pages that share a band are
+compared, which keeps the work close to linear in the number of pages. A pair
+is reported when the share of equal MinHash values, an estimate of the Jaccard
+similarity of the shingle sets, is at least NEAR_THRESHOLD.
+
+Signatures are cached per page by mtime/size, then by content hash.
+"""
+import hashlib
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+
+import numpy as np
+
+from buildcache import content_hash, load_state, save_state, scan_pages, write_report
+
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_HASHES = 128  # MinHash values per signature
+BANDS = 32  # LSH bands of NUM_HASHES // BANDS rows; pages sharing a band are compared
+NEAR_THRESHOLD = 0.6  # Estimated Jaccard similarity reported as a near duplicate
+REPORT_FILE = 'duplicates.json'
+WORD_RE = re.compile(r'\w+')
+
+# Multiply-shift hashing: ((a * x + b) mod 2**64) >> 32 for odd a is a universal
+# family of 32-bit hashes, and NumPy's uint64 arithmetic wraps around mod 2**64.
+_rng = np.random.default_rng(0)  # Fixed, so cached signatures stay comparable
+_A = _rng.integers(1, 2 ** 63, NUM_HASHES, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_HASHES, dtype=np.uint64)
+
+
+class _TextParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.main = []
+        self.body = []
+        self.main_depth = 0
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'main':
+            self.main_depth += 1
+        elif tag in ('script', 'style', 'nav', 'template'):
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'main' and self.main_depth:
+            self.main_depth -= 1
+        elif tag in ('script', 'style', 'nav', 'template') and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            (self.main if self.main_depth else self.body).append(data)
+
+
+def page_text(content):
+    """Returns the lowercased words of a page's main content, joined by spaces."""
+    parser = _TextParser()
+    parser.feed(content)
+    parser.close()
+    return ' '.join(WORD_RE.findall(' '.join(parser.main or parser.body).lower()))
+
+
+def signature(text):
+    """Returns the MinHash signature of the text's word shingles as a list of ints."""
+    words = text.split()
+    count = max(len(words) - SHINGLE_SIZE + 1, 1)
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(count)}
+    values = np.array([int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+                       for s in shingles], dtype=np.uint64)
+    hashes = (values[:, None] * _A[None, :] + _B[None, :]) >> np.uint64(32)
+    return hashes.min(axis=0).tolist()
+
+
+def page_fingerprint(content):
+    """Returns the hash and MinHash signature of a page's text. Runs in a worker process."""
+    text = page_text(content)
+    return {'text_hash': content_hash(text), 'signature': signature(text) if text else None}
+
+
+def find_duplicates(output_dir, paths):
+    """Compares the pages at the given site paths (e.g. /about.html).
+
+    Returns (exact, near): groups of paths with identical text, and
+    [path, path, similarity] for near-duplicate pairs, most similar first.
+    """
+    cached = load_state('dedupe', {})
+    if cached.get('params') != [SHINGLE_SIZE, NUM_HASHES]:
+        cached = {}
+    entries, computed = scan_pages(output_dir, paths, cached.get('pages', {}), page_fingerprint)
+    save_state('dedupe', {'params': [SHINGLE_SIZE, NUM_HASHES], 'pages': entries})
+    print(f"Duplicates: hashed {len(computed)} of {len(entries)} pages")
+
+    by_text = defaultdict(list)
+    for path in sorted(entries):
+        if entries[path]['signature'] is not None:
+            by_text[entries[path]['text_hash']].append(path)
+    exact = [group for group in by_text.values() if len(group) > 1]
+
+    # One representative per group of exact duplicates takes part in the LSH pass
+    names = [group[0] for group in by_text.values()]
+    if len(names) < 2:
+        return exact, []
+    signatures = np.array([entries[name]['signature'] for name in names], dtype=np.uint64)
+    rows = NUM_HASHES // BANDS
+    candidates = set()
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        for i, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets[key].append(i)
+        for bucket in buckets.values():
+            candidates.update((bucket[i], j) for i in range(len(bucket)) for j in bucket[i + 1:])
+
+    near = []
+    for i, j in candidates:
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity >= NEAR_THRESHOLD:
+            near.append([names[i], names[j], round(similarity, 3)])
+    near.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return exact, near
+
+
+def check_duplicates(output_dir, paths):
+    """Writes the duplicates report and returns one warning string per finding."""
+    exact, near = find_duplicates(output_dir, paths)
+    write_report(REPORT_FILE, {
+        'exact': exact,
+        'near': [{'pages': [a, b], 'similarity': similarity} for a, b, similarity in near],
+        'threshold': NEAR_THRESHOLD,
+    })
+    problems = [f"{group[0].lstrip('/')}: same content as {', '.join(path.lstrip('/') for path in group[1:])}"
+                for group in exact]
+    problems += [f"{a.lstrip('/')}: {similarity:.0%} similar to {b.lstrip('/')}" for a, b, similarity in near]
+    return problems
@@ -0,0 +1,178 @@
+"""Build manifests and delta deploy bundles.
+
+    python deploy.py bundle --previous old-manifest.json --output delta.tar.gz
+    python deploy.py apply delta.tar.gz /srv/site
+
+A bundle contains only the files that differ from the previous deploy, the
+paths to delete and a checksum for every file it carries. `apply` is a local,
+file-based stand-in for a deploy target: it keeps the manifest of what it
+serves in TARGET_MANIFEST and refuses bundles built against another state.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tarfile
+
+from buildcache import content_hash, file_hash, load_state, save_state
+
+OUTPUT_DIR = '_site'
+TARGET_MANIFEST = '.deploy-manifest.json'
+
+
+def build_manifest(output_dir=OUTPUT_DIR, known=None, cache_dir=None):
+    """Returns {path: {'sha256', 'size'}} for every file in output_dir.
+
+    Hashes are cached by mtime and size, so only files written by this build
+    are read again. `known` holds hashes that were computed elsewhere, such as
+    the partial manifests of build shards, and is trusted when the size matches.
+    The hash cache is kept in cache_dir (see buildcache.load_state).
+    """
+    cached = load_state('manifest', {}, cache_dir)
+    manifest = {}
+    for dirpath, dirnames, filenames in os.walk(output_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            filepath = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(filepath, output_dir).replace(os.sep, '/')
+            if rel_path == TARGET_MANIFEST:
+                continue
+            stat = os.stat(filepath)
+            entry = cached.get(rel_path)
+            if not entry or entry['mtime'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                known_entry = (known or {}).get(rel_path)
+                if known_entry and known_entry['size'] == stat.st_size:
+                    sha256 = known_entry['sha256']
+                else:
+                    sha256 = file_hash(filepath)
+                entry = {'sha256': sha256, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+            manifest[rel_path] = entry
+    save_state('manifest', manifest, cache_dir)
+    return {path: {'sha256': entry['sha256'], 'size': entry['size']} for path, entry in manifest.items()}
+
+
+def manifest_id(manifest):
+    """A short fingerprint of a whole manifest, used to tie a bundle to the state it was built against."""
+    return content_hash(json.dumps(manifest, sort_keys=True))[:16]
+
+
+def load_manifest(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def diff_manifests(previous, current):
+    """Returns (changed paths, deleted paths) between two manifests."""
+    changed = sorted(path for path, entry in current.items()
+                     if previous.get(path, {}).get('sha256') != entry['sha256'])
+    deleted = sorted(set(previous) - set(current))
+    return changed, deleted
+
+
+def _add_bytes(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = 0  # Keeps bundles of identical changes identical
+    tar.addfile(info, io.BytesIO(data))
+
+
+def write_bundle(bundle_path, output_dir, previous, current):
+    """Writes a gzipped tar with delta.json and the changed files under files/."""
+    changed, deleted = diff_manifests(previous, current)
+    delta = {
+        'base': manifest_id(previous),
+        'target': manifest_id(current),
+        'changed': {path: current[path]['sha256'] for path in changed},
+        'deleted': deleted,
+        'manifest': current,
+    }
+    with tarfile.open(bundle_path, 'w:gz') as tar:
+        _add_bytes(tar, 'delta.json', json.dumps(delta, indent=1, sort_keys=True).encode('utf-8'))
+        for path in changed:
+            info = tar.gettarinfo(os.path.join(output_dir, path), arcname=f"files/{path}")
+            info.mtime = 0
+            info.uid = info.gid = 0
+            info.uname = info.gname = ''
+            with open(os.path.join(output_dir, path), 'rb') as f:
+                tar.addfile(info, f)
+    return changed, deleted
+
+
+def _target_path(target_dir, path):
+    """Returns where a bundle path goes in target_dir. Raises ValueError for a path that would leave it."""
+    normalized = os.path.normpath(path)
+    if (not path or os.path.isabs(path) or normalized == os.curdir or normalized.split(os.sep)[0] == os.pardir
+            or normalized == TARGET_MANIFEST):
+        raise ValueError(f"Refusing unsafe path {path!r} in bundle")
+    return os.path.join(target_dir, normalized)
+
+
+def apply_bundle(bundle_path, target_dir):
+    """Applies a delta bundle to a local target directory.
+
+    Every file is checked against its checksum before it replaces the old
+    version, and the target manifest is only updated once all changes are in.
+    Paths that are absolute or climb out of target_dir are rejected before
+    anything is written.
+    """
+    manifest_path = os.path.join(target_dir, TARGET_MANIFEST)
+    with tarfile.open(bundle_path, 'r:gz') as tar:
+        delta = json.load(tar.extractfile('delta.json'))
+        current = load_manifest(manifest_path)
+        if manifest_id(current) == delta['target']:
+            return 0, 0  # Already applied
+        if manifest_id(current) != delta['base']:
+            raise ValueError(f"{target_dir} is at {manifest_id(current)}, bundle expects {delta['base']}")
+        destinations = {path: _target_path(target_dir, path) for path in [*delta['changed'], *delta['deleted']]}
+
+        for path, expected in delta['changed'].items():
+            data = tar.extractfile(f"files/{path}").read()
+            if content_hash(data) != expected:
+                raise ValueError(f"Checksum mismatch for {path} in {bundle_path}")
+            destination = destinations[path]
+            os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+            with open(f"{destination}.tmp", 'wb') as f:
+                f.write(data)
+            os.replace(f"{destination}.tmp", destination)
+
+    for path in delta['deleted']:
+        destination = destinations[path]
+        if os.path.exists(destination):
+            os.remove(destination)
+
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(delta['manifest'], f, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return len(delta['changed']), len(delta['deleted'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    bundle = commands.add_parser('bundle', help='create a delta bundle from the current build')
+    bundle.add_argument('--previous', help='manifest of the previous deploy (missing means full deploy)')
+    bundle.add_argument('--output', default='delta.tar.gz')
+    bundle.add_argument('--site', default=OUTPUT_DIR)
+    apply = commands.add_parser('apply', help='apply a delta bundle to a local target directory')
+    apply.add_argument('bundle')
+    apply.add_argument('target')
+    args = parser.parse_args(argv)
+
+    if args.command == 'bundle':
+        changed, deleted = write_bundle(args.output, args.site, load_manifest(args.previous), build_manifest(args.site))
+        print(f"Wrote {args.output}: {len(changed)} changed, {len(deleted)} deleted")
+    else:
+        os.makedirs(args.target, exist_ok=True)
+        try:
+            changed, deleted = apply_bundle(args.bundle, args.target)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        print(f"Applied {args.bundle} to {args.target}: {changed} written, {deleted} deleted")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
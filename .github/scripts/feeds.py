@@ -0,0 +1,138 @@
+"""Writes sitemap.xml, robots.txt and the Atom feed with a streaming XML writer."""
+import heapq
+import os
+from xml.sax.saxutils import XMLGenerator
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+SITEMAP_URL_LIMIT = 50000  # Maximum number of URLs a single sitemap file may contain
+
+
+def _text_element(xml, name, text, attrs=None):
+    xml.startElement(name, attrs or {})
+    xml.characters(text)
+    xml.endElement(name)
+
+
+def _timestamp(date):
+    """Turns a front-matter date such as 2025-05-21 into an RFC 3339 timestamp."""
+    return date if 'T' in date else f"{date}T00:00:00Z"
+
+
+class _SitemapChunk:
+    """One <urlset> file, written element by element as URLs arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+        self.xml = XMLGenerator(self.file, encoding='utf-8', short_empty_elements=True)
+        self.xml.startDocument()
+        self.xml.startElement('urlset', {'xmlns': SITEMAP_NS})
+        self.count = 0
+
+    def add(self, loc, lastmod):
+        self.xml.startElement('url', {})
+        _text_element(self.xml, 'loc', loc)
+        if lastmod:
+            _text_element(self.xml, 'lastmod', lastmod)
+        self.xml.endElement('url')
+        self.count += 1
+
+    def close(self):
+        self.xml.endElement('urlset')
+        self.xml.endDocument()
+        self.file.close()
+
+
+def write_sitemap(entries, output_dir, site_url):
+    """Streams (path, lastmod) entries into sitemap.xml.
+
+    When there are more than SITEMAP_URL_LIMIT entries they are spread over
+    sitemap-1.xml, sitemap-2.xml, ... and sitemap.xml becomes a sitemap index.
+    Returns the list of sitemap files written.
+    """
+    chunk_paths = []
+    chunk = None
+    for path, lastmod in entries:
+        if chunk is None or chunk.count >= SITEMAP_URL_LIMIT:
+            if chunk is not None:
+                chunk.close()
+            chunk_paths.append(os.path.join(output_dir, f"sitemap-{len(chunk_paths) + 1}.xml"))
+            chunk = _SitemapChunk(chunk_paths[-1])
+        chunk.add(f"{site_url}/{path}", lastmod)
+    if chunk is None:
+        chunk_paths.append(os.path.join(output_dir, 'sitemap-1.xml'))
+        chunk = _SitemapChunk(chunk_paths[-1])
+    chunk.close()
+
+    # Drop leftover chunks from an earlier, larger build
+    stale = len(chunk_paths) + 1
+    while os.path.exists(os.path.join(output_dir, f"sitemap-{stale}.xml")):
+        os.remove(os.path.join(output_dir, f"sitemap-{stale}.xml"))
+        stale += 1
+
+    sitemap_path = os.path.join(output_dir, 'sitemap.xml')
+    if len(chunk_paths) == 1:
+        os.replace(chunk_paths[0], sitemap_path)
+        return [sitemap_path]
+
+    with open(sitemap_path, 'w', encoding='utf-8') as f:
+        xml = XMLGenerator(f, encoding='utf-8', short_empty_elements=True)
+        xml.startDocument()
+        xml.startElement('sitemapindex', {'xmlns': SITEMAP_NS})
+        for chunk_path in chunk_paths:
+            xml.startElement('sitemap', {})
+            _text_element(xml, 'loc', f"{site_url}/{os.path.basename(chunk_path)}")
+            xml.endElement('sitemap')
+        xml.endElement('sitemapindex')
+        xml.endDocument()
+    return [sitemap_path] + chunk_paths
+
+
+def write_robots(output_dir, site_url):
+    path = os.path.join(output_dir, 'robots.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"User-agent: *\nAllow: /\n\nSitemap: {site_url}/sitemap.xml\n")
+    return path
+
+
+def write_feed(pages, output_dir, site_url, site_title, limit):
+    """Writes an Atom feed (feed.xml) with the newest `limit` dated pages.
+
+    The newest entries are picked with a heap, so the article list is never
+    sorted as a whole.
+    """
+    dated = (page for page in pages if page['metadata'].get('date'))
+    newest = heapq.nlargest(limit, dated, key=lambda page: page['metadata']['date'])
+
+    path = os.path.join(output_dir, 'feed.xml')
+    with open(path, 'w', encoding='utf-8') as f:
+        xml = XMLGenerator(f, encoding='utf-8', short_empty_elements=True)
+        xml.startDocument()
+        xml.startElement('feed', {'xmlns': ATOM_NS})
+        _text_element(xml, 'title', site_title)
+        _text_element(xml, 'id', f"{site_url}/")
+        xml.startElement('link', {'href': f"{site_url}/feed.xml", 'rel': 'self'})
+        xml.endElement('link')
+        xml.startElement('link', {'href': f"{site_url}/"})
+        xml.endElement('link')
+        _text_element(xml, 'updated', _timestamp(newest[0]['metadata']['date']) if newest else '1970-01-01T00:00:00Z')
+        for page in newest:
+            metadata = page['metadata']
+            url = f"{site_url}/{page['output_filename']}"
+            xml.startElement('entry', {})
+            _text_element(xml, 'title', metadata.get('title', page['output_filename']))
+            _text_element(xml, 'id', url)
+            xml.startElement('link', {'href': url})
+            xml.endElement('link')
+            _text_element(xml, 'updated', _timestamp(metadata['date']))
+            if metadata.get('author'):
+                xml.startElement('author', {})
+                _text_element(xml, 'name', metadata['author'])
+                xml.endElement('author')
+            if metadata.get('description'):
+                _text_element(xml, 'summary', metadata['description'])
+            xml.endElement('entry')
+        xml.endElement('feed')
+        xml.endDocument()
+    return path
@@ -0,0 +1,92 @@
+"""Overlaps file reads and writes with rendering on a small thread pool.
+
+On network filesystems and slow CI disks each read and write waits on the
+previous one. FileIO keeps up to max_pending reads ahead of the consumer and
+lets writes finish in the background, while rendering continues in the calling
+thread. With workers=0 all I/O is done in place, one call after another, which
+is the fallback for filesystems that do not like concurrent access.
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from outputdir import write_text
+
+IO_WORKERS = 8
+MAX_PENDING = 64  # Reads ahead of the consumer and writes not yet finished, each
+
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class FileIO:
+    def __init__(self, workers=IO_WORKERS, max_pending=MAX_PENDING):
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='file-io') if workers else None
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.writes = set()
+        self.errors = []
+
+    def read_ahead(self, items, path_of):
+        """Yields (item, text of path_of(item)) in order, reading upcoming files in the background."""
+        if self.executor is None:
+            for item in items:
+                yield item, read_text(path_of(item))
+            return
+        window = deque()
+        for item in items:
+            window.append((item, self.executor.submit(read_text, path_of(item))))
+            if len(window) >= self.max_pending:
+                item, future = window.popleft()
+                yield item, future.result()
+        while window:
+            item, future = window.popleft()
+            yield item, future.result()
+
+    def write_text(self, path, content):
+        """Writes a file atomically (see outputdir.write_text), returning before the write is done.
+
+        Blocks while max_pending writes are outstanding. Errors are raised by flush().
+        """
+        if self.executor is None:
+            write_text(path, content)
+            return
+        self.slots.acquire()
+        future = self.executor.submit(write_text, path, content)
+        with self.lock:
+            self.writes.add(future)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future):
+        with self.lock:
+            self.writes.discard(future)
+            if future.exception() is not None:
+                self.errors.append(future.exception())
+        self.slots.release()
+
+    def flush(self):
+        """Waits for every outstanding write and raises the first write error, if any."""
+        while True:
+            with self.lock:
+                if not self.writes:
+                    break
+                future = next(iter(self.writes))
+            future.exception()  # Waits without raising, errors are collected in _write_done
+        if self.errors:
+            raise self.errors[0]
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,542 @@
+import argparse
+import os
+import sys
+import markdown
+from jinja2 import Environment, FileSystemLoader, nodes
+from datetime import datetime, timezone
+
+import cachestore
+from budgets import check_budgets
+from buildcache import CACHE_DIR, content_hash, load_state, save_state, write_report
+from dedupe import check_duplicates
+from deploy import build_manifest
+from fileio import IO_WORKERS, FileIO
+from feeds import write_feed, write_robots, write_sitemap
+from headers import HEADERS_FILE, write_headers
+from hints import apply_hints, copy_page
+from linkcheck import check_links
+from liquid import render_layout, render_string
+from listings import build_listings
+from locales import alternates, nav_current, source_files
+from outputdir import link_static, prune_output, write_text
+from pipeline import pipeline
+from plugins import Plugins, load_plugins
+from related import compute_related, page_terms
+from shortcodes import Shortcodes, find_shortcodes
+from shards import SHARD_DIR, in_shard, merge_shard_outputs, parse_shard, shard_name, write_partial_manifest
+from siteconfig import load_config, split_front_matter
+from sitedata import data_dependencies, load_data
+from sw import SERVICE_WORKER, write_service_worker
+from validate import validate_site
+
+# Define paths
+SOURCE_DIR = 'docs'
+OUTPUT_DIR = '_site' # Only this directory is uploaded to GitHub Pages
+TEMPLATE_FILE = 'template.html'
+STATIC_PATHS = ['assets', 'CNAME'] # Linked into OUTPUT_DIR as they are
+STATIC_PAGES = ['index.html', 'about.html', 'cafe.html', 'contact.html', 'products.html', '404.html', 'offline.html']
+RELATED_COUNT = 3 # Number of related articles listed on each page
+FEED_SIZE = 20 # Newest articles included in feed.xml
+NAV_LINKS = [ # Used when _config.yml has no nav
+    {"text": "Hem", "url": "index.html"},
+    {"text": "Om oss", "url": "about.html"},
+    {"text": "Våra Produkter", "url": "products.html"},
+    {"text": "Café", "url": "cafe.html"},
+    {"text": "Besök Oss", "url": "contact.html"},
+]
+DEFAULT_LOCALE = 'sv'
+RELATED_MARKER = '<!--related-articles-->' # Where the merge of a sharded build puts a page's related articles
+LOCALES = { # Articles in SOURCE_DIR/<locale>/ are built into OUTPUT_DIR/<locale>/, see locales.py
+    'sv': {'template': TEMPLATE_FILE, 'nav_links': NAV_LINKS},
+    'en': {
+        'template': 'template.en.html', # TEMPLATE_FILE is used when the site has no English template
+        'nav_links': [ # Absolute, the pages are one directory down. The hand-written pages are Swedish.
+            {"text": "Home", "url": "/index.html"},
+            {"text": "About us", "url": "/about.html"},
+            {"text": "Our Products", "url": "/products.html"},
+            {"text": "Café", "url": "/cafe.html"},
+            {"text": "Visit Us", "url": "/contact.html"},
+        ],
+    },
+}
+
+class SourcePage(dict):
+    """A page from SOURCE_DIR that reads its Markdown body from disk each time it is asked for.
+
+    Used by the streaming build, so the index of all pages only holds front matter.
+    """
+    def __init__(self, page, plugins):
+        super().__init__(page)
+        self.plugins = plugins
+
+    def __missing__(self, key):
+        if key != 'md_content':
+            raise KeyError(key)
+        with open(os.path.join(SOURCE_DIR, self['filename']), 'r', encoding='utf-8') as f:
+            return split_front_matter(self.plugins.run('on_source_loaded', self['filename'], f.read()))[1]
+
+def output_name(filename):
+    """Example: article-biodling.md -> biodling.html, en/article-biodling.md -> en/biodling.html"""
+    return filename.replace('article-', '').replace('.md', '.html')
+
+def load_sources(stream=False, files=None, plugins=None, shard=None):
+    """Reads every Markdown file in SOURCE_DIR and its locale directories and splits off its front matter.
+
+    With stream=True the Markdown bodies are not kept; see SourcePage. The files
+    are read ahead through `files` (a FileIO) when one is given, and run through
+    the on_source_loaded and on_front_matter hooks of `plugins`. With a shard,
+    only the files of that shard are read.
+    """
+    plugins = plugins or Plugins()
+    pages = []
+    locales = {filename: locale for filename, locale in source_files(SOURCE_DIR, LOCALES, DEFAULT_LOCALE)
+               if not shard or in_shard(os.path.join(SOURCE_DIR, filename), shard)}
+    for filename, content in (files or FileIO(0)).read_ahead(locales, lambda name: os.path.join(SOURCE_DIR, name)):
+        # Separate front matter (metadata) from content
+        metadata, md_content = split_front_matter(plugins.run('on_source_loaded', filename, content))
+
+        page = {
+            'filename': filename,
+            'output_filename': output_name(filename),
+            'locale': locales[filename],
+            'metadata': metadata,
+            'md_content': md_content,
+            'hash': content_hash(content),
+            'shortcodes': find_shortcodes(md_content),
+        }
+        page['metadata'] = plugins.run('on_front_matter', page, metadata)
+        if stream:
+            del page['md_content']
+            page = SourcePage(page, plugins)
+        pages.append(page)
+    return pages
+
+def load_jekyll_pages(config, plugins=None):
+    """Reads the root-level Jekyll-style pages: Markdown files that start with front matter."""
+    plugins = plugins or Plugins()
+    excluded = set(config.get('exclude') or [])
+    pages = []
+    for filename in sorted(os.listdir('.')):
+        if not filename.endswith('.md') or filename in excluded or filename.startswith(('_', '.')):
+            continue
+        with open(filename, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if not content.startswith('---'):
+            continue # Jekyll only renders files with front matter
+        metadata, md_content = split_front_matter(plugins.run('on_source_loaded', filename, content))
+        output_filename = filename[:-3] + '.html'
+        permalink = metadata.get('permalink')
+        if permalink:
+            output_filename = permalink.strip('/') + ('/index.html' if permalink.endswith('/') else '')
+            output_filename = output_filename.lstrip('/') or 'index.html'
+        page = {
+            'filename': filename,
+            'output_filename': output_filename,
+            'metadata': metadata,
+            'md_content': md_content,
+            'hash': content_hash(content),
+        }
+        page['metadata'] = plugins.run('on_front_matter', page, metadata)
+        pages.append(page)
+    return pages
+
+def site_url(config):
+    """Returns the absolute URL of the site: url in _config.yml, or the domain in CNAME."""
+    if config.get('url'):
+        return config['url'].rstrip('/')
+    if os.path.exists('CNAME'):
+        with open('CNAME', 'r', encoding='utf-8') as f:
+            return f"https://{f.read().strip()}"
+    raise ValueError("Set url in _config.yml, the sitemap and feed need absolute URLs")
+
+def nav_links(config, locale):
+    """Returns the navigation of a locale. nav in _config.yml replaces that of DEFAULT_LOCALE."""
+    if locale == DEFAULT_LOCALE and config.get('nav'):
+        return config['nav']
+    return LOCALES[locale]['nav_links']
+
+def build_time():
+    """Returns the build timestamp, pinned by SOURCE_DATE_EPOCH for reproducible builds."""
+    if os.environ.get('SOURCE_DATE_EPOCH'):
+        return datetime.fromtimestamp(int(os.environ['SOURCE_DATE_EPOCH']), timezone.utc)
+    return datetime.now(timezone.utc)
+
+def template_data(env, template_file, data_hashes):
+    """Returns sorted (name, hash) of the data files a page template can read through its data global."""
+    source = env.loader.get_source(env, template_file)[0]
+    uses_data = any(node.name == 'data' for node in env.parse(source).find_all(nodes.Name))
+    return sorted(data_hashes.items()) if uses_data else []
+
+def jinja_template(timestamp, data, data_hashes):
+    """Returns (env, template, template source, template_data()) for the pages in SOURCE_DIR in DEFAULT_LOCALE."""
+    # Setup Jinja2 environment
+    env = Environment(loader=FileSystemLoader('.'))
+    # Add now() function to Jinja2 environment for dynamic year in footer
+    env.globals['now'] = lambda: timestamp
+    env.globals['data'] = data # The _data/ files, as site.data in the Jekyll pages
+    template = env.get_template(TEMPLATE_FILE)
+    template_source = env.loader.get_source(env, TEMPLATE_FILE)[0]
+    return env, template, template_source, template_data(env, TEMPLATE_FILE, data_hashes)
+
+def related_articles(pages):
+    """Returns the related articles of every page. Articles are related within their locale."""
+    related = {}
+    for locale in sorted({page['locale'] for page in pages}):
+        related.update(compute_related([page for page in pages if page['locale'] == locale], RELATED_COUNT,
+                                       'related' if locale == DEFAULT_LOCALE else f"related-{locale}"))
+    return related
+
+def page_context(config, page, related_articles, translations):
+    """Returns the template variables of an article, apart from its content."""
+    metadata = page['metadata']
+    return {
+        'title': metadata.get('title', config.get('title', '')),
+        'description': metadata.get('description', config.get('description', '')),
+        'nav_links': nav_links(config, page['locale']),
+        'current_page': nav_current(page['output_filename'], page['locale'], nav_links(config, page['locale']),
+                                    DEFAULT_LOCALE),
+        'related_articles': related_articles,
+        'lang': page['locale'],
+        'alternates': translations.get(page['output_filename'], []),
+    }
+
+def render_without_related(template, context):
+    """Renders a page with RELATED_MARKER in place of its related block, for a build shard."""
+    if 'related' not in template.blocks:
+        raise ValueError(f"{template.name} has no {{% block related %}} around its related articles, "
+                         "which a sharded build needs")
+    jinja_context = template.new_context(context)
+    jinja_context.blocks['related'] = [lambda _: iter([RELATED_MARKER])]
+    return ''.join(template.root_render_func(jinja_context))
+
+def fill_related(config, pages, templates, related, translations, output_dir=OUTPUT_DIR):
+    """Puts the related articles into the pages that shards rendered with RELATED_MARKER.
+
+    Returns the output filenames of the pages rewritten.
+    """
+    filled = []
+    for page in pages:
+        filepath = os.path.join(output_dir, page['output_filename'])
+        with open(filepath, 'r', encoding='utf-8') as f:
+            page_html = f.read()
+        if RELATED_MARKER not in page_html:
+            continue
+        template = templates[page['locale']][0]
+        context = template.new_context(page_context(config, page, related[page['output_filename']], translations))
+        write_text(filepath, page_html.replace(RELATED_MARKER, ''.join(template.blocks['related'](context)), 1))
+        filled.append(page['output_filename'])
+    return filled
+
+def locale_templates(env, locales, data_hashes):
+    """Returns {locale: (template, source hash, template_data())}. A template shared by several locales is compiled once."""
+    templates = {}
+    for locale in locales:
+        template_file = LOCALES[locale]['template']
+        if not os.path.exists(template_file):
+            template_file = TEMPLATE_FILE
+        templates[locale] = (env.get_template(template_file), content_hash(env.loader.get_source(env, template_file)[0]),
+                             template_data(env, template_file, data_hashes))
+    return templates
+
+def generate_pages(shard=None, stream=False, io_workers=IO_WORKERS):
+    """Builds the site into OUTPUT_DIR, or only the pages of one shard (i, N) into SHARD_DIR.
+
+    With stream=True the Markdown and HTML of the articles are not held in memory:
+    only their front matter is indexed, and each page is read, rendered and
+    written in a pipeline of bounded queues. Memory still grows with the number
+    of articles, by the front matter index, the sparse term counts of the related
+    articles and the per-page state of the output checks, which are a few KiB
+    per article rather than its whole text.
+    Source files are read ahead and pages written behind on io_workers threads;
+    io_workers=0 does all file I/O sequentially.
+
+    A shard reads only its own articles and renders them without their related
+    articles, which merge_shards() adds once it has the term counts of all shards.
+    """
+    if shard:
+        output_dir = os.path.join(SHARD_DIR, shard_name(shard))
+        state_dir = os.path.join(CACHE_DIR, shard_name(shard)) # Shards never share state
+    else:
+        output_dir = OUTPUT_DIR
+        state_dir = CACHE_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = set()
+    config = load_config()
+    timestamp = build_time()
+    data, data_hashes = load_data()
+    shortcodes = Shortcodes(data, data_hashes)
+
+    previous = load_state('pages', {}, state_dir)
+    cached_pages = {}
+    rendered = 0
+
+    plugins = load_plugins()
+    files = FileIO(io_workers)
+    pages = load_sources(stream, files, plugins, shard) if os.path.isdir(SOURCE_DIR) else []
+    # Every article of the site by output name and locale, which is all that translations need
+    sources = [{'output_filename': output_name(filename), 'locale': locale}
+               for filename, locale in source_files(SOURCE_DIR, LOCALES, DEFAULT_LOCALE)] if shard else pages
+    if pages:
+        jinja = jinja_template(timestamp, data, data_hashes)
+        locales = sorted({page['locale'] for page in pages})
+        templates = locale_templates(jinja[0], locales, data_hashes)
+        translations = alternates(sources, site_url(config), DEFAULT_LOCALE)
+        if shard:
+            # Related articles need every shard's pages; the merge adds them from these term counts
+            cached_terms = load_state('terms', {}, state_dir)
+            for page in pages:
+                entry = cached_terms.get(page['output_filename'])
+                page['terms'] = entry['counts'] if entry and entry['hash'] == page['hash'] else dict(page_terms(page))
+            save_state('terms', {page['output_filename']: {'hash': page['hash'], 'counts': page['terms']}
+                                 for page in pages}, state_dir)
+            related = dict.fromkeys((page['output_filename'] for page in pages), RELATED_MARKER)
+        else:
+            related = related_articles(pages)
+
+    # Process Markdown files. A rendered page is stored under the hash of everything it
+    # is built from (the template only shows the year of the build time), so it is
+    # reused by any later build, on any machine that restored the store.
+    def pending_pages():
+        for page in pages:
+            output_filename = page['output_filename']
+            key = cachestore.store_key('html', page['hash'], templates[page['locale']][1], templates[page['locale']][2],
+                                       nav_links(config, page['locale']),
+                                       related[output_filename], translations.get(output_filename), timestamp.year,
+                                       plugins.cache_key, shortcodes.key(page['shortcodes']),
+                                       config.get('title'), config.get('description'))
+            cached_pages[output_filename] = {'key': key}
+            outputs.add(output_filename)
+            entry = previous.get(output_filename)
+            if not (entry and entry.get('key') == key and os.path.exists(os.path.join(output_dir, output_filename))):
+                yield page, key
+
+    def with_sources(pending):
+        if not stream:
+            return ((page, key, page['md_content']) for page, key in pending)
+        sources = files.read_ahead(pending, lambda item: os.path.join(SOURCE_DIR, item[0]['filename']))
+        return ((page, key, split_front_matter(plugins.run('on_source_loaded', page['filename'], text))[1])
+                for (page, key), text in sources)
+
+    def render_page(item):
+        page, key, md_content = item
+        rendered_html = cachestore.get(key)
+        if rendered_html is not None:
+            return page['output_filename'], rendered_html, False
+        # Convert Markdown to HTML, with the shortcodes expanded separately
+        md_content, expansions = shortcodes.stash(md_content)
+        html_content = shortcodes.unstash(markdown.markdown(md_content, extensions=['fenced_code', 'tables']), expansions)
+        html_content = plugins.run('on_markdown_rendered', page, html_content)
+
+        # Render HTML using the template of the page's locale
+        template = templates[page['locale']][0]
+        context = dict(page_context(config, page, related[page['output_filename']], translations), content=html_content)
+        rendered_html = render_without_related(template, context) if shard else template.render(**context)
+        rendered_html = plugins.run('on_page_rendered', page, rendered_html)
+        cachestore.put(key, rendered_html)
+        return page['output_filename'], rendered_html, True
+
+    def write_page(item):
+        output_filename, rendered_html, was_rendered = item
+        # Save the new HTML file
+        output_filepath = os.path.join(output_dir, output_filename)
+        files.write_text(output_filepath, plugins.run('on_write', output_filepath, rendered_html))
+        return output_filepath, was_rendered
+
+    # Pages are read, rendered and written in overlapping stages with at most a few
+    # dozen pages in flight at any time
+    for output_filepath, was_rendered in pipeline(with_sources(pending_pages()), render_page, write_page):
+        rendered += was_rendered
+        print(f"Generated {output_filepath}")
+
+    # Jekyll-style pages at the root, rendered through _layouts/ and _includes/ like Jekyll would.
+    # The Markdown body of a page is stored by the hash of the page, the config and the data
+    # files it and its shortcodes use, so it is only rendered again when one of them changed;
+    # layouts are cheap and always applied.
+    site = dict(config, time=timestamp, data=data)
+    config_hash = content_hash(repr(sorted(config.items())))
+    docs_outputs = {page['output_filename'] for page in sources}
+    jekyll_pages = [page for page in load_jekyll_pages(config, plugins) if page['output_filename'] not in docs_outputs
+                    and (not shard or in_shard(page['filename'], shard))]
+    for page in jekyll_pages:
+        output_filename = page['output_filename']
+        context = {'site': site, 'page': dict(page['metadata'], url=f"/{output_filename}")}
+        dependencies = data_dependencies(page['md_content'], data_hashes)
+        uses_time = 'site.time' in page['md_content']
+        key = cachestore.store_key('body', page['hash'], config_hash, sorted(dependencies.items()),
+                                   timestamp.isoformat() if uses_time else None, plugins.cache_key,
+                                   shortcodes.key(find_shortcodes(page['md_content'])))
+        html_content = cachestore.get(key)
+        if html_content is None:
+            md_content, expansions = shortcodes.stash(page['md_content'])
+            html_content = markdown.markdown(render_string(md_content, context), extensions=['fenced_code', 'tables'])
+            html_content = shortcodes.unstash(html_content, expansions)
+            html_content = plugins.run('on_markdown_rendered', page, html_content)
+            cachestore.put(key, html_content)
+            rendered += 1
+        layout = page['metadata'].get('layout')
+        rendered_html = render_layout(layout, html_content, context) if layout else html_content
+        rendered_html = plugins.run('on_page_rendered', page, rendered_html)
+
+        output_filepath = os.path.join(output_dir, output_filename)
+        output_hash = content_hash(rendered_html)
+        entry = previous.get(output_filename)
+        if not entry or entry.get('output') != output_hash or not os.path.exists(output_filepath):
+            files.write_text(output_filepath, plugins.run('on_write', output_filepath, rendered_html))
+            print(f"Generated {output_filepath}")
+        cached_pages[output_filename] = {'output': output_hash}
+        outputs.add(output_filename)
+    files.close() # Every page is on disk before anything reads the output
+    if cached_pages:
+        save_state('pages', cached_pages, state_dir)
+        print(f"Pages: rendered {rendered} of {len(cached_pages)}")
+    if shortcodes.used:
+        print(f"Shortcodes: rendered {shortcodes.rendered} of {shortcodes.used} expansions")
+
+    if shard:
+        # The merge step builds everything that needs the whole site
+        prune_output(output_dir, outputs)
+        partial = write_partial_manifest(shard, output_dir, [('docs', page) for page in pages] +
+                                         [('jekyll', page) for page in jekyll_pages], cache_dir=state_dir)
+        print(f"Shard {shard[0]}/{shard[1]}: {len(outputs)} pages, partial manifest in {partial}")
+        if plugins.timings:
+            write_report(f"plugins-{shard_name(shard)}.json", plugins.report())
+        return
+
+    finish_site(config, pages, jekyll_pages, outputs, jinja if pages else None, plugins=plugins)
+
+def merge_shards():
+    """Combines the outputs of all shards in SHARD_DIR into OUTPUT_DIR and builds the site-wide files.
+
+    The related articles are computed here, from the term counts in the partial
+    manifests, and filled into the pages.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    config = load_config()
+    pages, outputs, files = merge_shard_outputs(OUTPUT_DIR)
+    docs_pages = [page for kind, page in pages if kind == 'docs']
+    jekyll_pages = [page for kind, page in pages if kind == 'jekyll']
+    jinja = None
+    if docs_pages:
+        data, data_hashes = load_data()
+        jinja = jinja_template(build_time(), data, data_hashes)
+        locales = sorted({page['locale'] for page in docs_pages})
+        templates = locale_templates(jinja[0], locales, data_hashes)
+        related = related_articles(docs_pages)
+        translations = alternates(docs_pages, site_url(config), DEFAULT_LOCALE)
+        for output_filename in fill_related(config, docs_pages, templates, related, translations):
+            files.pop(output_filename, None) # Its checksum in the partial manifest is of the page without them
+    finish_site(config, docs_pages, jekyll_pages, outputs, jinja, files, load_plugins())
+
+def finish_site(config, pages, jekyll_pages, outputs, jinja, known_files=None, plugins=None):
+    """Builds the files that depend on the whole site, then prunes, checksums and checks OUTPUT_DIR.
+
+    pages are the articles from SOURCE_DIR and jekyll_pages the root-level pages;
+    only their output_filename and metadata are used. jinja is the result of
+    jinja_template() when there are articles. The on_build_done hooks of plugins
+    run once the site-wide files are written, and may add files of their own.
+    """
+    plugins = plugins or Plugins()
+    # Assets are hardlinked (or reflinked) instead of copied. Hand-written pages are
+    # copied, since they get resource hints like every other page. A page generated
+    # from Markdown takes precedence over a hand-written one.
+    outputs |= link_static([path for path in STATIC_PATHS if os.path.exists(path)], OUTPUT_DIR)
+    for static_page in STATIC_PAGES:
+        if static_page not in outputs and os.path.exists(static_page):
+            copy_page(static_page, os.path.join(OUTPUT_DIR, static_page))
+            outputs.add(static_page)
+
+    # Paginated article listings and tag/category pages, and the feed, are Swedish
+    default_pages = [page for page in pages if page.get('locale', DEFAULT_LOCALE) == DEFAULT_LOCALE]
+    listing_pages = []
+    if default_pages:
+        env, template, template_source, data_key = jinja
+        listing_pages = build_listings(env, template, template_source, default_pages, OUTPUT_DIR,
+                                       nav_links(config, DEFAULT_LOCALE), config.get('title', ''), data_key)
+        outputs.update(listing_pages)
+
+    # Preload and prefetch hints from the link graph of all pages
+    apply_hints(OUTPUT_DIR)
+
+    # Sitemap, robots.txt and feed are built from the front matter of the pages
+    url = site_url(config)
+    sitemap_entries = {link['url']: None for link in nav_links(config, DEFAULT_LOCALE) if link['url'] in outputs}
+    sitemap_entries.update((page['output_filename'], page['metadata'].get('date')) for page in pages + jekyll_pages)
+    sitemap_entries.update((listing_page, None) for listing_page in listing_pages)
+    generated = write_sitemap(sitemap_entries.items(), OUTPUT_DIR, url)
+    generated.append(write_robots(OUTPUT_DIR, url))
+    generated.append(write_feed(default_pages, OUTPUT_DIR, url, config.get('title', ''), FEED_SIZE))
+    outputs.update(os.path.relpath(path, OUTPUT_DIR) for path in generated)
+    print("Generated sitemap.xml, robots.txt and feed.xml")
+
+    # Site-wide plugin stages, e.g. a search index, list the files they wrote
+    outputs.update(plugins.collect('on_build_done', OUTPUT_DIR, pages + jekyll_pages))
+
+    # Anything left over from an earlier build would otherwise ship forever
+    outputs.update((SERVICE_WORKER, HEADERS_FILE))
+    removed = prune_output(OUTPUT_DIR, outputs)
+    if removed:
+        print(f"Removed {removed} stale files from {OUTPUT_DIR}")
+
+    # Checksums of everything in the output, the base for delta deploys, the service
+    # worker's precache list and the ETags in _headers. Later passes only hash the
+    # files written in between.
+    nav_urls = [link['url'] for locale in LOCALES for link in nav_links(config, locale)]
+    write_service_worker(build_manifest(OUTPUT_DIR, known_files), OUTPUT_DIR, nav_urls)
+    write_headers(build_manifest(OUTPUT_DIR), OUTPUT_DIR)
+    manifest = build_manifest(OUTPUT_DIR)
+    print(f"Manifest: {len(manifest)} files")
+
+    # Report internal links that point at pages or anchors we never emitted
+    for problem in check_links(OUTPUT_DIR):
+        print(f"WARNING: {problem}")
+
+    # Report pages in the sitemap whose content (nearly) duplicates another's
+    for problem in check_duplicates(OUTPUT_DIR, sorted(f"/{path}" for path in sitemap_entries)):
+        print(f"WARNING: {problem}")
+
+    # Report invalid nesting, duplicate ids, missing alt text and skipped headings
+    for problem in validate_site(OUTPUT_DIR):
+        print(f"WARNING: {problem}")
+
+    # Page weight per route, against the budgets in _config.yml
+    groups = {f"/{page['output_filename']}": 'articles' for page in pages}
+    groups.update((f"/{page['output_filename']}", 'pages') for page in jekyll_pages)
+    groups.update((f"/{listing_page}", 'listings') for listing_page in listing_pages)
+    budget_problems = check_budgets(OUTPUT_DIR, config.get('budgets'), groups)
+    for problem in budget_problems:
+        print(f"WARNING: {problem}")
+
+    removed, kept = cachestore.prune()
+    if removed:
+        print(f"Cache store: evicted {removed} objects, {kept} bytes kept")
+
+    # Time spent in each plugin hook, for build profiles
+    if plugins.timings:
+        write_report('plugins.json', plugins.report())
+
+    if budget_problems and (config.get('budgets') or {}).get('fail'):
+        raise ValueError(f"{len(budget_problems)} page weight budgets exceeded")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Builds the site into _site.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--shard', type=parse_shard, metavar='i/N',
+                      help=f'build only shard i of N into {SHARD_DIR}/, for builds split across runners')
+    mode.add_argument('--merge', action='store_true', help=f'combine the shards in {SHARD_DIR}/ into _site')
+    parser.add_argument('--stream', action='store_true',
+                        help='stream article bodies through the renderer instead of holding them all in memory')
+    parser.add_argument('--sequential-io', action='store_true',
+                        help='read and write files one at a time instead of on a thread pool')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.merge:
+            merge_shards()
+        else:
+            generate_pages(args.shard, args.stream, 0 if args.sequential_io else IO_WORKERS)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
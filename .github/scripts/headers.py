@@ -0,0 +1,103 @@
+"""Writes _headers, the caching headers for every file in the site.
+
+The file uses the Netlify/Cloudflare Pages format, so a CDN can read it as it
+is, and serve.py reads it to answer conditional requests:
+
+    /assets/css/style.css
+      Cache-Control: public, max-age=86400
+      ETag: "8f055b6eaf92a1c3"
+
+Fingerprinted files (a content hash in the name, such as app.3f9a1c2b.js) are
+immutable, HTML and feeds get a short TTL, and sw.js is always revalidated so a
+new service worker is picked up at once. ETags come from the build manifest, so
+nothing is hashed per request.
+"""
+import os
+import re
+
+from outputdir import write_text
+from sw import SERVICE_WORKER
+
+HEADERS_FILE = '_headers'
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{8,}\.\w+$')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SHORT_TTL = 'public, max-age=300, must-revalidate'  # HTML, feeds and sitemaps
+ASSET_TTL = 'public, max-age=86400'  # Assets whose URL stays the same when they change
+NO_CACHE = 'no-cache'
+SHORT_TTL_EXTENSIONS = ('.html', '.xml', '.txt', '.json')
+
+
+def cache_control(path):
+    if path == SERVICE_WORKER:
+        return NO_CACHE
+    if FINGERPRINT_RE.search(path):
+        return IMMUTABLE
+    if path.endswith(SHORT_TTL_EXTENSIONS):
+        return SHORT_TTL
+    return ASSET_TTL
+
+
+def etag(entry):
+    """A strong ETag from a manifest entry's content hash."""
+    return f'"{entry["sha256"][:16]}"'
+
+
+def url_paths(path):
+    """Returns every URL a file is served under: /about.html is also /about, index.html also /."""
+    urls = [f"/{path}"]
+    if path == 'index.html' or path.endswith('/index.html'):
+        urls.append(f"/{path[:-len('index.html')]}")
+    elif path.endswith('.html'):
+        urls.append(f"/{path[:-len('.html')]}")
+    return urls
+
+
+def header_rules(manifest):
+    """Returns {url: {header: value}} for every file in a build manifest."""
+    rules = {}
+    for path, entry in sorted(manifest.items()):
+        if path == HEADERS_FILE:
+            continue
+        headers = {'Cache-Control': cache_control(path), 'ETag': etag(entry)}
+        for url in url_paths(path):
+            rules[url] = headers
+    return rules
+
+
+def format_headers(rules):
+    lines = []
+    for url, headers in rules.items():
+        lines.append(url)
+        lines.extend(f"  {name}: {value}" for name, value in headers.items())
+    return '\n'.join(lines) + '\n'
+
+
+def parse_headers(text):
+    """Parses a _headers file back into {url: {header: value}}."""
+    rules = {}
+    headers = None
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if line[0].isspace():
+            if headers is None:
+                raise ValueError(f"Header without a path in {HEADERS_FILE}: {line.strip()}")
+            name, value = line.strip().split(':', 1)
+            headers[name.strip()] = value.strip()
+        else:
+            headers = rules.setdefault(line.strip(), {})
+    return rules
+
+
+def write_headers(manifest, output_dir):
+    """Writes _headers for the given manifest unless it is already up to date. Returns its path."""
+    content = format_headers(header_rules(manifest))
+    path = os.path.join(output_dir, HEADERS_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return path
+    write_text(path, content)
+    print(f"Generated {path}")
+    return path
@@ -0,0 +1,205 @@
+"""Injects resource hints into the generated HTML.
+
+Every page gets <link rel="preload"> for its local stylesheets and the local
+fonts those stylesheets load, <link rel="preconnect"> for the hosts of remote
+stylesheets (and for the font host of Google Fonts, whose stylesheet is built
+per browser and not worth preloading), and <link rel="prefetch"> for the
+PREFETCH_COUNT pages a visitor is most likely to open next. Candidates are ranked by the link graph
+of the whole site: the .cta-button call to action first, then navigation links, then
+the pages most often linked to.
+
+The hints go right after <meta charset> (or <head>), ahead of the stylesheet
+links they are meant to speed up, and a resource the page already hints or
+links before that point is left out. They are kept between HINTS_START and
+HINTS_END, so a page can be post-processed again (and the hints replaced) on
+every build.
+"""
+import html
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from buildcache import load_state, save_state, scan_pages
+from linkcheck import emitted_paths, resolve
+from outputdir import write_text
+
+PREFETCH_COUNT = 4  # Pages prefetched from each page
+HINTS_START = '<!-- hints -->'
+HINTS_END = '<!-- /hints -->'
+HINTS_RE = re.compile(r'\n?[ \t]*' + re.escape(HINTS_START) + r'.*?' + re.escape(HINTS_END), re.S)
+FONT_URL_RE = re.compile(r'url\(\s*[\'"]?([^\'")]+\.(woff2?|ttf|otf))[\'"]?\s*\)')
+FONT_TYPES = {'woff2': 'font/woff2', 'woff': 'font/woff', 'ttf': 'font/ttf', 'otf': 'font/otf'}
+FONT_HOSTS = {'fonts.googleapis.com': 'https://fonts.gstatic.com'}  # Stylesheet host: where its fonts come from
+HINT_RELS = {'preload', 'prefetch', 'preconnect', 'dns-prefetch', 'modulepreload'}
+CHARSET_RE = re.compile(r'<meta\s[^>]*\bcharset\b[^>]*>', re.I)
+HEAD_RE = re.compile(r'<head(?:\s[^>]*)?>', re.I)
+
+
+class _HintParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stylesheets = []
+        self.linked = []  # Hrefs the page already hints anywhere
+        self.early = []  # Stylesheets linked before <meta charset>, ahead of where the hints go
+        self.links = []  # [href, priority]: 2 for .cta-button links, 1 inside <nav>, 0 otherwise
+        self.nav_depth = 0
+        self.charset = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        rel = (attrs.get('rel') or '').lower().split()
+        if tag == 'meta' and 'charset' in attrs and not self.charset:
+            self.charset = True
+            self.linked += self.early
+        elif tag == 'nav':
+            self.nav_depth += 1
+        elif tag == 'link' and attrs.get('href') and HINT_RELS.intersection(rel):
+            self.linked.append(attrs['href'])
+        elif tag == 'link' and 'stylesheet' in rel and attrs.get('href'):
+            self.stylesheets.append(attrs['href'])
+            if not self.charset:
+                self.early.append(attrs['href'])
+        elif tag == 'a' and attrs.get('href'):
+            classes = (attrs.get('class') or '').split()
+            priority = 2 if 'cta-button' in classes else 1 if self.nav_depth else 0
+            self.links.append([attrs['href'], priority])
+
+    def handle_endtag(self, tag):
+        if tag == 'nav' and self.nav_depth:
+            self.nav_depth -= 1
+
+
+def strip_hints(page_html):
+    return HINTS_RE.sub('', page_html, count=1)
+
+
+def copy_page(src, dst):
+    """Copies a hand-written page into the output unless it is already there.
+
+    Pages are copied rather than linked because apply_hints rewrites them, and
+    a page that only differs by its hints is left alone.
+    """
+    with open(src, 'r', encoding='utf-8') as f:
+        page_html = f.read()
+    if os.path.exists(dst):
+        with open(dst, 'r', encoding='utf-8') as f:
+            if strip_hints(f.read()) == page_html:
+                return
+    write_text(dst, page_html)
+
+
+def _parse(page_html):
+    """Returns the stylesheets, hinted resources and links of one HTML page. Runs in a worker process."""
+    parser = _HintParser()
+    parser.feed(strip_hints(page_html))
+    parser.close()
+    return {'stylesheets': parser.stylesheets, 'linked': parser.linked, 'links': parser.links}
+
+
+def stylesheet_fonts(output_dir, stylesheet):
+    """Returns [(url, type)] for the local fonts a local stylesheet refers to."""
+    path = os.path.join(output_dir, stylesheet.lstrip('/'))
+    if urlsplit(stylesheet).netloc or not os.path.isfile(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        css = f.read()
+    return [(urljoin(stylesheet, url), FONT_TYPES[extension]) for url, extension in FONT_URL_RE.findall(css)
+            if not urlsplit(url).scheme]
+
+
+def stylesheet_origins(stylesheets):
+    """Returns (local stylesheets, [(origin, crossorigin)]) for a page's stylesheet links."""
+    local, origins = [], []
+    for href in stylesheets:
+        parts = urlsplit(href)
+        if not parts.netloc:
+            local.append(href)
+            continue
+        origin = (f"{parts.scheme or 'https'}://{parts.netloc}", False)
+        font_origin = (FONT_HOSTS[parts.hostname], True) if parts.hostname in FONT_HOSTS else None
+        origins += [item for item in (origin, font_origin) if item and item not in origins]
+    return local, origins
+
+
+def format_hints(stylesheets, fonts, prefetch, origins=()):
+    lines = [HINTS_START]
+    lines += [f'<link rel="preconnect" href="{html.escape(origin)}"{" crossorigin" if crossorigin else ""}>'
+              for origin, crossorigin in origins]
+    lines += [f'<link rel="preload" href="{html.escape(href)}" as="style">' for href in stylesheets]
+    lines += [f'<link rel="preload" href="{html.escape(href)}" as="font" type="{font_type}" crossorigin>'
+              for href, font_type in fonts]
+    lines += [f'<link rel="prefetch" href="{html.escape(href)}">' for href in prefetch]
+    lines.append(HINTS_END)
+    return '\n    '.join(lines)
+
+
+def insert_hints(page_html, hints):
+    """Puts the hints right after <meta charset>, or after <head> when there is none."""
+    head_end = page_html.find('</head>')
+    head_end = len(page_html) if head_end < 0 else head_end
+    match = CHARSET_RE.search(page_html, 0, head_end) or HEAD_RE.search(page_html, 0, head_end)
+    if not match:
+        return page_html
+    return f"{page_html[:match.end()]}\n    {hints}{page_html[match.end():]}"
+
+
+def apply_hints(output_dir, prefetch_count=PREFETCH_COUNT):
+    """Adds (or refreshes) the resource hints in every HTML page of output_dir.
+
+    Parse results are cached by mtime and size, and pages are only rewritten
+    when their hints change. Returns the number of pages rewritten.
+    """
+    paths = emitted_paths(output_dir)
+    html_paths = sorted(path for path in paths if path.endswith('.html'))
+    cached = {path: entry for path, entry in load_state('hints', {}).items() if 'linked' in entry}
+    pages, _ = scan_pages(output_dir, html_paths, cached, _parse)
+    for path, entry in pages.items():
+        if entry['mtime'] != cached.get(path, {}).get('mtime'):
+            entry.pop('hints', None)  # Rewritten since its hints went in: the file is checked again below
+
+    # The link graph: how many pages link to each page
+    in_degree = {}
+    for path, entry in pages.items():
+        targets = {resolved[0] for resolved in (resolve(path, href, paths) for href, _ in entry['links']) if resolved}
+        for target in targets:
+            in_degree[target] = in_degree.get(target, 0) + 1
+
+    fonts = {}
+    rewritten = 0
+    for path, entry in pages.items():
+        candidates = {}  # target: [priority, position of the first link, href as written]
+        for position, (href, priority) in enumerate(entry['links']):
+            resolved = resolve(path, href, paths)
+            if resolved and resolved[0] != path and resolved[0] in pages:
+                candidate = candidates.setdefault(resolved[0], [priority, position, urlsplit(href)._replace(fragment='').geturl()])
+                candidate[0] = max(candidate[0], priority)
+        # Prefetch the URL the link uses, /about and /about.html are different cache entries
+        ranked = [candidates[target][2] for target in sorted(
+            candidates, key=lambda target: (-candidates[target][0], -in_degree.get(target, 0), candidates[target][1]))]
+        linked = set(entry['linked'])
+        stylesheets, origins = stylesheet_origins(entry['stylesheets'])
+        page_fonts = []
+        for stylesheet in stylesheets:
+            if stylesheet not in fonts:
+                fonts[stylesheet] = stylesheet_fonts(output_dir, stylesheet)
+            page_fonts += [font for font in fonts[stylesheet] if font not in page_fonts and font[0] not in linked]
+        hints = format_hints([href for href in stylesheets if href not in linked], page_fonts,
+                             [href for href in ranked[:prefetch_count] if href not in linked],
+                             [origin for origin in origins if origin[0] not in linked])
+
+        filepath = os.path.join(output_dir, path.lstrip('/'))
+        if entry.get('hints') != hints:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                page_html = f.read()
+            new_html = insert_hints(strip_hints(page_html), hints)
+            if new_html != page_html:
+                write_text(filepath, new_html)
+                rewritten += 1
+            stat = os.stat(filepath)
+            entry = dict(entry, mtime=stat.st_mtime_ns, size=stat.st_size, hints=hints)
+        pages[path] = entry
+
+    save_state('hints', pages)
+    print(f"Hints: updated {rewritten} of {len(pages)} pages")
+    return rewritten
@@ -0,0 +1,95 @@
+"""Checks internal links in the generated HTML against an index of emitted paths and anchors."""
+import os
+from html.parser import HTMLParser
+from urllib.parse import unquote, urljoin, urlsplit
+
+from buildcache import content_hash, load_state, save_state, scan_pages
+
+LINK_ATTRIBUTES = {'a': 'href', 'link': 'href', 'img': 'src', 'script': 'src', 'source': 'src'}
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ids = []
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get('id'):
+            self.ids.append(attrs['id'])
+        if tag == 'a' and attrs.get('name'):
+            self.ids.append(attrs['name'])
+        attribute = LINK_ATTRIBUTES.get(tag)
+        if attribute and attrs.get(attribute):
+            line, column = self.getpos()
+            self.links.append([attrs[attribute], line, column + 1])
+
+
+def parse_page(content):
+    """Returns the ids and links of one HTML page. Runs in a worker process."""
+    parser = _LinkParser()
+    parser.feed(content)
+    parser.close()
+    return {'ids': sorted(set(parser.ids)), 'links': parser.links, 'broken': []}
+
+
+def emitted_paths(output_dir):
+    """Returns the set of site paths (e.g. /about.html) that exist in the output directory."""
+    paths = set()
+    for dirpath, dirnames, filenames in os.walk(output_dir):
+        rel_dir = os.path.relpath(dirpath, output_dir).replace(os.sep, '/')
+        prefix = '/' if rel_dir == '.' else f"/{rel_dir}/"
+        paths.update(prefix + filename for filename in filenames)
+    return paths
+
+
+def resolve(page_path, href, paths):
+    """Returns (target path, fragment) for an internal link, or None for external links."""
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc:
+        return None
+    target = unquote(urljoin(page_path, parts.path)) if parts.path else page_path
+    if target.endswith('/'):
+        target += 'index.html'
+    elif target not in paths and f"{target}.html" in paths:
+        target += '.html'  # GitHub Pages serves /biodling as /biodling.html
+    return target, unquote(parts.fragment)
+
+
+def check_links(output_dir, workers=None):
+    """Reports broken internal links in every HTML file of output_dir.
+
+    Pages are parsed in a process pool, and the parse result of each page is
+    cached by content hash, so only pages that changed since the last build are
+    parsed again. Unchanged pages are only re-resolved when the set of emitted
+    paths or anchors changed. Returns a list of "file:line:col: message" strings.
+    """
+    paths = emitted_paths(output_dir)
+    html_paths = sorted(path for path in paths if path.endswith('.html'))
+    state = load_state('linkcheck', {})
+    pages, changed = scan_pages(output_dir, html_paths, state.get('pages', {}), parse_page, workers)
+
+    anchors = {(path, anchor) for path, entry in pages.items() for anchor in entry['ids']}
+    index_hash = content_hash(repr((sorted(paths), sorted(anchors))))
+    recheck = pages.keys() if index_hash != state.get('index') else changed
+
+    for path in recheck:
+        broken = []
+        for href, line, column in pages[path]['links']:
+            if href.startswith(('mailto:', 'tel:', 'javascript:', 'data:')):
+                continue
+            resolved = resolve(path, href, paths)
+            if resolved is None:
+                continue
+            target, fragment = resolved
+            if target not in paths:
+                broken.append([line, column, f"broken link {href}"])
+            elif fragment and target.endswith('.html') and (target, fragment) not in anchors:
+                broken.append([line, column, f"missing anchor {href}"])
+        pages[path]['broken'] = broken
+
+    save_state('linkcheck', {'index': index_hash, 'pages': pages})
+    print(f"Link check: parsed {len(changed)} of {len(html_paths)} pages")
+    return [f"{path.lstrip('/')}:{line}:{column}: {message}"
+            for path in html_paths for line, column, message in pages[path]['broken']]
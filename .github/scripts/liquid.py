@@ -0,0 +1,242 @@
+"""Compiles the Liquid subset used by the Jekyll layouts and includes.
+
+Supported: {% include file %}, {% for item in list %}, {% if variable %} and
+{% unless variable %} with {% else %}, {{ variable.path }} and the filters date, default, upcase,
+downcase, escape, relative_url, absolute_url, size and
+array_to_sentence_string. Whitespace control with {%- -%} and {{- -}} works as
+in Liquid. Layouts may name a parent layout in their own front matter, as in
+Jekyll.
+
+Templates are compiled once into render functions. Includes are inlined and a
+layout chain is nested into a single function at compile time, so rendering a
+page is one call with no parsing. Compiled layouts are cached for as long as
+none of the files they were built from change.
+"""
+import html
+import os
+import re
+from datetime import datetime
+
+from siteconfig import split_front_matter
+
+LAYOUTS_DIR = '_layouts'
+INCLUDES_DIR = '_includes'
+
+TOKEN_RE = re.compile(r'{%(-?)\s*(\w+)\s*(.*?)\s*(-?)%}|{{(-?)\s*(.*?)\s*(-?)}}', re.S)
+FOR_RE = re.compile(r'^(\w+)\s+in\s+([\w.]+)$')
+CONDITION_RE = re.compile(r'^[\w.]+$')  # A bare variable path: no ==, !=, <, >, and, or or contains
+FILTER_RE = re.compile(r'^\s*(\w+)\s*(?::\s*(.*))?$')
+FILTERS = {'date', 'default', 'upcase', 'downcase', 'escape', 'xml_escape', 'relative_url', 'absolute_url',
+           'size', 'array_to_sentence_string'}
+
+_CONTENT = object()  # Marks a bare {{ content }}, where a child layout is nested
+_layouts = {}  # (layouts_dir, includes_dir, name) -> (render, {path: mtime_ns})
+
+
+def lookup(context, path):
+    value = context
+    for part in path:
+        if isinstance(value, dict):
+            value = value.get(part)
+        else:
+            value = getattr(value, part, None)
+        if value is None:
+            return None
+    return value
+
+
+def _compile_literal(argument):
+    """Returns a function of the context for a quoted string or a variable path."""
+    argument = argument.strip()
+    if len(argument) >= 2 and argument[0] == argument[-1] and argument[0] in '"\'':
+        text = argument[1:-1]
+        return lambda context: text
+    path = tuple(argument.split('.'))
+    return lambda context: lookup(context, path)
+
+
+def apply_filter(value, name, argument, context):
+    if name == 'date':
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value) if value != 'now' else context['site']['time']
+        return value.strftime(argument) if value else ''
+    if name == 'default':
+        return value if value not in (None, '', False) else argument
+    if name == 'upcase':
+        return str(value or '').upper()
+    if name == 'downcase':
+        return str(value or '').lower()
+    if name in ('escape', 'xml_escape'):
+        return html.escape(str(value or ''))
+    if name == 'relative_url':
+        return f"{(context['site'].get('baseurl') or '').rstrip('/')}{value or ''}"
+    if name == 'absolute_url':
+        site = context['site']
+        return f"{(site.get('url') or '').rstrip('/')}{(site.get('baseurl') or '').rstrip('/')}{value or ''}"
+    if name == 'size':
+        return len(value) if value is not None else 0
+    if name == 'array_to_sentence_string':
+        # A connector written with its own spaces, as in " och ", is used as it
+        # stands and without the English serial comma before it
+        items = [str(item) for item in value or []]
+        connector = argument or 'and'
+        if connector != connector.strip():
+            return connector.join([', '.join(items[:-1]), items[-1]] if len(items) > 1 else items)
+        if len(items) < 3:
+            return f" {connector} ".join(items)
+        return f"{', '.join(items[:-1])}, {connector} {items[-1]}"
+    raise ValueError(f"Unsupported Liquid filter: {name}")
+
+
+def compile_expression(expression):
+    """Compiles `variable | filter: arg | ...` into a function that returns the output string."""
+    parts = expression.split('|')
+    value_of = _compile_literal(parts[0])
+    filters = []
+    for part in parts[1:]:
+        match = FILTER_RE.match(part)
+        if not match or match.group(1) not in FILTERS:
+            raise ValueError(f"Unsupported Liquid filter: {part.strip()}")
+        filters.append((match.group(1), _compile_literal(match.group(2) or "''")))
+
+    def render(context):
+        value = value_of(context)
+        for name, argument in filters:
+            value = apply_filter(value, name, argument(context), context)
+        return '' if value is None else str(value)
+    return render
+
+
+def _compile_for(variable, items_of, body):
+    def render(context):
+        items = list(items_of(context) or [])
+        output = []
+        for index, item in enumerate(items):
+            forloop = {'index': index + 1, 'index0': index, 'first': index == 0, 'last': index == len(items) - 1,
+                       'length': len(items)}
+            output.append(body(dict(context, **{variable: item, 'forloop': forloop})))
+        return ''.join(output)
+    return render
+
+
+def _compile_if(value_of, negate, body, orelse):
+    def render(context):
+        value = value_of(context)
+        return body(context) if (value not in (None, False, '', [], {})) != negate else orelse(context)
+    return render
+
+
+def _compile_parts(source, includes_dir, dependencies):
+    """Returns the template as a list of literal strings, render functions and _CONTENT markers."""
+    parts = []
+    blocks = []  # Open for/if tags: (tag, argument, parts before the tag, parts of the if branch)
+    position = 0
+    strip_next = False
+    for match in TOKEN_RE.finditer(source):
+        text = source[position:match.start()]
+        text = text.lstrip() if strip_next else text
+        parts.append(text.rstrip() if match.group(1) or match.group(5) else text)
+        strip_next = bool(match.group(4) or match.group(7))
+        position = match.end()
+        tag, argument = match.group(2), match.group(3)
+
+        if tag is None:
+            parts.append(_CONTENT if match.group(6) == 'content' else compile_expression(match.group(6)))
+        elif tag == 'include':
+            include_path = os.path.join(includes_dir, argument)
+            dependencies[include_path] = os.stat(include_path).st_mtime_ns
+            with open(include_path, 'r', encoding='utf-8') as f:
+                parts.extend(_compile_parts(f.read(), includes_dir, dependencies))
+        elif tag in ('for', 'if', 'unless'):
+            if tag != 'for' and not CONDITION_RE.match(argument):
+                raise ValueError(f"Unsupported Liquid condition: {match.group(0)}")
+            blocks.append((tag, argument, parts, None))
+            parts = []
+        elif tag == 'else' and blocks and blocks[-1][0] in ('if', 'unless') and blocks[-1][3] is None:
+            tag, argument, outer, _ = blocks.pop()
+            blocks.append((tag, argument, outer, parts))
+            parts = []
+        elif tag in ('endfor', 'endif', 'endunless') and blocks and blocks[-1][0] == tag[3:]:
+            tag, argument, outer, branch = blocks.pop()
+            if tag == 'for':
+                loop = FOR_RE.match(argument)
+                if not loop:
+                    raise ValueError(f"Cannot parse Liquid for tag: {argument}")
+                block = _compile_for(loop.group(1), _compile_literal(loop.group(2)), _build(parts))
+            elif branch is None:
+                block = _compile_if(_compile_literal(argument), tag == 'unless', _build(parts), _build([]))
+            else:
+                block = _compile_if(_compile_literal(argument), tag == 'unless', _build(branch), _build(parts))
+            parts = outer
+            parts.append(block)
+        else:
+            raise ValueError(f"Unsupported or unbalanced Liquid tag: {match.group(0)}")
+
+    if blocks:
+        raise ValueError(f"Unclosed Liquid tag: {blocks[-1][0]} {blocks[-1][1]}")
+    text = source[position:]
+    parts.append(text.lstrip() if strip_next else text)
+    return parts
+
+
+def _build(parts):
+    """Turns a parts list into a render function, joining neighbouring literals first."""
+    merged = []
+    for part in parts:
+        if part is _CONTENT:
+            part = compile_expression('content')
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        elif part != '':
+            merged.append(part)
+    if all(isinstance(part, str) for part in merged):
+        text = ''.join(merged)
+        return lambda context: text
+    merged = tuple(merged)
+    return lambda context: ''.join([part if part.__class__ is str else part(context) for part in merged])
+
+
+def compile_string(source, includes_dir=INCLUDES_DIR):
+    """Compiles a template string into a render function of the context."""
+    return _build(_compile_parts(source, includes_dir, {}))
+
+
+def render_string(source, context, includes_dir=INCLUDES_DIR):
+    return compile_string(source, includes_dir)(context)
+
+
+def compile_layout(name, layouts_dir=LAYOUTS_DIR, includes_dir=INCLUDES_DIR):
+    """Returns the render function for a layout and all of its parent layouts.
+
+    The child layout is nested into the {{ content }} of its parent at compile
+    time, so the whole chain renders as one flat sequence.
+    """
+    key = (layouts_dir, includes_dir, name)
+    cached = _layouts.get(key)
+    if cached and all(os.path.exists(path) and os.stat(path).st_mtime_ns == mtime
+                      for path, mtime in cached[1].items()):
+        return cached[0]
+
+    dependencies = {}
+    parts = [_CONTENT]
+    seen = set()
+    while name:
+        if name in seen:
+            raise ValueError(f"Layout chain loops back to {name}")
+        seen.add(name)
+        layout_path = os.path.join(layouts_dir, f"{name}.html")
+        dependencies[layout_path] = os.stat(layout_path).st_mtime_ns
+        with open(layout_path, 'r', encoding='utf-8') as f:
+            metadata, source = split_front_matter(f.read())
+        layout_parts = _compile_parts(source, includes_dir, dependencies)
+        parts = [child for part in layout_parts for child in (parts if part is _CONTENT else [part])]
+        name = metadata.get('layout')
+
+    render = _build(parts)
+    _layouts[key] = (render, dependencies)
+    return render
+
+
+def render_layout(name, content, context, layouts_dir=LAYOUTS_DIR, includes_dir=INCLUDES_DIR):
+    """Wraps rendered page content in the named layout and its parent layouts."""
+    return compile_layout(name, layouts_dir, includes_dir)(dict(context, content=content))
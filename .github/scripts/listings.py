@@ -0,0 +1,129 @@
+"""Builds paginated article listings and per-tag/per-category index pages."""
+import math
+import os
+import re
+import unicodedata
+
+from buildcache import content_hash, load_state, save_state
+from outputdir import write_text
+
+PAGE_SIZE = 12  # Articles per listing page
+
+LISTING_CONTENT = """<h1>{{ heading }}</h1>
+<div class="grid-container">
+    {% for article in articles %}
+    <div class="grid-item">
+        {% if article.image %}<img src="{{ article.image }}" alt="{{ article.title }}">{% endif %}
+        <h2>{{ article.title }}</h2>
+        {% if article.description %}<p>{{ article.description }}</p>{% endif %}
+        <a href="{{ article.url }}" class="cta-button-small">Läs mer</a>
+    </div>
+    {% endfor %}
+</div>
+{% if prev_url or next_url %}
+<nav class="pagination">
+    {% if prev_url %}<a href="{{ prev_url }}" rel="prev">&laquo; Föregående</a>{% endif %}
+    <span>Sida {{ page_number }} av {{ page_count }}</span>
+    {% if next_url %}<a href="{{ next_url }}" rel="next">Nästa &raquo;</a>{% endif %}
+</nav>
+{% endif %}
+"""
+
+
+def slugify(text):
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
+
+def split_list(value):
+    """Splits a front-matter list written as `a, b` or `[a, b]`."""
+    value = value.strip().strip('[]')
+    return [item.strip().strip('"\'') for item in value.split(',') if item.strip()]
+
+
+def collect_listings(pages):
+    """Groups pages into listings in a single pass over the front-matter index.
+
+    Returns {base_name: (heading, [entry, ...])} where base_name is the output
+    name of the first page of the listing, without .html.
+    """
+    listings = {'artiklar': ('Alla artiklar', [])}
+    for page in pages:
+        metadata = page['metadata']
+        entry = {
+            'url': f"/{page['output_filename']}",
+            'title': metadata.get('title', page['output_filename']),
+            'description': metadata.get('description', ''),
+            'image': metadata.get('image', ''),
+            'date': metadata.get('date', ''),
+        }
+        listings['artiklar'][1].append(entry)
+        if metadata.get('category'):
+            category = metadata['category']
+            listings.setdefault(f"kategori-{slugify(category)}", (category, []))[1].append(entry)
+        for tag in split_list(metadata.get('tags', '')):
+            listings.setdefault(f"tagg-{slugify(tag)}", (f"Taggat: {tag}", []))[1].append(entry)
+    for _, entries in listings.values():
+        entries.sort(key=lambda entry: (entry['date'], entry['url']), reverse=True)
+    return listings
+
+
+def paginate(base_name, heading, entries):
+    """Yields (output_filename, context) for each page of a listing."""
+    page_count = max(1, math.ceil(len(entries) / PAGE_SIZE))
+    names = [f"{base_name}.html"] + [f"{base_name}-{n}.html" for n in range(2, page_count + 1)]
+    for number, name in enumerate(names, start=1):
+        yield name, {
+            'heading': heading,
+            'articles': entries[(number - 1) * PAGE_SIZE:number * PAGE_SIZE],
+            'page_number': number,
+            'page_count': page_count,
+            'prev_url': f"/{names[number - 2]}" if number > 1 else None,
+            'next_url': f"/{names[number]}" if number < page_count else None,
+        }
+
+
+def build_listings(env, template, template_source, pages, output_dir, nav_links, site_title, template_data=()):
+    """Renders every listing page whose membership changed since the last build.
+
+    Each listing page is fingerprinted by its members, its position in the
+    pagination, the page template, the build year the footer shows and
+    template_data, the (name, hash) pairs of the _data files the template
+    reads. Pages with an unchanged fingerprint are left on disk untouched, and
+    listing pages that no longer exist are removed.
+    Returns the list of listing output filenames.
+    """
+    content_template = env.from_string(LISTING_CONTENT)
+    previous = load_state('listings', {})
+    current = {}
+    rebuilt = 0
+    template_hash = content_hash(template_source)
+    year = env.globals['now']().year # The footer's year, as in the key of the article pages
+
+    for base_name, (heading, entries) in collect_listings(pages).items():
+        for output_filename, context in paginate(base_name, heading, entries):
+            signature = content_hash(repr((template_hash, year, list(template_data), nav_links, site_title,
+                                           sorted(context.items(), key=lambda item: item[0]))))
+            current[output_filename] = signature
+            output_filepath = os.path.join(output_dir, output_filename)
+            if previous.get(output_filename) == signature and os.path.exists(output_filepath):
+                continue
+            rendered_html = template.render(
+                title=heading,
+                description=f"{heading} från {site_title}." if site_title else heading,
+                content=content_template.render(**context),
+                nav_links=nav_links,
+                current_page=output_filename,
+                related_articles=[],
+            )
+            write_text(output_filepath, rendered_html)
+            rebuilt += 1
+
+    for output_filename in set(previous) - set(current):
+        output_filepath = os.path.join(output_dir, output_filename)
+        if os.path.exists(output_filepath):
+            os.remove(output_filepath)
+
+    save_state('listings', current)
+    print(f"Listings: rebuilt {rebuilt} of {len(current)} pages")
+    return sorted(current)
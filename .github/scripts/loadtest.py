@@ -0,0 +1,225 @@
+"""Load-tests the built site on the local server, to size the CDN and origin.
+
+    python .github/scripts/loadtest.py [--requests 5000] [--concurrency 50] [--url http://127.0.0.1:8000]
+
+Replays a mix of requests modelled on real visits against serve.py:
+navigation pages, articles, stylesheets and scripts, images, and conditional
+requests that a returning visitor's browser revalidates with If-None-Match.
+Each connection is kept alive and sends its requests one after another, with
+many connections open at once on one asyncio event loop.
+
+The mix runs twice, once without Accept-Encoding and once with gzip against
+the server's precompressed files. Throughput, latency percentiles and bytes
+served are reported for both runs, and also written to build-reports/loadtest.json.
+Without --url, serve.py is started with --precompress on a free port.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from buildcache import write_report
+from headers import HEADERS_FILE, parse_headers
+from linkcheck import emitted_paths
+from serve import COMPRESSIBLE, gzip_etag
+
+OUTPUT_DIR = '_site'
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIX = {'nav': 35, 'article': 25, 'asset': 20, 'image': 10, 'conditional': 10}  # Share of requests, in percent
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg', '.ico')
+REPORT_FILE = 'loadtest.json'
+
+
+class _NavParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.nav_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'nav':
+            self.nav_depth += 1
+        elif tag == 'a' and self.nav_depth and dict(attrs).get('href'):
+            self.links.append(dict(attrs)['href'])
+
+    def handle_endtag(self, tag):
+        if tag == 'nav' and self.nav_depth:
+            self.nav_depth -= 1
+
+
+def request_targets(output_dir):
+    """Returns {kind: [(url, etag or None)]} for the kinds in MIX, from the files in output_dir."""
+    paths = emitted_paths(output_dir)
+    rules = {}
+    if os.path.exists(os.path.join(output_dir, HEADERS_FILE)):
+        with open(os.path.join(output_dir, HEADERS_FILE), 'r', encoding='utf-8') as f:
+            rules = parse_headers(f.read())
+
+    # Navigation links as they are written on the home page, e.g. /about or /about.html
+    nav = []
+    if '/index.html' in paths:
+        parser = _NavParser()
+        with open(os.path.join(output_dir, 'index.html'), 'r', encoding='utf-8') as f:
+            parser.feed(f.read())
+        for href in parser.links:
+            parts = urlsplit(urljoin('/index.html', href))
+            if not parts.scheme and not parts.netloc:
+                nav.append(parts.path)
+    nav = sorted(set(nav)) or ['/']
+    nav_files = {url if url.endswith('.html') else f"{url}.html" for url in nav}
+
+    targets = {
+        'nav': nav,
+        'article': sorted(p for p in paths if p.endswith('.html') and p not in nav_files and p != '/404.html'),
+        'asset': sorted(p for p in paths if p.endswith(('.css', '.js'))),
+        'image': sorted(p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS)),
+        'conditional': sorted(p for p in paths if rules.get(p, {}).get('ETag')),
+    }
+    return {kind: [(url, rules.get(url, {}).get('ETag') if kind == 'conditional' else None) for url in urls]
+            for kind, urls in targets.items() if urls}
+
+
+def plan_requests(targets, count, seed=1):
+    """Returns `count` (url, etag) pairs drawn from the targets according to MIX."""
+    rng = random.Random(seed)
+    kinds = [kind for kind in MIX if kind in targets]
+    if not kinds:
+        return []
+    chosen = rng.choices(kinds, weights=[MIX[kind] for kind in kinds], k=count)
+    return [rng.choice(targets[kind]) for kind in chosen]
+
+
+async def _fetch(reader, writer, host, url, etag, gzip):
+    """Sends one request on an open connection. Returns (status, bytes received, keep-alive)."""
+    lines = [f"GET {url} HTTP/1.1", f"Host: {host}", "User-Agent: loadtest"]
+    if gzip:
+        lines.append("Accept-Encoding: gzip")
+    if etag:
+        # A browser revalidating its cached copy sends the ETag of the variant it has,
+        # and the server only has a gzipped variant of text files
+        lines.append(f"If-None-Match: {gzip_etag(etag) if gzip and url.endswith(COMPRESSIBLE) else etag}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in header_lines:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    status = int(status_line.split()[1])
+    length = int(headers.get('content-length', 0)) if status not in (204, 304) else 0
+    await reader.readexactly(length)
+    return status, len(head) + length, headers.get('connection', '').lower() != 'close'
+
+
+async def _connection(host, port, queue, results, gzip):
+    reader = writer = None
+    while True:
+        try:
+            url, etag = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        start = time.perf_counter()
+        status, received, keep_alive = await _fetch(reader, writer, host, url, etag, gzip)
+        results.append((time.perf_counter() - start, status, received))
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, requests, concurrency, gzip):
+    """Runs the requests over `concurrency` connections and returns a summary dict."""
+    queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_connection(host, port, queue, results, gzip) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _, _ in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def percentile(share):
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000, 2)
+    return {
+        'requests': len(results),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(results) / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {'p50': percentile(0.50), 'p90': percentile(0.90), 'p99': percentile(0.99),
+                       'max': percentile(1.0)},
+        'bytes': sum(received for _, _, received in results),
+        'statuses': statuses,
+    }
+
+
+def start_server(directory):
+    """Starts serve.py with --precompress on a free port, without its request log. Returns (process, port)."""
+    process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, 'serve.py'), '--port', '0',
+                                '--directory', directory, '--precompress'],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Serving'):
+        process.kill()
+        raise RuntimeError(f"serve.py did not start: {line.strip()}")
+    return process, int(line.rstrip().rstrip('/').rsplit(':', 1)[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000, help='requests per run')
+    parser.add_argument('--concurrency', type=int, default=50, help='connections open at once')
+    parser.add_argument('--directory', default=OUTPUT_DIR, help='the built site, used to pick the URLs')
+    parser.add_argument('--url', help='test a server that is already running instead of starting serve.py')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: {args.directory} does not exist, run generate_pages.py first")
+        return 1
+    targets = request_targets(args.directory)
+    requests = plan_requests(targets, args.requests)
+    print("Mix: " + ', '.join(f"{kind} {len(urls)} URLs" for kind, urls in targets.items()))
+
+    process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        process, port = start_server(args.directory)
+        host = '127.0.0.1'
+    try:
+        runs = {}
+        for name, gzip in (('identity', False), ('gzip', True)):
+            runs[name] = asyncio.run(run_load(host, port, requests, args.concurrency, gzip))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{'':>9}  {'req/s':>8}  {'p50 ms':>7}  {'p90 ms':>7}  {'p99 ms':>7}  {'max ms':>7}  {'MiB':>7}  statuses")
+    for name, run in runs.items():
+        latency = run['latency_ms']
+        statuses = ' '.join(f"{status}:{count}" for status, count in sorted(run['statuses'].items()))
+        print(f"{name:>9}  {run['requests_per_second']:>8.1f}  {latency['p50']:>7.2f}  {latency['p90']:>7.2f}  "
+              f"{latency['p99']:>7.2f}  {latency['max']:>7.2f}  {run['bytes'] / 2 ** 20:>7.2f}  {statuses}")
+    saved = 1 - runs['gzip']['bytes'] / runs['identity']['bytes'] if runs['identity']['bytes'] else 0
+    print(f"Precompression saves {saved:.0%} of the bytes served")
+    write_report(REPORT_FILE, {'concurrency': args.concurrency, 'mix': MIX, 'runs': runs})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Finds the articles of every locale and the hreflang alternates between them.
+
+Articles directly in the source directory are in the default locale. Articles
+in a subdirectory named after another locale (docs/en/) are in that locale,
+and are built into the same subdirectory of the output. Articles with the same
+file name in different locales are translations of each other: each of them
+gets a <link rel="alternate" hreflang> to every version, itself included, and
+an x-default pointing to the version in the default locale.
+
+The navigation of another locale leads to the hand-written pages of the
+default one, so nav_current() marks a link active on a page when it points at
+the page itself or at its version in the default locale.
+"""
+import os
+from urllib.parse import urljoin, urlsplit
+
+
+def source_files(source_dir, locales, default_locale):
+    """Returns sorted [(filename relative to source_dir, locale)] for the Markdown files of all locales."""
+    files = [(filename, default_locale) for filename in os.listdir(source_dir) if filename.endswith('.md')]
+    for locale in locales:
+        locale_dir = os.path.join(source_dir, locale)
+        if locale != default_locale and os.path.isdir(locale_dir):
+            files += [(f"{locale}/{filename}", locale) for filename in os.listdir(locale_dir) if filename.endswith('.md')]
+    return sorted(files)
+
+
+def alternates(pages, site_url, default_locale):
+    """Returns {output_filename: [{'hreflang', 'url'}]} for every page that has a translation."""
+    versions = {}
+    for page in pages:
+        versions.setdefault(os.path.basename(page['output_filename']), {})[page['locale']] = page['output_filename']
+    links = {}
+    for by_locale in versions.values():
+        if len(by_locale) < 2:
+            continue
+        page_links = [{'hreflang': locale, 'url': f"{site_url}/{by_locale[locale]}"} for locale in sorted(by_locale)]
+        if default_locale in by_locale:
+            page_links.append({'hreflang': 'x-default', 'url': f"{site_url}/{by_locale[default_locale]}"})
+        for output_filename in by_locale.values():
+            links[output_filename] = page_links
+    return links
+
+
+def _nav_path(url):
+    path = urlsplit(url).path
+    if path.endswith('/'):
+        return f"{path}index.html"
+    return path if path.endswith('.html') else f"{path}.html"
+
+
+def nav_current(output_filename, locale, nav_links, default_locale):
+    """Returns the url of the nav link for a page, as written in nav_links, or output_filename when none is.
+
+    Templates mark a link active when its url equals current_page, so this is what they get as current_page.
+    """
+    page_url = f"/{output_filename}"
+    targets = {page_url}
+    if locale != default_locale and output_filename.startswith(f"{locale}/"):
+        targets.add(f"/{output_filename[len(locale) + 1:]}")
+    for link in nav_links:
+        if _nav_path(urljoin(page_url, link['url'])) in targets:
+            return link['url']
+    return output_filename
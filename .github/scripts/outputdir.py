@@ -0,0 +1,81 @@
+"""Manages the output directory: linked static files, atomic writes and pruning."""
+import errno
+import fcntl
+import os
+import shutil
+
+FICLONE = 0x40049409  # ioctl that asks copy-on-write filesystems (Btrfs, XFS) for a reflink
+
+
+def _reflink(src, dst):
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def link_file(src, dst):
+    """Hardlinks src to dst, falling back to a reflink and finally to a plain copy.
+
+    Linked files share their bytes with the source, so stages that post-process
+    output files must write a new file and os.replace() it rather than writing
+    into the existing one.
+    """
+    if os.path.exists(dst):
+        if os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+    try:
+        os.link(src, dst)
+        return
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            raise
+    try:
+        _reflink(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def write_text(path, content):
+    """Writes a generated file through a temporary file, so a hardlinked file is never written into."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def link_static(paths, output_dir):
+    """Links every file under the given files or directories into output_dir.
+
+    Returns the set of output paths (relative to output_dir) that were placed.
+    """
+    placed = set()
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = []
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                files.extend(os.path.join(dirpath, filename) for filename in sorted(filenames))
+        for src in files:
+            rel_path = os.path.normpath(src).replace(os.sep, '/')
+            link_file(src, os.path.join(output_dir, rel_path))
+            placed.add(rel_path)
+    return placed
+
+
+def prune_output(output_dir, keep):
+    """Removes files from output_dir that the current build did not produce."""
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(output_dir, topdown=False):
+        for filename in filenames:
+            filepath = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(filepath, output_dir).replace(os.sep, '/')
+            if rel_path not in keep:
+                os.remove(filepath)
+                removed += 1
+        if dirpath != output_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed
@@ -0,0 +1,63 @@
+"""Runs build stages as a pipeline of threads connected by bounded queues."""
+import queue
+import threading
+
+QUEUE_SIZE = 32  # Items waiting between two stages
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def _feed(items, output):
+    try:
+        for item in items:
+            output.put(item)
+    except Exception as e:  # Raised again in the consumer
+        output.put(_Failure(e))
+        return
+    output.put(_DONE)
+
+
+def _run_stage(stage, source, output):
+    while True:
+        item = source.get()
+        if item is _DONE or isinstance(item, _Failure):
+            output.put(item)
+            return
+        try:
+            result = stage(item)
+        except Exception as e:
+            output.put(_Failure(e))
+            return
+        if result is not None:
+            output.put(result)
+
+
+def pipeline(items, *stages, queue_size=QUEUE_SIZE):
+    """Yields the result of passing each item through all stages, in order.
+
+    Every stage runs in its own thread and reads from a bounded queue, so no
+    more than about queue_size items sit between two stages, however long the
+    input is. Reading, rendering and writing of different items overlap. A
+    stage may return None to drop an item. An exception in a stage stops the
+    pipeline and is raised in the consumer.
+    """
+    source = queue.Queue(queue_size)
+    threads = [threading.Thread(target=_feed, args=(items, source), daemon=True)]
+    for stage in stages:
+        output = queue.Queue(queue_size)
+        threads.append(threading.Thread(target=_run_stage, args=(stage, source, output), daemon=True))
+        source = output
+    for thread in threads:
+        thread.start()
+    while True:
+        item = source.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
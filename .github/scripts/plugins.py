@@ -0,0 +1,119 @@
+"""Loads build plugins from _plugins/ and runs their hooks, timing every call.
+
+A plugin is a Python file in PLUGINS_DIR. A function named after one of HOOKS
+is a hook, and so is any function decorated with @hook:
+
+    from plugins import hook
+
+    @hook('on_page_rendered', cache_key='collapse-whitespace-1')
+    def minify(page, page_html):
+        return re.sub(r'>\\s+<', '><', page_html)
+
+Hooks run in the order of the plugin filenames and get their stage's value
+last; returning None keeps the value unchanged. on_build_done is the
+exception, it only reports what it wrote.
+
+    on_source_loaded(filename, content)     raw text of a source file, before its front matter is split off
+    on_front_matter(page, metadata)         front matter of every page, on every build
+    on_markdown_rendered(page, html)        Markdown body as HTML, before the layout is applied
+    on_page_rendered(page, html)            the complete page
+    on_write(path, content)                 a generated page about to be written to disk
+    on_build_done(output_dir, pages)        once, before the output is pruned; returns the
+                                            paths (relative to output_dir) it wrote, to keep them
+
+Rendered pages are cached, so all hooks but on_front_matter and
+on_build_done only run for pages that are rendered again. That stays correct
+as long as a hook depends on nothing but its arguments and its cache key: the
+source of every plugin and the cache_key of each hook (or a module-level
+CACHE_KEY) are part of the key rendered pages are stored under.
+"""
+import importlib.util
+import os
+import threading
+import time
+
+from buildcache import content_hash
+
+PLUGINS_DIR = '_plugins'
+HOOKS = ('on_source_loaded', 'on_front_matter', 'on_markdown_rendered', 'on_page_rendered', 'on_write',
+         'on_build_done')
+
+
+def hook(name, cache_key=None):
+    """Marks a function as the given hook. cache_key may be a value or a function returning one."""
+    if name not in HOOKS:
+        raise ValueError(f"Unknown hook {name}, expected one of {', '.join(HOOKS)}")
+
+    def register(function):
+        function.hook_name = name
+        function.cache_key = cache_key
+        return function
+    return register
+
+
+class Plugins:
+    def __init__(self, hooks=None, cache_key=''):
+        self.hooks = hooks or {}  # {hook name: [(label, function)]}
+        self.cache_key = cache_key
+        self.timings = {}  # {label: [calls, seconds]}
+        self.lock = threading.Lock()
+
+    def _call(self, label, function, args):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            timing = self.timings.setdefault(label, [0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+        return result
+
+    def run(self, name, *args):
+        """Passes the last argument through every function registered for the hook and returns it."""
+        *context, value = args
+        for label, function in self.hooks.get(name, ()):
+            result = self._call(label, function, (*context, value))
+            if result is not None:
+                value = result
+        return value
+
+    def collect(self, name, *args):
+        """Calls every function registered for the hook and returns the items of all their results."""
+        items = []
+        for label, function in self.hooks.get(name, ()):
+            items.extend(self._call(label, function, args) or [])
+        return items
+
+    def report(self):
+        """Prints the time spent in each hook and returns it as {label: {'calls', 'seconds'}}."""
+        for label, (calls, seconds) in sorted(self.timings.items(), key=lambda item: -item[1][1]):
+            print(f"Plugin {label}: {calls} calls, {seconds * 1000:.1f} ms")
+        return {label: {'calls': calls, 'seconds': round(seconds, 6)} for label, (calls, seconds) in self.timings.items()}
+
+
+def load_plugins(plugins_dir=PLUGINS_DIR):
+    """Imports every plugin in plugins_dir and returns their hooks as a Plugins object."""
+    if not os.path.isdir(plugins_dir):
+        return Plugins()
+    hooks = {}
+    key_parts = []
+    for filename in sorted(os.listdir(plugins_dir)):
+        if not filename.endswith('.py') or filename.startswith('_'):
+            continue
+        path = os.path.join(plugins_dir, filename)
+        name = filename[:-3]
+        spec = importlib.util.spec_from_file_location(f"site_plugin_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        with open(path, 'rb') as f:
+            key_parts.append([name, content_hash(f.read()), repr(getattr(module, 'CACHE_KEY', None))])
+        for attribute, function in sorted(vars(module).items()):
+            hook_name = getattr(function, 'hook_name', attribute if attribute in HOOKS else None)
+            if not callable(function) or hook_name is None:
+                continue
+            cache_key = getattr(function, 'cache_key', None)
+            key_parts.append([name, attribute, repr(cache_key() if callable(cache_key) else cache_key)])
+            hooks.setdefault(hook_name, []).append((f"{name}.{attribute}", function))
+    if hooks:
+        print(f"Plugins: {sum(len(functions) for functions in hooks.values())} hooks from {plugins_dir}/")
+    return Plugins(hooks, content_hash(repr(key_parts)) if key_parts else '')
@@ -0,0 +1,210 @@
+"""Computes a "related articles" list for every page from TF-IDF vectors."""
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from buildcache import load_state, save_state
+
+WORD_RE = re.compile(r'[a-zåäöéü]+')
+STOP_WORDS = {
+    'och', 'att', 'det', 'som', 'för', 'med', 'den', 'har', 'till', 'inte',
+    'ett', 'var', 'vår', 'våra', 'vårt', 'kan', 'när', 'från', 'eller', 'även',
+    'men', 'alla', 'andra', 'dig', 'din', 'ditt', 'oss', 'vad', 'hur', 'här',
+    'där', 'också', 'om', 'på', 'av', 'en', 'är', 'vi', 'du', 'så', 'nu',
+}
+MAX_DOC_SHARE = 0.5  # Terms in more than this share of the documents are dropped, like stop words...
+MIN_DOCS_FOR_CUTOFF = 100  # ...once there are this many; a small site keeps its whole vocabulary
+BLOCK_SIZE = 512  # Rows per similarity block
+BLOCK_CELLS = 1 << 22  # Caps rows x documents of a dense block of scores (16 MiB), so it stays small at 100k+ articles
+CHUNK_PRODUCTS = 1 << 22  # Term weight products multiplied at a time within a block
+
+
+def tokenize(text):
+    """Counts the words in a text, skipping stop words and very short words."""
+    words = WORD_RE.findall(text.lower())
+    return Counter(w for w in words if len(w) > 2 and w not in STOP_WORDS)
+
+
+def page_terms(page):
+    """Counts the words of a page's title and Markdown body."""
+    return tokenize(f"{page['metadata'].get('title', '')} {page['md_content']}")
+
+
+def _ranges(starts, lengths):
+    """Concatenates range(start, start + length) for every pair, without a Python loop."""
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+
+
+class SparseMatrix:
+    """A documents x terms matrix in compressed sparse row form.
+
+    Only the nonzero weights are stored, so memory grows with the number of
+    words in the corpus rather than with documents x vocabulary. The columns
+    are indexed as well (each term's postings), which is what similarities()
+    walks to score a block of rows against every document.
+    """
+
+    def __init__(self, indptr, indices, values, n_cols):
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+        self.shape = (len(indptr) - 1, n_cols)
+        order = np.argsort(indices, kind='stable')
+        self.col_ptr = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=n_cols)))).astype(np.int64)
+        self.col_rows = np.repeat(np.arange(self.shape[0]), np.diff(indptr))[order]
+        self.col_values = values[order]
+
+    def similarities(self, rows):
+        """Returns the dense block of dot products of the given rows with every row."""
+        rows = np.asarray(rows, dtype=np.int64)
+        n_docs = self.shape[0]
+        lengths = self.indptr[rows + 1] - self.indptr[rows]
+        positions = _ranges(self.indptr[rows], lengths)
+        block_rows = np.repeat(np.arange(len(rows)), lengths)
+        terms = self.indices[positions]
+        weights = self.values[positions]
+        postings = self.col_ptr[terms + 1] - self.col_ptr[terms]
+        total = np.cumsum(postings)
+
+        scores = np.zeros(len(rows) * n_docs, dtype=np.float64)
+        start = 0
+        while start < len(terms):
+            done = total[start - 1] if start else 0
+            end = max(start + 1, int(np.searchsorted(total, done + CHUNK_PRODUCTS, side='right')))
+            counts = postings[start:end]
+            posting = _ranges(self.col_ptr[terms[start:end]], counts)
+            cells = np.repeat(block_rows[start:end] * n_docs, counts) + self.col_rows[posting]
+            products = np.repeat(weights[start:end], counts) * self.col_values[posting]
+            scores += np.bincount(cells, weights=products, minlength=len(scores))
+            start = end
+        return scores.reshape(len(rows), n_docs).astype(np.float32)
+
+
+def build_matrix(term_counts):
+    """Builds an L2-normalised TF-IDF matrix (documents x terms) for the given term counts."""
+    n_docs = len(term_counts)
+    doc_freq = Counter()
+    for counts in term_counts:
+        doc_freq.update(counts.keys())
+    max_df = MAX_DOC_SHARE * n_docs if n_docs >= MIN_DOCS_FOR_CUTOFF else n_docs
+    vocabulary = sorted(term for term, df in doc_freq.items() if df <= max_df)
+    term_index = {term: i for i, term in enumerate(vocabulary)}
+    idf = {term: math.log((1.0 + n_docs) / (1.0 + doc_freq[term])) + 1.0 for term in vocabulary}
+
+    indptr, indices, values = [0], [], []
+    for counts in term_counts:
+        row = sorted((term_index[term], (1.0 + math.log(count)) * idf[term])  # Sublinear term frequency
+                     for term, count in counts.items() if term in term_index)
+        norm = math.sqrt(sum(value * value for _, value in row)) or 1.0
+        indices.extend(col for col, _ in row)
+        values.extend(value / norm for _, value in row)
+        indptr.append(len(indices))
+    return SparseMatrix(np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+                        np.array(values, dtype=np.float32), len(vocabulary))
+
+
+def block_size(n_docs):
+    """Rows per block of similarities, so that a block holds at most BLOCK_CELLS scores."""
+    return max(1, min(BLOCK_SIZE, BLOCK_CELLS // max(n_docs, 1)))
+
+
+def top_neighbours(matrix, row_indices, count):
+    """Returns (indices, scores) of the `count` most similar documents for each requested row."""
+    n_docs = matrix.shape[0]
+    k = min(count, n_docs - 1)
+    all_indices = np.zeros((len(row_indices), max(k, 0)), dtype=np.int64)
+    all_scores = np.zeros((len(row_indices), max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return all_indices, all_scores
+
+    step = block_size(n_docs)
+    for start in range(0, len(row_indices), step):
+        block_rows = np.asarray(row_indices[start:start + step])
+        scores = matrix.similarities(block_rows)
+        scores[np.arange(len(block_rows)), block_rows] = -1.0  # A page is never related to itself
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        all_indices[start:start + len(block_rows)] = np.take_along_axis(best, order, axis=1)
+        all_scores[start:start + len(block_rows)] = np.take_along_axis(best_scores, order, axis=1)
+    return all_indices, all_scores
+
+
+def compute_related(pages, count=3, state_name='related'):
+    """Returns {output_filename: [{'title', 'url', 'score'}]} for all pages.
+
+    Term counts and neighbour lists are cached between builds. Only rows for
+    changed documents are recomputed, together with unchanged documents whose
+    neighbour list is affected by the change. Rows that are left alone keep the
+    scores from the build in which they were computed.
+
+    A page's term counts are taken from its 'terms' when it has them (the merge
+    of a sharded build), and from tokenize() of its Markdown otherwise.
+    Separate sets of pages (one per locale) keep their state under separate names.
+    """
+    state = load_state(state_name, {})
+    cached_terms = state.get('terms', {})
+    cached_related = state.get('related', {})
+    if state.get('count') != count:
+        cached_related = {}
+
+    names = [page['output_filename'] for page in pages]
+    position = {name: i for i, name in enumerate(names)}
+    term_counts = []
+    changed = []
+    for i, page in enumerate(pages):
+        entry = cached_terms.get(page['output_filename'])
+        if entry and entry['hash'] == page['hash']:
+            term_counts.append(Counter(entry['counts']))
+        else:
+            term_counts.append(Counter(page['terms']) if page.get('terms') is not None else page_terms(page))
+            changed.append(i)
+
+    removed = set(cached_related) - set(names)
+    matrix = build_matrix(term_counts)
+
+    if not cached_related:
+        dirty = set(range(len(pages)))
+    else:
+        dirty = set(changed)
+        changed_names = {names[i] for i in changed} | removed
+        for name, neighbours in cached_related.items():
+            if name in position and any(n in changed_names for n, _ in neighbours):
+                dirty.add(position[name])
+        if changed:
+            # One product against the whole corpus tells us which unchanged pages
+            # now rank a changed page above their weakest cached neighbour.
+            best_new = np.full(len(pages), -1.0, dtype=np.float32)
+            step = block_size(len(pages))
+            for start in range(0, len(changed), step):
+                best_new = np.maximum(best_new, matrix.similarities(changed[start:start + step]).max(axis=0))
+            for j, name in enumerate(names):
+                neighbours = cached_related.get(name)
+                if neighbours is None or len(neighbours) < count:
+                    dirty.add(j)
+                elif best_new[j] > min(score for _, score in neighbours):
+                    dirty.add(j)
+
+    related = {name: cached_related[name] for name in names if name in cached_related}
+    dirty_rows = sorted(dirty)
+    indices, scores = top_neighbours(matrix, dirty_rows, count)
+    for row, neighbour_rows, neighbour_scores in zip(dirty_rows, indices, scores):
+        related[names[row]] = [
+            [names[j], round(float(s), 6)] for j, s in zip(neighbour_rows, neighbour_scores) if s > 0
+        ]
+    print(f"Related articles: recomputed {len(dirty_rows)} of {len(pages)} rows")
+
+    save_state(state_name, {
+        'count': count,
+        'terms': {names[i]: {'hash': pages[i]['hash'], 'counts': dict(term_counts[i])} for i in range(len(pages))},
+        'related': related,
+    })
+
+    titles = {page['output_filename']: page['metadata'].get('title', page['output_filename']) for page in pages}
+    return {
+        name: [{'title': titles[n], 'url': f"/{n}", 'score': s} for n, s in related.get(name, []) if n in titles]
+        for name in names
+    }
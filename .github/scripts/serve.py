@@ -0,0 +1,176 @@
+"""A local server for the built site.
+
+    python .github/scripts/serve.py [--port 8000] [--directory _site] [--precompress]
+
+Serves the output directory the way GitHub Pages does (/about serves
+about.html) and applies the Cache-Control and ETag headers from _headers.
+Conditional requests are answered with 304 Not Modified by comparing
+If-None-Match with the precomputed ETag, so nothing is hashed per request.
+_headers is read again whenever a build replaces it.
+
+With --precompress, text files are gzipped once, when the server starts or
+the first time they are requested after a build replaced them, and served
+compressed to clients that accept gzip, as a CDN in front of the site would.
+"""
+import argparse
+import gzip
+import io
+import os
+import sys
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from headers import HEADERS_FILE, parse_headers
+
+OUTPUT_DIR = '_site'
+COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.xml', '.txt', '.svg', '.webmanifest')
+
+
+class HeaderRules:
+    """The parsed _headers file, reloaded when its mtime changes."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, HEADERS_FILE)
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.rules = {}
+
+    def get(self, url):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.mtime:
+            # Other request threads keep reading the old rules until the new ones are complete
+            with self.lock:
+                if mtime != self.mtime:
+                    rules = {}
+                    if mtime is not None:
+                        with open(self.path, 'r', encoding='utf-8') as f:
+                            rules = parse_headers(f.read())
+                    self.rules = rules
+                    self.mtime = mtime
+        return self.rules.get(url, {})
+
+
+class Precompressed:
+    """Gzipped copies of the text files in a directory, kept in memory and redone when a file changes."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.files = {}  # path: (mtime_ns, size, gzipped bytes)
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for filename in filenames:
+                self.get(os.path.join(dirpath, filename))
+
+    def get(self, path):
+        """Returns the gzipped content of the file at path, or None when it is not worth compressing."""
+        if not path.endswith(COMPRESSIBLE):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self.files.get(path)
+        if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            with open(path, 'rb') as f:
+                entry = (stat.st_mtime_ns, stat.st_size, gzip.compress(f.read(), compresslevel=9, mtime=0))
+            with self.lock:
+                self.files[path] = entry
+        return entry[2]
+
+
+def gzip_etag(etag):
+    """The ETag of the gzipped variant, which must differ from the uncompressed one."""
+    return f'{etag[:-1]}-gzip"' if etag.endswith('"') else etag
+
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header names etag or is *. W/ prefixes are ignored, as RFC 9110 asks."""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in tags)
+
+
+class SiteRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keeps connections alive between requests, like a browser or CDN would
+    disable_nagle_algorithm = True  # Headers and body are separate writes; with Nagle the body waits for an ACK
+
+    def __init__(self, *args, rules, precompressed=None, **kwargs):
+        self.rules = rules
+        self.precompressed = precompressed
+        super().__init__(*args, **kwargs)
+
+    def translate_path(self, path):
+        filepath = super().translate_path(path)
+        if not os.path.exists(filepath) and os.path.isfile(f"{filepath}.html"):
+            return f"{filepath}.html"
+        return filepath
+
+    def send_head(self):
+        url = self.path.split('?', 1)[0].split('#', 1)[0]
+        headers = dict(self.rules.get(url))
+        filepath = self.translate_path(self.path)
+        if os.path.isdir(filepath):
+            filepath = os.path.join(filepath, 'index.html')
+        compressed = None
+        if self.precompressed and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            compressed = self.precompressed.get(filepath)
+        if compressed is not None:
+            headers['Vary'] = 'Accept-Encoding'
+            if headers.get('ETag'):
+                headers['ETag'] = gzip_etag(headers['ETag'])
+        if headers.get('ETag') and etag_matches(self.headers.get('If-None-Match', ''), headers['ETag']):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return None
+        self._extra_headers = headers
+        if compressed is None:
+            return super().send_head()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', self.guess_type(filepath))
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(compressed)))
+        self.end_headers()
+        return io.BytesIO(compressed)
+
+    def end_headers(self):
+        for name, value in getattr(self, '_extra_headers', {}).items():
+            self.send_header(name, value)
+        self._extra_headers = {}
+        super().end_headers()
+
+
+class SiteServer(ThreadingHTTPServer):
+    request_queue_size = 128  # The default of 5 resets connections when many clients connect at once
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--bind', default='127.0.0.1')
+    parser.add_argument('--directory', default=OUTPUT_DIR)
+    parser.add_argument('--precompress', action='store_true', help='serve gzipped text files to clients that accept gzip')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: {args.directory} does not exist, run generate_pages.py first")
+        return 1
+    precompressed = Precompressed(args.directory) if args.precompress else None
+    handler = partial(SiteRequestHandler, directory=args.directory, rules=HeaderRules(args.directory),
+                      precompressed=precompressed)
+    with SiteServer((args.bind, args.port), handler) as server:
+        # With --port 0 the system picks a free port; this line tells the caller which
+        print(f"Serving {args.directory} on http://{args.bind}:{server.server_address[1]}/", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    sys.exit(main())
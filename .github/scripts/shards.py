@@ -0,0 +1,92 @@
+"""Splits a build across machines and merges the shard outputs.
+
+    python generate_pages.py --shard 1/4     # on four runners, 1/4 .. 4/4
+    python generate_pages.py --merge         # once all of _shards/ is collected
+
+A page belongs to shard i of N when the hash of its source path, modulo N, is
+i - 1, so every runner agrees on the split without coordination. A shard reads
+and renders only its own pages into _shards/<i>-of-<N>/ and writes a partial
+manifest next to it with the front matter and term counts of those pages and the
+checksums of their files. The merge links all shard outputs into the site and
+builds everything that needs the whole site: the related articles (from the
+term counts, filled into the pages the shards rendered without them), listings,
+sitemap, feed, hints, the service worker, _headers and the manifest.
+"""
+import argparse
+import json
+import os
+
+from buildcache import content_hash
+from deploy import build_manifest
+from outputdir import link_file, write_text
+
+SHARD_DIR = '_shards'
+
+
+def parse_shard(value):
+    """Parses "i/N" into (i, N); used as an argparse type."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {value} is out of range")
+    return index, count
+
+
+def shard_name(shard):
+    return f"{shard[0]}-of-{shard[1]}"
+
+
+def in_shard(source_path, shard):
+    index, count = shard
+    return int(content_hash(source_path.replace(os.sep, '/'))[:8], 16) % count == index - 1
+
+
+def write_partial_manifest(shard, output_dir, pages, shard_dir=SHARD_DIR, cache_dir=None):
+    """Writes the partial manifest of a shard: its pages' front matter, term counts and file checksums."""
+    partial = {
+        'shard': list(shard),
+        'pages': [{'kind': kind, 'filename': page['filename'], 'output_filename': page['output_filename'],
+                   'metadata': page['metadata'], 'locale': page.get('locale'), 'hash': page.get('hash'),
+                   'terms': page.get('terms')} for kind, page in pages],
+        'files': build_manifest(output_dir, cache_dir=cache_dir),
+    }
+    path = os.path.join(shard_dir, f"{shard_name(shard)}.json")
+    write_text(path, json.dumps(partial, ensure_ascii=False, sort_keys=True))
+    return path
+
+
+def merge_shard_outputs(output_dir, shard_dir=SHARD_DIR):
+    """Links the files of every shard into output_dir.
+
+    Returns (pages, outputs, files): the (kind, page) pairs of all shards in
+    source order, the set of output paths placed and the checksums from the
+    partial manifests.
+    Raises ValueError when shards are missing, disagree on N or overlap.
+    """
+    partials = []
+    for filename in sorted(os.listdir(shard_dir)):
+        if filename.endswith('.json'):
+            with open(os.path.join(shard_dir, filename), 'r', encoding='utf-8') as f:
+                partials.append(json.load(f))
+    counts = {partial['shard'][1] for partial in partials}
+    if len(counts) != 1:
+        raise ValueError(f"{shard_dir} holds shards of {len(counts)} different splits" if counts else f"No shards in {shard_dir}")
+    count = counts.pop()
+    missing = set(range(1, count + 1)) - {partial['shard'][0] for partial in partials}
+    if missing:
+        raise ValueError(f"Missing shards: {', '.join(f'{i}/{count}' for i in sorted(missing))}")
+
+    pages, files = [], {}
+    for partial in partials:
+        shard_output = os.path.join(shard_dir, shard_name(partial['shard']))
+        for path, entry in partial['files'].items():
+            if path in files:
+                raise ValueError(f"{path} was built by more than one shard")
+            files[path] = entry
+            link_file(os.path.join(shard_output, path), os.path.join(output_dir, path))
+        pages.extend((page['kind'], page) for page in partial['pages'])
+    pages.sort(key=lambda item: (item[0], item[1]['filename']))  # The order of a single-machine build
+    print(f"Merged {len(files)} files from {count} shards")
+    return pages, set(files), files
@@ -0,0 +1,100 @@
+"""Expands shortcodes, reusable snippets written in Markdown as {{< name key="value" >}}.
+
+Each shortcode is a Liquid template in SHORTCODES_DIR (name.html) that sees its
+arguments as params and the _data/ files as site.data:
+
+    {{< produktkort title="Honung" url="/biodling" image="/assets/img/honung.jpg" >}}
+
+Shortcodes are taken out of the source before Markdown (and Liquid) see it and
+put back into the rendered HTML, so their markup is never reformatted. The
+placeholders carry a nonce drawn for each build, so a page that happens to
+contain a comment like them is left alone.
+
+An expansion depends only on its template, the data files the template uses
+and its arguments. It is memoized under that key for the build and kept in
+the cache store, so a shortcode repeated on hundreds of pages is rendered
+once. A page's own cache key includes the same dependencies, which makes it
+render again when a data file behind one of its shortcodes changes.
+"""
+import os
+import re
+import secrets
+
+import cachestore
+from buildcache import content_hash
+from liquid import compile_string
+from sitedata import data_dependencies
+
+SHORTCODES_DIR = '_shortcodes'
+SHORTCODE_RE = re.compile(r'{{<\s*([\w-]+)((?:\s+[\w-]+=(?:"[^"]*"|\'[^\']*\'))*)\s*>}}')
+ARGUMENT_RE = re.compile(r'([\w-]+)=(?:"([^"]*)"|\'([^\']*)\')')
+
+
+def find_shortcodes(source):
+    """Returns the sorted names of the shortcodes used in a source text."""
+    return sorted({match.group(1) for match in SHORTCODE_RE.finditer(source)})
+
+
+class Shortcodes:
+    def __init__(self, data, data_hashes, shortcodes_dir=SHORTCODES_DIR):
+        self.data = data
+        self.data_hashes = data_hashes
+        self.shortcodes_dir = shortcodes_dir
+        self.templates = {}  # name: (render, dependency hash)
+        self.expansions = {}  # (name, dependency hash, arguments): html
+        self.used = 0
+        self.rendered = 0
+        self.nonce = secrets.token_hex(8)
+        self.placeholder_re = re.compile(rf'<p><!--shortcode:{self.nonce}:(\d+)--></p>|<!--shortcode:{self.nonce}:(\d+)-->')
+
+    def _template(self, name):
+        if name not in self.templates:
+            path = os.path.join(self.shortcodes_dir, f"{name}.html")
+            if not os.path.exists(path):
+                raise ValueError(f"Unknown shortcode {name}: {path} does not exist")
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+            dependencies = sorted(data_dependencies(source, self.data_hashes).items())
+            self.templates[name] = (compile_string(source), content_hash(repr((source, dependencies))))
+        return self.templates[name]
+
+    def key(self, names):
+        """Returns what the output of a page using the named shortcodes depends on, for its cache key."""
+        return [(name, self._template(name)[1]) for name in names]
+
+    def expand(self, name, arguments):
+        self.used += 1
+        render, dependency_hash = self._template(name)
+        memo_key = (name, dependency_hash, arguments)
+        expansion = self.expansions.get(memo_key)
+        if expansion is None:
+            store_key = cachestore.store_key('shortcode', *memo_key)
+            expansion = cachestore.get(store_key)
+            if expansion is None:
+                context = {'params': dict(arguments), 'site': {'data': self.data}}
+                expansion = render(context).strip()
+                cachestore.put(store_key, expansion)
+                self.rendered += 1
+            self.expansions[memo_key] = expansion
+        return expansion
+
+    def stash(self, source):
+        """Replaces every shortcode with a placeholder comment.
+
+        Returns (source, expansions); unstash() puts the expansions back into
+        the HTML rendered from the source.
+        """
+        expansions = []
+
+        def placeholder(match):
+            arguments = tuple(sorted((argument.group(1), argument.group(2) if argument.group(2) is not None
+                                      else argument.group(3)) for argument in ARGUMENT_RE.finditer(match.group(2))))
+            expansions.append(self.expand(match.group(1), arguments))
+            return f"<!--shortcode:{self.nonce}:{len(expansions) - 1}-->"
+
+        return SHORTCODE_RE.sub(placeholder, source), expansions
+
+    def unstash(self, page_html, expansions):
+        if not expansions:
+            return page_html
+        return self.placeholder_re.sub(lambda match: expansions[int(match.group(1) or match.group(2))], page_html)
@@ -0,0 +1,139 @@
+"""Reads _config.yml, the Jekyll site configuration.
+
+Only the YAML subset that Jekyll configs use in practice is supported:
+mappings nested by indentation, lists of scalars or mappings, quoted and plain
+scalars, flow lists of scalars, and comments. That keeps the build free of a
+YAML dependency. Anything outside the subset (block scalars, anchors, flow
+mappings, tabs, inconsistent indentation) raises ValueError rather than being
+read as something else.
+"""
+import os
+import re
+
+CONFIG_FILE = '_config.yml'
+
+_KEY_RE = re.compile(r'^([^\s#:][^:#]*?|"[^"]*"|\'[^\']*\'):(?:\s+(.*))?$')
+
+
+def _strip_comment(line):
+    quote = None
+    for i, char in enumerate(line):
+        if char in '"\'' and quote in (None, char):
+            quote = None if quote else char
+        elif char == '#' and quote is None and (i == 0 or line[i - 1].isspace()):
+            return line[:i].rstrip()
+    return line.rstrip()
+
+
+def parse_scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    if value[:1] in ('|', '>', '&', '*', '!', '{'):
+        raise ValueError(f"Unsupported YAML in config: {value}")
+    if value.startswith('[') and value.endswith(']'):
+        return [parse_scalar(item) for item in value[1:-1].split(',') if item.strip()]
+    if value in ('true', 'false'):
+        return value == 'true'
+    if value in ('null', '~', ''):
+        return None
+    if re.fullmatch(r'-?\d+', value):
+        return int(value)
+    if re.fullmatch(r'-?\d+\.\d+', value):
+        return float(value)
+    return value
+
+
+def parse_yaml(text):
+    """Parses the YAML subset described in the module docstring into dicts and lists."""
+    lines = []
+    for raw in text.splitlines():
+        line = _strip_comment(raw)
+        if line.strip() and line.strip() != '---':
+            indent = len(line) - len(line.lstrip(' '))
+            if line[indent] == '\t':
+                raise ValueError(f"Tab in the indentation of config line: {line.strip()}")
+            lines.append((indent, line.strip()))
+    value, index = _parse_block(lines, 0, 0)
+    if index < len(lines):
+        raise ValueError(f"Unexpected indentation at config line: {lines[index][1]}")
+    return value if value is not None else {}
+
+
+def _parse_block(lines, index, indent):
+    if index >= len(lines):
+        return None, index
+    if lines[index][1].startswith('- ') or lines[index][1] == '-':
+        return _parse_list(lines, index, lines[index][0])
+    return _parse_mapping(lines, index, lines[index][0])
+
+
+def _parse_mapping(lines, index, indent):
+    mapping = {}
+    while index < len(lines) and lines[index][0] == indent:
+        match = _KEY_RE.match(lines[index][1])
+        if not match:
+            raise ValueError(f"Cannot parse config line: {lines[index][1]}")
+        key = parse_scalar(match.group(1))
+        index += 1
+        if match.group(2):
+            mapping[key] = parse_scalar(match.group(2))
+            if index < len(lines) and lines[index][0] > indent:
+                raise ValueError(f"Unexpected indentation at config line: {lines[index][1]}")
+        elif index < len(lines) and (lines[index][0] > indent or
+                                     (lines[index][0] == indent and lines[index][1].startswith('- '))):
+            mapping[key], index = _parse_block(lines, index, lines[index][0])
+        else:
+            mapping[key] = None
+    return mapping, index
+
+
+def _parse_list(lines, index, indent):
+    items = []
+    while index < len(lines) and lines[index][0] == indent and (lines[index][1].startswith('- ') or lines[index][1] == '-'):
+        rest = lines[index][1][1:].strip()
+        if rest and _KEY_RE.match(rest):
+            # A mapping that starts on the dash line, e.g. "- name: x"
+            nested = [(indent + 2, rest)]
+            index += 1
+            while index < len(lines) and lines[index][0] > indent:
+                nested.append(lines[index])
+                index += 1
+            item, end = _parse_mapping(nested, 0, indent + 2)
+            if end < len(nested):
+                raise ValueError(f"Unexpected indentation at config line: {nested[end][1]}")
+            items.append(item)
+        elif rest:
+            items.append(parse_scalar(rest))
+            index += 1
+        else:
+            index += 1
+            item, index = _parse_block(lines, index, indent + 1)
+            items.append(item)
+    return items, index
+
+
+def parse_front_matter(front_matter_str):
+    metadata = {}
+    for line in front_matter_str.strip().split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            metadata[key.strip()] = value.strip().strip('"\'') # Remove quotes
+    return metadata
+
+
+def split_front_matter(content):
+    """Returns (metadata, body) for a file that may start with a --- front-matter block."""
+    # Simple parsing: assumes front matter is at the very beginning, enclosed by ---
+    parts = content.split('---', 2)
+    if content.startswith('---') and len(parts) > 2:
+        return parse_front_matter(parts[1]), parts[2]
+    return {}, content
+
+
+def load_config(path=CONFIG_FILE):
+    """Returns the parsed site configuration, or {} when there is no _config.yml."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_yaml(f.read())
@@ -0,0 +1,147 @@
+"""Loads the data files in _data/, exposed to templates as site.data.<name>.
+
+CSV files become a list of rows keyed by the header, .json files are parsed
+whole, .jsonl files hold one JSON object per line and .yml files use the
+config parser. Every row of a CSV or JSON Lines file is checked as it is read,
+so an error names the line.
+
+Only the hash of each file is kept between builds. A file that changed is
+parsed (and so validated) right away; an unchanged file is parsed the first
+time a template asks for it, which on a build that renders nothing is never.
+"""
+import csv
+import json
+import os
+import re
+
+from buildcache import file_hash, load_state, save_state
+from siteconfig import parse_yaml
+
+DATA_DIR = '_data'
+DATA_RE = re.compile(r'site\.data\b(?:\.(\w+))?')
+
+
+def _read_csv(path):
+    rows = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or not all(name.strip() for name in header):
+            raise ValueError(f"{path}: missing or empty column name in header")
+        header = [name.strip() for name in header]
+        if len(set(header)) != len(header):
+            raise ValueError(f"{path}: duplicate column name in header")
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(f"{path}:{reader.line_num}: expected {len(header)} fields, got {len(row)}")
+            rows.append(dict(zip(header, (value.strip() for value in row))))
+    return rows
+
+
+def _read_json_lines(path):
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}:{line_number}: expected an object")
+            rows.append(row)
+    return rows
+
+
+def read_data_file(path):
+    """Parses one data file, raising ValueError with the file (and line) on invalid content."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return _read_csv(path)
+    if extension == '.jsonl':
+        return _read_json_lines(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if extension == '.json':
+            try:
+                return json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+        return parse_yaml(f.read())
+
+
+class SiteData(dict):
+    """site.data, with each file parsed the first time it is looked up."""
+
+    def __init__(self, paths, parsed):
+        super().__init__(parsed)
+        self.paths = paths  # {name: path} of every data file
+
+    def __missing__(self, name):
+        if name not in self.paths:
+            raise KeyError(name)
+        value = self[name] = read_data_file(self.paths[name])
+        return value
+
+    def get(self, name, default=None):
+        return self[name] if name in self.paths else default
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def keys(self):
+        return self.paths.keys()
+
+    def items(self):
+        return [(name, self[name]) for name in self.paths]
+
+    def values(self):
+        return [self[name] for name in self.paths]
+
+
+def load_data(data_dir=DATA_DIR):
+    """Returns (site data, {name: hash}) for every data file in data_dir.
+
+    Files whose mtime and size are unchanged are not read at all, and files that
+    were only touched are not parsed.
+    """
+    cached = load_state('data', {})
+    entries = {}
+    paths, parsed = {}, {}
+    if os.path.isdir(data_dir):
+        for filename in sorted(os.listdir(data_dir)):
+            name, extension = os.path.splitext(filename)
+            if extension.lower() not in ('.csv', '.json', '.jsonl', '.yml', '.yaml'):
+                continue
+            path = os.path.join(data_dir, filename)
+            paths[name] = path
+            stat = os.stat(path)
+            entry = cached.get(filename)
+            if not entry or entry.get('mtime') != stat.st_mtime_ns or entry.get('size') != stat.st_size:
+                digest = file_hash(path)
+                if not entry or entry['hash'] != digest:
+                    parsed[name] = read_data_file(path)
+                entry = {'hash': digest, 'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+            entries[filename] = {'hash': entry['hash'], 'mtime': entry['mtime'], 'size': entry['size']}
+    if entries != cached:
+        save_state('data', entries)
+    hashes = {os.path.splitext(filename)[0]: entry['hash'] for filename, entry in entries.items()}
+    return SiteData(paths, parsed), hashes
+
+
+def data_dependencies(source, hashes):
+    """Returns {name: hash} for the data files a template refers to through site.data."""
+    names = set()
+    for match in DATA_RE.finditer(source):
+        if match.group(1) is None:
+            return dict(hashes)  # The whole site.data is used
+        names.add(match.group(1))
+    return {name: hashes.get(name) for name in sorted(names)}
@@ -0,0 +1,158 @@
+"""Generates sw.js, a service worker that precaches the site for offline visits.
+
+The precache list holds the navigation pages, the home page, OFFLINE_PAGE and
+every stylesheet and script, each with a revision taken from its content hash
+in the build manifest. On install the worker only downloads entries whose
+revision changed since the version it replaces, so a deploy costs visitors just
+the files that differ. Pages are served network-first with the cache as
+fallback. Articles and images are kept in a runtime cache as they are viewed,
+trimmed to the RUNTIME_LIMIT most recent entries, so a site with thousands of
+articles costs a visitor only what they read.
+"""
+import json
+import os
+from urllib.parse import urljoin
+
+from buildcache import content_hash
+from outputdir import write_text
+
+SERVICE_WORKER = 'sw.js'
+PRECACHE_EXTENSIONS = ('.css', '.js')
+IMAGE_EXTENSIONS = ('.svg', '.png', '.jpg', '.jpeg', '.webp', '.avif', '.ico')
+OFFLINE_PAGE = 'offline.html'  # Shown for a page that is neither online nor cached, when the site has one
+RUNTIME_LIMIT = 50  # Pages and images kept from browsing; the oldest go first
+
+SERVICE_WORKER_SOURCE = """// Generated by generate_pages.py, do not edit.
+const VERSION = '%(version)s';
+const PRECACHE = %(precache)s;
+const PRECACHE_NAME = 'precache';
+const RUNTIME_NAME = 'runtime';
+const RUNTIME_LIMIT = %(runtime_limit)d;
+const OFFLINE = %(offline)s;
+const REVISIONS = '/__precache-revisions';
+const IMAGE_RE = /\\.(%(images)s)$/i;
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(PRECACHE_NAME);
+    const stored = await cache.match(REVISIONS);
+    const previous = stored ? await stored.json() : {};
+    const changed = Object.keys(PRECACHE).filter(url => previous[url] !== PRECACHE[url]);
+    await Promise.all(changed.map(async url => {
+      const response = await fetch(url, {cache: 'reload'});
+      if (!response.ok) throw new Error(`${url}: ${response.status}`);
+      await cache.put(url, response);
+    }));
+    await cache.put(REVISIONS, new Response(JSON.stringify(PRECACHE)));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(PRECACHE_NAME);
+    for (const request of await cache.keys()) {
+      const path = new URL(request.url).pathname;
+      if (path !== REVISIONS && !(path in PRECACHE)) await cache.delete(request);
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function keep(key, response) {
+  const runtime = await caches.open(RUNTIME_NAME);
+  await runtime.delete(key);  // Re-adding moves the entry to the end, the most recent
+  await runtime.put(key, response);
+  const keys = await runtime.keys();
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - RUNTIME_LIMIT)).map(request => runtime.delete(request)));
+}
+
+function cacheKey(url) {
+  let path = url.pathname;
+  if (path.endsWith('/')) path += 'index.html';
+  else if (!(path in PRECACHE) && (path + '.html') in PRECACHE) path += '.html';
+  return path;
+}
+
+self.addEventListener('fetch', event => {
+  const url = new URL(event.request.url);
+  if (event.request.method !== 'GET' || url.origin !== self.location.origin) return;
+  const key = cacheKey(url);
+
+  if (event.request.mode === 'navigate') {
+    event.respondWith((async () => {
+      try {
+        const response = await fetch(event.request);
+        if (response.ok && !(key in PRECACHE)) event.waitUntil(keep(key, response.clone()));
+        return response;
+      } catch (error) {
+        return (await caches.match(key)) || (OFFLINE && await caches.match(OFFLINE)) ||
+          (await caches.match('/index.html')) || Response.error();
+      }
+    })());
+  } else if (key in PRECACHE) {
+    event.respondWith(caches.match(key).then(cached => cached || fetch(event.request)));
+  } else if (IMAGE_RE.test(key)) {
+    event.respondWith((async () => {
+      const cached = await caches.match(key);
+      if (cached) return cached;
+      const response = await fetch(event.request);
+      if (response.ok) event.waitUntil(keep(key, response.clone()));
+      return response;
+    })());
+  }
+});
+"""
+
+
+def page_path(url, manifest):
+    """Returns the manifest path a navigation URL is served from, or None. /about serves about.html."""
+    path = urljoin('/', url.split('#', 1)[0].split('?', 1)[0]).lstrip('/')
+    if path == '' or path.endswith('/'):
+        path += 'index.html'
+    if path not in manifest and f"{path}.html" in manifest:
+        path += '.html'
+    return path if path in manifest else None
+
+
+def precache_entries(manifest, nav_urls=()):
+    """Returns {url: revision} for the files in a build manifest that are worth precaching.
+
+    That is the pages in nav_urls, the home page and OFFLINE_PAGE, and every
+    stylesheet and script. Articles and images are left to the runtime cache.
+    """
+    pages = {page_path(url, manifest) for url in ['/', f"/{OFFLINE_PAGE}", *nav_urls]}
+    entries = {}
+    for path, entry in sorted(manifest.items()):
+        extension = os.path.splitext(path)[1].lower()
+        if path == SERVICE_WORKER:
+            continue
+        if extension in PRECACHE_EXTENSIONS or path in pages:
+            entries[f"/{path}"] = entry['sha256'][:12]
+    return entries
+
+
+def write_service_worker(manifest, output_dir, nav_urls=()):
+    """Writes sw.js for the given manifest unless the current file is already up to date.
+
+    Returns the path of the service worker. The file only changes when the
+    precache list does, so browsers see a new worker exactly when something
+    needs downloading.
+    """
+    entries = precache_entries(manifest, nav_urls)
+    offline = f"/{OFFLINE_PAGE}" if f"/{OFFLINE_PAGE}" in entries else None
+    source = SERVICE_WORKER_SOURCE % {
+        'version': content_hash(json.dumps(entries, sort_keys=True))[:12],
+        'precache': json.dumps(entries, indent=2, sort_keys=True),
+        'runtime_limit': RUNTIME_LIMIT,
+        'offline': json.dumps(offline),
+        'images': '|'.join(extension.lstrip('.') for extension in IMAGE_EXTENSIONS),
+    }
+    path = os.path.join(output_dir, SERVICE_WORKER)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == source:
+                return path
+    write_text(path, source)
+    print(f"Generated {path} with {len(entries)} precached files")
+    return path
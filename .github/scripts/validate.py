@@ -0,0 +1,121 @@
+"""Validates the structure and basic accessibility of the generated HTML.
+
+Checks every page for misnested and unclosed elements, block elements inside
+<p>, duplicate ids, images without alt text, skipped heading levels, a missing
+lang attribute and Markdown emphasis that leaked into the HTML as **text**.
+Pages are checked in a process pool and the results are cached by content
+hash, so only pages that changed are validated again.
+"""
+import re
+from html.parser import HTMLParser
+
+from buildcache import load_state, save_state, scan_pages
+from linkcheck import emitted_paths
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+# Elements whose end tag may be left out; closing their parent closes them too
+OPTIONAL_END = {'p', 'li', 'dt', 'dd', 'option', 'tr', 'td', 'th', 'thead', 'tbody', 'tfoot'}
+# Elements that close an open <p>, which makes a later </p> stray
+BLOCK_ELEMENTS = {'address', 'article', 'aside', 'blockquote', 'div', 'dl', 'fieldset', 'figure', 'footer', 'form',
+                  'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'main', 'nav', 'ol', 'pre', 'section',
+                  'table', 'ul'}
+RAW_TEXT = {'script', 'style', 'code', 'pre'}
+MARKDOWN_RE = re.compile(r'\*\*[^*\s][^*]*\*\*|(?<![\w*])__[^_\s][^_]*__')
+
+
+class _Validator(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.problems = []
+        self.stack = []  # [tag, line, column]
+        self.ids = {}
+        self.heading = 0
+        self.raw_depth = 0
+
+    def report(self, message, position=None):
+        line, column = position or self.getpos()
+        self.problems.append([line, column + 1, message])
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        position = self.getpos()
+        if tag in BLOCK_ELEMENTS and 'p' in (open_tag for open_tag, _, _ in self.stack):
+            self.report(f"<{tag}> inside <p>")
+            while self.stack and self.stack[-1][0] != 'p':
+                self.stack.pop()
+            self.stack.pop()  # The browser closes the <p> here
+        elif tag in ('li', 'dt', 'dd', 'p', 'tr', 'td', 'th') and self.stack and self.stack[-1][0] == tag:
+            self.stack.pop()  # An omitted end tag, as in <li>a<li>b
+
+        if attrs.get('id'):
+            if attrs['id'] in self.ids:
+                self.report(f"duplicate id \"{attrs['id']}\", first used on line {self.ids[attrs['id']]}")
+            else:
+                self.ids[attrs['id']] = position[0]
+        if tag == 'img' and 'alt' not in attrs:
+            self.report(f"<img src=\"{attrs.get('src', '')}\"> has no alt text")
+        if tag == 'html' and not attrs.get('lang'):
+            self.report("<html> has no lang attribute")
+        if re.fullmatch(r'h[1-6]', tag):
+            level = int(tag[1])
+            if level > self.heading + 1:
+                self.report(f"heading level skipped: <{tag}> after <h{self.heading}>" if self.heading
+                            else f"first heading is <{tag}>, not <h1>")
+            self.heading = level
+
+        if tag not in VOID_ELEMENTS:
+            self.stack.append([tag, position[0], position[1]])
+            if tag in RAW_TEXT:
+                self.raw_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS and self.stack and self.stack[-1][0] == tag:
+            self.stack.pop()
+            if tag in RAW_TEXT:
+                self.raw_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        open_tags = [open_tag for open_tag, _, _ in self.stack]
+        if tag not in open_tags:
+            self.report(f"stray </{tag}>")
+            return
+        while self.stack:
+            open_tag, line, column = self.stack.pop()
+            if open_tag in RAW_TEXT:
+                self.raw_depth -= 1
+            if open_tag == tag:
+                return
+            if open_tag not in OPTIONAL_END:
+                self.report(f"<{open_tag}> is not closed before </{tag}>", (line, column))
+
+    def handle_data(self, data):
+        if not self.raw_depth:
+            for match in MARKDOWN_RE.finditer(data):
+                self.report(f"literal Markdown {match.group(0)!r}")
+
+    def close(self):
+        super().close()
+        for open_tag, line, column in self.stack:
+            if open_tag not in OPTIONAL_END and open_tag not in ('html', 'head', 'body'):
+                self.report(f"<{open_tag}> is never closed", (line, column))
+
+
+def validate_page(content):
+    """Validates one HTML page. Runs in a worker process."""
+    validator = _Validator()
+    validator.feed(content)
+    validator.close()
+    return {'problems': validator.problems}
+
+
+def validate_site(output_dir, workers=None):
+    """Validates every HTML page in output_dir and returns "file:line:col: message" strings."""
+    html_paths = sorted(path for path in emitted_paths(output_dir) if path.endswith('.html'))
+    pages, validated = scan_pages(output_dir, html_paths, load_state('validate', {}), validate_page, workers)
+    save_state('validate', pages)
+    print(f"Validation: checked {len(validated)} of {len(html_paths)} pages")
+    return [f"{path.lstrip('/')}:{line}:{column}: {message}"
+            for path in html_paths for line, column, message in pages[path]['problems']]
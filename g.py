@@ -1,40 +1,488 @@
+import argparse
+import json
 import os
 import io # Used for handling string as file
+import re
+import sys
+import tarfile
+import unicodedata
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from string import Template
+
+# The generator scripts shipped with every scaffolded site live next to this file
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.github', 'scripts')
+ARCHIVE_DATE = (1980, 1, 1, 0, 0, 0) # Fixed timestamp so identical scaffolds give identical archives
+IO_WORKERS = 8 # Threads writing scaffold files; 0 writes each file before create_file returns
+
+class ScaffoldFS:
+    """Where create_project_structure writes its files. Subclasses implement write_bytes()."""
+    log_to_stderr = False
+
+    def __init__(self, root_dir, verbose=True):
+        self.root_dir = root_dir
+        self.verbose = verbose
+
+    def log(self, message):
+        if self.verbose:
+            print(message, file=sys.stderr if self.log_to_stderr else sys.stdout)
+
+    def write_bytes(self, path, data):
+        raise NotImplementedError
+
+    def flush(self):
+        """Waits until every file written so far is complete."""
+
+    def create_file(self, path, content):
+        """Creates a file with the given content."""
+        self.write_bytes(path, content.encode('utf-8'))
+        self.log(f"Created: {path}")
+
+    def create_placeholder_image(self, path, content=None):
+        """Creates a simple placeholder image file (can be a tiny transparent GIF or just a dummy file)."""
+        # Using a tiny transparent GIF base64 encoded as a placeholder
+        # This is a very small, valid GIF image (1x1 pixel, transparent)
+        gif_data = b'R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=='
+        try:
+            self.write_bytes(path, io.BytesIO(gif_data).getvalue())
+            self.log(f"Created placeholder image: {path}")
+        except Exception as e:
+            self.log(f"Could not create placeholder image {path}: {e}")
+
+class DiskFS(ScaffoldFS):
+    """Writes the scaffold below root_dir on disk, without changing the working directory.
+
+    Files are written on a small thread pool, so on slow or network disks the
+    writes overlap instead of waiting on each other. With workers=0 every file
+    is written before write_bytes returns.
+    """
+
+    def __init__(self, root_dir, verbose=True, workers=IO_WORKERS):
+        super().__init__(root_dir, verbose)
+        self.workers = workers
+        self.executor = None # Started by the first write, stopped by flush()
+        self.pending = []
+
+    def _write(self, path, data):
+        full_path = os.path.join(self.root_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(data)
+
+    def write_bytes(self, path, data):
+        if not self.workers:
+            self._write(path, data)
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix='scaffold-io')
+        self.pending.append(self.executor.submit(self._write, path, data))
+
+    def flush(self):
+        if self.executor is None:
+            return
+        self.executor.shutdown()
+        self.executor = None
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result() # Raises the error of a failed write
+
+class MemoryFS(ScaffoldFS):
+    """Keeps the whole scaffold in memory as {path: bytes}, e.g. for archives, tests and benchmarks."""
+    log_to_stderr = True # stdout may be carrying the archive
+
+    def __init__(self, root_dir, verbose=False):
+        super().__init__(root_dir, verbose)
+        self.files = {}
+
+    def write_bytes(self, path, data):
+        self.files[path] = data
+
+    def write_archive(self, out, archive_format='zip'):
+        """Streams the scaffold as a zip or tar.gz archive to a binary file object (which may be stdout)."""
+        if archive_format == 'zip':
+            with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for path, data in self.files.items():
+                    info = zipfile.ZipInfo(f"{self.root_dir}/{path}", date_time=ARCHIVE_DATE)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    archive.writestr(info, data)
+        elif archive_format == 'tar':
+            with tarfile.open(fileobj=out, mode='w|gz') as archive:
+                for path, data in self.files.items():
+                    info = tarfile.TarInfo(f"{self.root_dir}/{path}")
+                    info.size = len(data)
+                    info.mode = 0o644
+                    archive.addfile(info, io.BytesIO(data))
+        else:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+
+# Content templates, compiled once per process and shared by every scaffolded site
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="sv">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    <meta name="description" content="$description">
+    <link rel="stylesheet" href="/assets/css/style.css">
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
+$head</head>
+<body>
+    <header>
+        <div class="container">
+            <a href="/index.html" class="logo">$logo</a>
+            <nav>
+                <ul>
+$nav
+                </ul>
+            </nav>
+        </div>
+    </header>
 
-def create_file(path, content):
-    """Creates a file with the given content."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Created: {path}")
-
-def create_placeholder_image(path, content):
-    """Creates a simple placeholder image file (can be a tiny transparent GIF or just a dummy file)."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    # Using a tiny transparent GIF base64 encoded as a placeholder
-    # This is a very small, valid GIF image (1x1 pixel, transparent)
-    gif_data = b'R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=='
-    try:
-        with open(path, 'wb') as f:
-            f.write(io.BytesIO(gif_data).getvalue())
-        print(f"Created placeholder image: {path}")
-    except Exception as e:
-        print(f"Could not create placeholder image {path}: {e}")
+$main
+
+    <footer>
+        <div class="container">
+            <p>© 2025 $company. Alla rättigheter reserverade.</p>
+            <p><a href="/contact.html">Kontakta oss</a></p>
+        </div>
+    </footer>
+
+    <script src="/assets/js/main.js"></script>
+</body>
+</html>
+""")
+NAV_ITEM_TEMPLATE = Template("""                    <li><a href="$url"$active>$text</a></li>""")
+GRID_ITEM_TEMPLATE = Template("""                    <div class="grid-item">
+                        <img src="$image" alt="$alt">
+                        <h2>$title</h2>
+                        <p>$text</p>
+                        <a href="$url" class="cta-button-small">Läs mer</a>
+                    </div>""")
+HIGHLIGHT_ITEM_TEMPLATE = Template("""                    <div class="grid-item">
+                        <img src="$image" alt="$alt">
+                        <h3>$title</h3>
+                        <p>$text</p>
+                        <a href="$url" class="cta-button-small">$link</a>
+                    </div>""")
+ARTICLE_TEMPLATE = Template("""---
+title: "$title på $place"
+description: "Allt du behöver veta om vår $subject."
+image: "/assets/img/$subject.jpg"
+date: "2025-05-21"
+author: "$place Teamet"
+category: "$category"
+tags: "$tags"
+---
+
+# $title på $place
+
+Här kan du läsa mer om vår verksamhet med $subject. Vi är stolta över att odla $subject med omsorg och respekt för naturen.
+
+## Våra Metoder
+
+Vi använder hållbara metoder för att säkerställa att våra $subject är av högsta kvalitet och producerade på ett miljövänligt sätt.
+
+## Säsong och Tillgång
+
+$title är i säsong under [Ange månader]. Under denna period kan du [beskriv vad man kan göra, t.ex. självplocka eller köpa i gårdsbutiken].
+
+---
+
+*Besök oss gärna för att se mer!*
+""")
+# template.html renders the articles in docs/, template.en.html those in docs/en/
+ARTICLE_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="$lang">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }} - $site_name</title>
+    <meta name="description" content="{{ description }}">
+    <link rel="alternate" type="application/atom+xml" title="$site_name" href="/feed.xml">
+    {%- for alternate in alternates %}
+    <link rel="alternate" hreflang="{{ alternate.hreflang }}" href="{{ alternate.url }}">
+    {%- endfor %}
+    <link rel="stylesheet" href="/assets/css/style.css">
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
+</head>
+<body>
+    <header>
+        <div class="container">
+            <a href="/index.html" class="logo">$logo</a>
+            <nav>
+                <ul>
+                    {% for link in nav_links %}
+                    <li><a href="{{ link.url }}" {% if link.url == current_page %}class="active"{% endif %}>{{ link.text }}</a></li>
+                    {% endfor %}
+                </ul>
+            </nav>
+        </div>
+    </header>
+
+    <main>
+        <div class="container">
+            <article>
+                {{ content | safe }} {# 'safe' is crucial for Jinja2 to render HTML from Markdown #}
+            </article>
+            {% block related %}{% if related_articles %}
+            <aside class="related-articles">
+                <h2>$related_heading</h2>
+                <ul>
+                    {% for article in related_articles %}
+                    <li><a href="{{ article.url }}">{{ article.title }}</a></li>
+                    {% endfor %}
+                </ul>
+            </aside>
+            {% endif %}{% endblock %}
+        </div>
+    </main>
+
+    <footer>
+        <div class="container">
+            <p>© {{ now().year }} $company. $rights</p>
+            <p><a href="/contact.html">$contact_text</a></p>
+        </div>
+    </footer>
+
+    <script src="/assets/js/main.js"></script>
+</body>
+</html>
+"""
+ARTICLE_TEMPLATE_STRINGS = {
+    "template.html": {"lang": "sv", "related_heading": "Relaterade artiklar",
+                      "rights": "Alla rättigheter reserverade.", "contact_text": "Kontakta oss"},
+    "template.en.html": {"lang": "en", "related_heading": "Related articles",
+                         "rights": "All rights reserved.", "contact_text": "Contact us"},
+}
+
+INDEX_DESCRIPTION = "Upptäck $company – din lokala källa för färska frukter, grönsaker, honung och ett mysigt gårdskafé."
+
+# The Ådala site. Manifests for other farms only need to override what differs.
+DEFAULT_MANIFEST = {
+    "root_dir": "adalapages",
+    "site_name": "Ådala Frukt och Grönt",
+    "logo": "Ådala Frukt & Grönt",
+    "company": "Ådala Frukt och Grönt AB",
+    "place": "Ådala",
+    "site_url": "https://xn--dala-poa.se", # Ådala.se
+    "address": ["Ådalavägen 123", "573 XX Tranås"],
+    "directions": "Vi ligger naturskönt beläget strax utanför Tranås. Följ skyltarna från väg XX.",
+    "phone": "0123-45 67 89",
+    "email": "info@adala.se",
+    "social": [
+        {"text": "Facebook", "url": "https://www.facebook.com/adala"},
+        {"text": "Instagram", "url": "https://www.instagram.com/adala"},
+    ],
+    "nav": [
+        {"text": "Hem", "url": "/index.html"},
+        {"text": "Om $place", "url": "/about.html"},
+        {"text": "Våra Produkter", "url": "/products.html"},
+        {"text": "Café", "url": "/cafe.html"},
+        {"text": "Besök Oss", "url": "/contact.html"},
+    ],
+    "product_lines": [
+        {"title": "Biodling & Honung", "image": "/assets/img/biodling-thumb.jpg", "alt": "Bikupa och bin",
+         "text": "Våra flitiga bin producerar en fantastisk, nyslungad honung med smak av traktens blommor.", "url": "/biodling.html"},
+        {"title": "Äpplen", "image": "/assets/img/appeltra-thumb.jpg", "alt": "Äppelträd med äpplen",
+         "text": "Från våra äppelträd skördar vi flera sorters äpplen som passar perfekt för både att äta som de är eller till must och bakning.", "url": "/appeltra.html"},
+        {"title": "Hallon", "image": "/assets/img/hallon-thumb.jpg", "alt": "Hallonbuskar",
+         "text": "Under sommaren kan du njuta av söta, saftiga hallon. Perfekta för självplock!", "url": "/hallon.html"},
+        {"title": "Blåbär", "image": "/assets/img/blabar-thumb.jpg", "alt": "Blåbärsbuskar",
+         "text": "Våra blåbärsbuskar ger riklig skörd av hälsobringande blåbär som är underbara att plocka.", "url": "/blabar.html"},
+        {"title": "Grönsaker", "image": "/assets/img/gronsaker-thumb.jpg", "alt": "Grönsaksland",
+         "text": "Ett varierat utbud av säsongsgrönsaker, odlade ekologiskt och med kärlek.", "url": "/gronsaksodling.html"},
+    ],
+    # The "Vad vi erbjuder" cards on the start page
+    "highlights": [
+        {"title": "Biodling & Honung", "image": "/assets/img/biodling-thumb.jpg", "alt": "Bikupa och bin",
+         "text": "Vår egen honung från glada bin som pollinerar våra odlingar.", "url": "/biodling.html", "link": "Läs mer"},
+        {"title": "Fruktodlingar", "image": "/assets/img/appeltra-thumb.jpg", "alt": "Äppelträd med äpplen",
+         "text": "Äpplen, hallon och blåbär – direkt från våra buskar och träd.", "url": "/products.html", "link": "Se vårt utbud"},
+        {"title": "Grönsaksland", "image": "/assets/img/gronsaker-thumb.jpg", "alt": "Grönsaksland",
+         "text": "Säsongsbetonade grönsaker odlade med omsorg och respekt för naturen.", "url": "/gronsaksodling.html", "link": "Upptäck grönsakerna"},
+        {"title": "$place Café", "image": "/assets/img/cafe-thumb.jpg", "alt": "Caféinteriör",
+         "text": "Enkel fika och avkoppling i en charmig lantlig miljö.", "url": "/cafe.html", "link": "Besök caféet"},
+    ],
+    "articles": [
+        {"file": "article-om-oss.md", "body": """---
+title: "Om $company"
+description: "Lär dig mer om vår historia, vision och hållbarhetsarbete på $place."
+image: "/assets/img/gard.jpg"
+date: "2025-05-21"
+author: "$place Teamet"
+category: "Om oss"
+tags: "hållbarhet, historia"
+---
+
+# Om $company
+
+Välkommen till $company, en plats där passion för naturen och hållbarhet går hand i hand med kärleken till god mat och dryck. Vi är en familjeägd gård som har odlat och vårdat marken i generationer, med rötter djupt i den lokala myllan.
+
+## Vår Historia och Vision
+
+$site_name grundades med en enkel men kraftfull vision: att förse lokalsamhället med färska, närproducerade råvaror av högsta kvalitet, direkt från vår gård. Det som började som en liten odling har vuxit till en mångfacetterad verksamhet som omfattar allt från biodling och äppelodling till grönsaksland och ett mysigt gårdskafé.
+
+Vi strävar efter att vara en förebild inom hållbar odling och ett levande bevis på att det går att driva ett framgångsrikt lantbruk i samklang med naturen. Varje beslut vi fattar, från hur vi sköter våra grödor till hur vi väljer våra samarbetspartners, är genomsyrat av ett ekologiskt tänkande och en djup respekt för miljön.
+
+## Vårt Hållbarhetsarbete
+
+På $place är hållbarhet inte bara ett modeord, det är grunden i allt vi gör.
+* **Ekologisk Odling:** Vi använder inga kemiska bekämpningsmedel eller konstgödsel. Istället förlitar vi oss på naturens egna processer och smarta odlingsmetoder för att främja biologisk mångfald och jordhälsa.
+* **Vattenförvaltning:** Vi arbetar aktivt med att optimera vår vattenförbrukning och återanvänder regnvatten när det är möjligt.
+* **Energi:** Vårt mål är att på sikt vara helt självförsörjande på förnybar energi.
+* **Biologisk Mångfald:** Vi har planterat vildängar och buskar för att locka till oss pollinerare och nyttodjur, vilket gynnar både våra grödor och den lokala ekologin.
+
+## Möt Teamet Bakom $place
+
+Vi är ett litet, men engagerat team som delar en gemensam passion för mat, odling och gästfrihet. Varje dag arbetar vi med hängivenhet för att du ska få uppleva det bästa $place har att erbjuda. Kom gärna förbi och säg hej nästa gång du besöker oss!
+"""},
+        {"file": "article-biodling.md"},
+        {"file": "article-appeltra.md"},
+        {"file": "article-hallon.md"},
+        {"file": "article-blabar.md"},
+        {"file": "article-gronsaksodling.md"},
+        {"file": "article-cafe.md", "category": "Café"},
+    ],
+}
 
+def site_manifest(overrides=None):
+    """Returns a complete manifest: DEFAULT_MANIFEST with the given keys replaced."""
+    overrides = overrides or {}
+    manifest = dict(DEFAULT_MANIFEST, **overrides)
+    if 'site_name' in overrides:
+        # A new farm name should not keep Ådala's logo, company name or directory
+        if 'logo' not in overrides:
+            manifest['logo'] = manifest['site_name']
+        if 'company' not in overrides:
+            manifest['company'] = f"{manifest['site_name']} AB"
+        if 'place' not in overrides:
+            manifest['place'] = manifest['site_name']
+        if 'root_dir' not in overrides:
+            ascii_name = unicodedata.normalize('NFKD', manifest['site_name'].lower()).encode('ascii', 'ignore').decode('ascii')
+            manifest['root_dir'] = re.sub(r'[^a-z0-9]+', '-', ascii_name).strip('-')
+        # Ådala's address and accounts become placeholders to fill in, like those in ARTICLE_TEMPLATE
+        if 'site_url' not in overrides:
+            manifest['site_url'] = f"https://{manifest['root_dir']}.example" # Reserved domain, never a real site
+        if 'address' not in overrides:
+            manifest['address'] = ["[Gatuadress]", "[Postnummer och ort]"]
+        if 'directions' not in overrides:
+            manifest['directions'] = "[Beskriv vägen till gården]"
+        if 'phone' not in overrides:
+            manifest['phone'] = '' # No number on the contact page until one is given
+        if 'email' not in overrides:
+            manifest['email'] = f"info@{manifest['site_url'].split('://', 1)[-1].strip('/')}"
+        if 'social' not in overrides:
+            manifest['social'] = []
+    if 'product_lines' in overrides and 'highlights' not in overrides:
+        # Ådala's cards link to Ådala's pages; a farm with its own product lines shows those instead
+        manifest['highlights'] = [dict(product, link="Läs mer") for product in manifest['product_lines']]
+    return manifest
+
+@lru_cache(maxsize=None)
+def _compiled(text):
+    return Template(text)
+
+def render_text(manifest, text, **extra):
+    """Fills in $site_name, $logo, $company, $place, $site_url (and any extra names) in a content template."""
+    return _compiled(text).safe_substitute(
+        extra, site_name=manifest['site_name'], logo=manifest['logo'], company=manifest['company'], place=manifest['place'],
+        site_url=manifest['site_url'],
+    )
+
+def yaml_string(value):
+    """Quotes a value for _config.yml, which is read by the YAML subset in siteconfig.py (no escapes)."""
+    return f"'{value}'" if '"' in value else f'"{value}"'
+
+def site_config(manifest):
+    """Returns _config.yml for a site: the name, URL and navigation generate_pages.py builds with."""
+    lines = [
+        f"title: {yaml_string(manifest['site_name'])}",
+        f"description: {yaml_string(render_text(manifest, INDEX_DESCRIPTION))}",
+        f"url: {yaml_string(manifest['site_url'])}",
+        "nav: # Navigeringen på sidorna som byggs från docs/",
+    ]
+    for link in manifest['nav']:
+        lines.append(f"  - text: {yaml_string(render_text(manifest, link['text']))}")
+        lines.append(f"    url: {yaml_string(link['url'].lstrip('/'))}")
+    return '\n'.join(lines) + '\n'
+
+def contact_details(manifest):
+    """Returns the $address, $directions, $phone, $email and $social parts of the contact page."""
+    phone = manifest['phone']
+    tel = re.sub(r'[^0-9+]', '', phone)
+    if tel.startswith('0'):
+        tel = '+46' + tel[1:] # Swedish numbers are written with a leading 0 instead of the country code
+    social = '\n'.join(f'                    <li><a href="{link["url"]}" target="_blank">{link["text"]}</a></li>'
+                        for link in manifest['social'])
+    return {
+        'address': '<br>\n                '.join(manifest['address']),
+        'directions': manifest['directions'],
+        'phone': f"""
+                    <li><strong>Telefon:</strong> <a href="tel:{tel}">{phone}</a></li>""" if phone else '',
+        'email': manifest['email'],
+        'social': f"""
+
+                <h2>Följ oss i sociala medier</h2>
+                <p>Håll dig uppdaterad med det senaste från {manifest['place']}! Följ oss på:</p>
+                <ul>
+{social}
+                </ul>""" if social else '',
+    }
 
-def create_project_structure(root_dir="adalapages"):
-    """Creates the entire project directory and files."""
-    print(f"Creating project '{root_dir}'...")
+def render_page(manifest, filename, title, description, main, head=''):
+    """Renders a hand-written page into the shared PAGE_TEMPLATE."""
+    nav = '\n'.join(
+        NAV_ITEM_TEMPLATE.substitute(link, text=render_text(manifest, link['text']),
+                                     active=' class="active"' if link['url'] == f"/{filename}" else '')
+        for link in manifest['nav']
+    )
+    product_grid = '\n'.join(GRID_ITEM_TEMPLATE.substitute(product) for product in manifest['product_lines'])
+    highlights = '\n'.join(HIGHLIGHT_ITEM_TEMPLATE.substitute(card, title=render_text(manifest, card['title']))
+                           for card in manifest['highlights'])
+    page = manifest.get('pages', {}).get(filename, {})
+    return PAGE_TEMPLATE.substitute(
+        title=render_text(manifest, page.get('title', title)),
+        head=page.get('head', head),
+        description=render_text(manifest, page.get('description', description)),
+        logo=manifest['logo'],
+        company=manifest['company'],
+        nav=nav,
+        main=render_text(manifest, page.get('main', main), product_grid=product_grid, highlights=highlights,
+                                **contact_details(manifest)),
+    )
 
-    # Create root directory
-    os.makedirs(root_dir, exist_ok=True)
-    os.chdir(root_dir) # Change into the root directory for easier path management
+@lru_cache(maxsize=None)
+def generator_scripts():
+    """Returns [(filename, source)] for the generator scripts, read once per process."""
+    scripts = []
+    for script in sorted(os.listdir(SCRIPTS_DIR)):
+        if script.endswith('.py'):
+            with open(os.path.join(SCRIPTS_DIR, script), 'r', encoding='utf-8') as f:
+                scripts.append((script, f.read()))
+    return scripts
+
+
+def create_project_structure(root_dir="adalapages", fs=None, manifest=None, io_workers=IO_WORKERS):
+    """Creates the entire project directory and files.
+
+    Files go to `fs`, which defaults to a DiskFS writing below root_dir. Pass a
+    MemoryFS to build the scaffold without touching the disk. Site-specific
+    content comes from `manifest` (see DEFAULT_MANIFEST). Returns the fs.
+    """
+    if fs is None:
+        fs = DiskFS(root_dir, workers=io_workers)
+    manifest = site_manifest(manifest)
+    fs.log(f"Creating project '{root_dir}'...")
 
     # 1. GitHub Actions Workflow
-    create_file(
+    fs.create_file(
         ".github/workflows/build-and-deploy.yml",
-        """name: Deploy Ådala.se to GitHub Pages
+        render_text(manifest, """name: Deploy $site_name to GitHub Pages
 
 on:
   push:
@@ -54,15 +502,17 @@ jobs:
         python-version: '3.x'
 
     - name: Install Markdown parser and templating engine
-      run: pip install markdown jinja2 # markdown for parsing, jinja2 for templating HTML
+      run: pip install markdown jinja2 numpy # markdown for parsing, jinja2 for templating HTML, numpy for related articles
 
     - name: Generate HTML from Markdown
-      run: python ./.github/scripts/generate_pages.py # Executes our custom script
+      run: |
+        export SOURCE_DATE_EPOCH=$(git log -1 --format=%ct) # Same commit, same bytes
+        python ./.github/scripts/generate_pages.py # Executes our custom script, writes the site to _site/
 
     - name: Upload artifact
       uses: actions/upload-pages-artifact@v3
       with:
-        path: './' # Upload the entire repository root as the artifact, containing generated HTML files
+        path: './_site' # Upload only the generated site, not the sources
 
   deploy:
     needs: build
@@ -77,179 +527,32 @@ jobs:
       - name: Deploy to GitHub Pages
         id: deployment
         uses: actions/deploy-pages@v4
-"""
-    )
-
-    # 2. Python Script for Markdown rendering
-    create_file(
-        ".github/scripts/generate_pages.py",
-        """import os
-import markdown
-from jinja2 import Environment, FileSystemLoader
-from datetime import datetime
-
-# Define paths
-SOURCE_DIR = 'docs'
-OUTPUT_DIR = '.' # Output to root for GitHub Pages
-TEMPLATE_FILE = 'template.html'
-NAV_LINKS = [
-    {"text": "Hem", "url": "index.html"},
-    {"text": "Om Ådala", "url": "about.html"},
-    {"text": "Våra Produkter", "url": "products.html"},
-    {"text": "Café", "url": "cafe.html"},
-    {"text": "Besök Oss", "url": "contact.html"},
-]
-
-def generate_pages():
-    # Setup Jinja2 environment
-    env = Environment(loader=FileSystemLoader('.'))
-    # Add now() function to Jinja2 environment for dynamic year in footer
-    env.globals['now'] = datetime.now
-    template = env.get_template(TEMPLATE_FILE)
-
-    # Process Markdown files
-    for filename in os.listdir(SOURCE_DIR):
-        if filename.endswith(".md"):
-            filepath = os.path.join(SOURCE_DIR, filename)
-
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Separate front matter (metadata) from content
-            # Simple parsing: assumes front matter is at the very beginning, enclosed by ---
-            parts = content.split('---', 2)
-            if len(parts) > 2:
-                front_matter_str = parts[1]
-                md_content = parts[2]
-                metadata = parse_front_matter(front_matter_str)
-            else:
-                md_content = content
-                metadata = {}
-
-            # Convert Markdown to HTML
-            html_content = markdown.markdown(md_content, extensions=['fenced_code', 'tables'])
-
-            # Determine output filename
-            # Example: article-biodling.md -> biodling.html
-            output_filename = filename.replace('article-', '').replace('.md', '.html')
-
-            # Render HTML using template
-            rendered_html = template.render(
-                title=metadata.get('title', 'Ådala Frukt och Grönt'),
-                description=metadata.get('description', 'Välkommen till Ådala Frukt och Grönt!'),
-                content=html_content,
-                nav_links=NAV_LINKS,
-                current_page=output_filename
-            )
-
-            # Save the new HTML file
-            output_filepath = os.path.join(OUTPUT_DIR, output_filename)
-            with open(output_filepath, 'w', encoding='utf-8') as f:
-                f.write(rendered_html)
-            print(f"Generated {output_filepath}")
-
-    # Ensure main static pages exist, creating them from template if not
-    static_pages = ['index.html', 'about.html', 'cafe.html', 'contact.html', 'products.html', '404.html']
-    for page in static_pages:
-        # Check if the page was *not* generated from a Markdown file
-        if not os.path.exists(os.path.join(OUTPUT_DIR, page)):
-             # Create a very basic version for testing. In a real scenario, these would have specific content.
-             # This part will be handled by the manual creation of index.html etc. below,
-             # so this loop primarily ensures that if new static pages are added to NAV_LINKS, they get a placeholder.
-             # For the current setup, we create the content for these files explicitly later.
-             pass
-
-def parse_front_matter(front_matter_str):
-    metadata = {}
-    for line in front_matter_str.strip().split('\\n'): # Changed to \\n for script generation
-        if ':' in line:
-            key, value = line.split(':', 1)
-            metadata[key.strip()] = value.strip().strip('"\'') # Remove quotes
-    return metadata
-
-if __name__ == '__main__':
-    generate_pages()
-"""
+""")
     )
 
+    # 2. Python Scripts for Markdown rendering, taken from this repository
+    for script, source in generator_scripts():
+        fs.create_file(f".github/scripts/{script}", source)
 
     # 3. Example Markdown Articles
-    create_file(
-        "docs/article-om-oss.md",
-        """---
-title: "Om Ådala Frukt och Grönt AB"
-description: "Lär dig mer om vår historia, vision och hållbarhetsarbete på Ådala."
-image: "/assets/img/adalagard.jpg"
-date: "2025-05-21"
-author: "Ådala Teamet"
----
-
-# Om Ådala Frukt och Grönt AB
-
-Välkommen till Ådala Frukt och Grönt AB, en plats där passion för naturen och hållbarhet går hand i hand med kärleken till god mat och dryck. Vi är en familjeägd gård som har odlat och vårdat marken i generationer, med rötter djupt i den lokala myllan.
-
-## Vår Historia och Vision
-
-Ådala Frukt och Grönt grundades med en enkel men kraftfull vision: att förse lokalsamhället med färska, närproducerade råvaror av högsta kvalitet, direkt från vår gård. Det som började som en liten odling har vuxit till en mångfacetterad verksamhet som omfattar allt från biodling och äppelodling till grönsaksland och ett mysigt gårdskafé.
-
-Vi strävar efter att vara en förebild inom hållbar odling och ett levande bevis på att det går att driva ett framgångsrikt lantbruk i samklang med naturen. Varje beslut vi fattar, från hur vi sköter våra grödor till hur vi väljer våra samarbetspartners, är genomsyrat av ett ekologiskt tänkande och en djup respekt för miljön.
-
-## Vårt Hållbarhetsarbete
-
-På Ådala är hållbarhet inte bara ett modeord, det är grunden i allt vi gör.
-* **Ekologisk Odling:** Vi använder inga kemiska bekämpningsmedel eller konstgödsel. Istället förlitar vi oss på naturens egna processer och smarta odlingsmetoder för att främja biologisk mångfald och jordhälsa.
-* **Vattenförvaltning:** Vi arbetar aktivt med att optimera vår vattenförbrukning och återanvänder regnvatten när det är möjligt.
-* **Energi:** Vårt mål är att på sikt vara helt självförsörjande på förnybar energi.
-* **Biologisk Mångfald:** Vi har planterat vildängar och buskar för att locka till oss pollinerare och nyttodjur, vilket gynnar både våra grödor och den lokala ekologin.
-
-## Möt Teamet Bakom Ådala
-
-Vi är ett litet, men engagerat team som delar en gemensam passion för mat, odling och gästfrihet. Varje dag arbetar vi med hängivenhet för att du ska få uppleva det bästa Ådala har att erbjuda. Kom gärna förbi och säg hej nästa gång du besöker oss!
-
----
-
-*Läs mer om våra specifika odlingar:*
-* [Biodling på Ådala](/biodling.html)
-* [Våra Äpplen](/applen.html)
-"""
-    )
-    # Create other placeholder markdown files
-    md_files = [
-        "article-biodling.md", "article-appeltra.md", "article-hallon.md",
-        "article-blabar.md", "article-gronsaksodling.md", "article-cafe.md"
-    ]
-    for md_file in md_files:
-        title = md_file.replace('article-', '').replace('.md', '').replace('-', ' ').capitalize()
-        create_file(f"docs/{md_file}", f"""---
-title: "{title} på Ådala"
-description: "Allt du behöver veta om vår {title.lower()}."
-image: "/assets/img/{title.lower()}.jpg"
-date: "2025-05-21"
-author: "Ådala Teamet"
----
-
-# {title} på Ådala
-
-Här kan du läsa mer om vår verksamhet med {title.lower()}. Vi är stolta över att odla {title.lower()} med omsorg och respekt för naturen.
-
-## Våra Metoder
-
-Vi använder hållbara metoder för att säkerställa att våra {title.lower()} är av högsta kvalitet och producerade på ett miljövänligt sätt.
-
-## Säsong och Tillgång
-
-{title} är i säsong under [Ange månader]. Under denna period kan du [beskriv vad man kan göra, t.ex. självplocka eller köpa i gårdsbutiken].
-
----
-
-*Besök oss gärna för att se mer!*
-""")
-
+    for article in manifest['articles']:
+        if 'body' in article:
+            fs.create_file(f"docs/{article['file']}", render_text(manifest, article['body']))
+            continue
+        # Placeholder articles are filled in from ARTICLE_TEMPLATE
+        title = article.get('title') or article['file'].replace('article-', '').replace('.md', '').replace('-', ' ').capitalize()
+        fs.create_file(f"docs/{article['file']}", ARTICLE_TEMPLATE.substitute(
+            title=title,
+            subject=title.lower(),
+            place=manifest['place'],
+            category=article.get('category', 'Odling'),
+            tags=article.get('tags', title.lower()),
+        ))
 
     # 4. CSS File
-    create_file(
+    fs.create_file(
         "assets/css/style.css",
-        """/* Grundläggande stil för Ådala.se */
+        render_text(manifest, """/* Grundläggande stil för $site_name */
 
 :root {
     /* Färgpalett */
@@ -490,11 +793,19 @@ footer a {
         margin-bottom: 15px;
     }
 
+    .grid-item h2,
     .grid-item h3 {
         color: var(--color-primary-green);
         margin-bottom: 10px;
     }
 
+    .grid-item h2 { /* Cards directly under the page's h1, styled like the h3 cards */
+        font-size: 1.17em;
+        border-bottom: none;
+        padding-bottom: 0;
+        margin-top: 0;
+    }
+
     .cta-button-small {
         display: inline-block;
         background-color: var(--color-primary-green);
@@ -549,13 +860,18 @@ footer a {
     background-color: var(--color-secondary-green);
 }
 
-"""
+""")
     )
 
     # 5. JavaScript File
-    create_file(
+    fs.create_file(
         "assets/js/main.js",
-        """document.addEventListener('DOMContentLoaded', function() {
+        """// Service worker från bygget (sw.js): sidor och filer fungerar även utan täckning
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('/sw.js');
+}
+
+document.addEventListener('DOMContentLoaded', function() {
     // Exempel: Markera aktiv länk i navigeringen
     const currentPath = window.location.pathname.split('/').pop();
     const navLinks = document.querySelectorAll('nav ul li a');
@@ -591,91 +907,19 @@ footer a {
 """
     )
 
-    # 6. HTML Template
-    create_file(
-        "template.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ title }} - Ådala Frukt och Grönt</title>
-    <meta name="description" content="{{ description }}">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    {% for link in nav_links %}
-                    <li><a href="{{ link.url }}" {% if link.url == current_page %}class="active"{% endif %}>{{ link.text }}</a></li>
-                    {% endfor %}
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
-        <div class="container">
-            <article>
-                {{ content | safe }} {# 'safe' is crucial for Jinja2 to render HTML from Markdown #}
-            </article>
-        </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>© {{ now().year }} Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
-        </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    # 6. HTML Templates, one per locale (see LOCALES in generate_pages.py)
+    for template_file, strings in ARTICLE_TEMPLATE_STRINGS.items():
+        fs.create_file(template_file, render_text(manifest, ARTICLE_PAGE_TEMPLATE, **strings))
 
     # 7. Index HTML
-    create_file(
-        "index.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Välkommen till Ådala Frukt och Grönt</title>
-    <meta name="description" content="Upptäck Ådala Frukt och Grönt AB – din lokala källa för färska frukter, grönsaker, honung och ett mysigt gårdskafé.">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    <li><a href="/index.html" class="active">Hem</a></li>
-                    <li><a href="/about.html">Om Ådala</a></li>
-                    <li><a href="/products.html">Våra Produkter</a></li>
-                    <li><a href="/cafe.html">Café</a></li>
-                    <li><a href="/contact.html">Besök Oss</a></li>
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
+    fs.create_file("index.html", render_page(
+        manifest, "index.html",
+        title="Välkommen till $site_name",
+        description=INDEX_DESCRIPTION,
+        main="""    <main>
         <div class="container">
             <section class="hero">
-                <h1>Välkommen till Ådala Frukt och Grönt AB</h1>
+                <h1>Välkommen till $company</h1>
                 <p>Din lokala pärla för närproducerade läckerheter direkt från gården.</p>
                 <img src="/assets/img/main-hero.jpg" alt="Färsk frukt och grönt på en gård">
                 <p>Vi erbjuder allt från söt honung till krispiga äpplen, saftiga hallon, solmogna blåbär och ett brett utbud av ekologiska grönsaker. Koppla av i vårt enkla café och njut av lugnet på landsbygden.</p>
@@ -685,152 +929,52 @@ footer a {
             <section class="highlights">
                 <h2>Vad vi erbjuder</h2>
                 <div class="grid-container">
-                    <div class="grid-item">
-                        <img src="/assets/img/biodling-thumb.jpg" alt="Bikupa och bin">
-                        <h3>Biodling & Honung</h3>
-                        <p>Vår egen honung från glada bin som pollinerar våra odlingar.</p>
-                        <a href="/biodling.html" class="cta-button-small">Läs mer</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/appeltra-thumb.jpg" alt="Äppelträd med äpplen">
-                        <h3>Fruktodlingar</h3>
-                        <p>Äpplen, hallon och blåbär – direkt från våra buskar och träd.</p>
-                        <a href="/products.html" class="cta-button-small">Se vårt utbud</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/gronsaker-thumb.jpg" alt="Grönsaksland">
-                        <h3>Grönsaksland</h3>
-                        <p>Säsongsbetonade grönsaker odlade med omsorg och respekt för naturen.</p>
-                        <a href="/gronsaksodling.html" class="cta-button-small">Upptäck grönsakerna</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/cafe-thumb.jpg" alt="Caféinteriör">
-                        <h3>Ådala Café</h3>
-                        <p>Enkel fika och avkoppling i en charmig lantlig miljö.</p>
-                        <a href="/cafe.html" class="cta-button-small">Besök caféet</a>
-                    </div>
+$highlights
                 </div>
             </section>
         </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>© 2025 Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
-        </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    </main>""",
+    ))
 
     # 8. About HTML
-    create_file(
-        "about.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Om Ådala - Ådala Frukt och Grönt</title>
-    <meta name="description" content="Lär dig mer om vår historia, vision och hållbarhetsarbete på Ådala.">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    <li><a href="/index.html">Hem</a></li>
-                    <li><a href="/about.html" class="active">Om Ådala</a></li>
-                    <li><a href="/products.html">Våra Produkter</a></li>
-                    <li><a href="/cafe.html">Café</a></li>
-                    <li><a href="/contact.html">Besök Oss</a></li>
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
+    fs.create_file("about.html", render_page(
+        manifest, "about.html",
+        title="Om $place - $site_name",
+        description="Lär dig mer om vår historia, vision och hållbarhetsarbete på $place.",
+        main="""    <main>
         <div class="container">
             <article>
-                <h1>Om Ådala Frukt och Grönt AB</h1>
-                <p>Ådala Frukt och Grönt AB är mer än bara en gård – det är ett arv, en passion och ett åtagande för hållbarhet. Vår resa började för flera generationer sedan, när våra förfäder först bruka den frodiga jorden här i Ådala.</p>
-                <img src="/assets/img/adalagard.jpg" alt="Ådala Gård">
+                <h1>Om $company</h1>
+                <p>$company är mer än bara en gård – det är ett arv, en passion och ett åtagande för hållbarhet. Vår resa började för flera generationer sedan, när våra förfäder först bruka den frodiga jorden här i $place.</p>
+                <img src="/assets/img/gard.jpg" alt="$place Gård">
                 <h2>Vår Vision</h2>
                 <p>Vår vision är att vara en plats där människor kan återknyta kontakten med naturen, förstå var maten kommer ifrån och njuta av äkta smaker. Vi strävar efter att odla med respekt för jorden och dess ekosystem, och att inspirera andra till en mer hållbar livsstil.</p>
                 <h2>Hållbarhet i Praktiken</h2>
-                <p>På Ådala Frukt och Grönt tar vi hållbarhet på allvar. Vi arbetar aktivt med:
+                <p>På $site_name tar vi hållbarhet på allvar. Vi arbetar aktivt med:</p>
                 <ul>
-                    <li>**Ekologisk odling:** Inga kemiska bekämpningsmedel eller konstgödsel.</li>
-                    <li>**Vattenhushållning:** Effektiv bevattning och insamling av regnvatten.</li>
-                    <li>**Biologisk mångfald:** Skapa livsmiljöer för pollinerare och nyttodjur.</li>
-                    <li>**Korta led:** Minimera transporter genom att sälja direkt från gården och till lokala butiker.</li>
+                    <li><strong>Ekologisk odling:</strong> Inga kemiska bekämpningsmedel eller konstgödsel.</li>
+                    <li><strong>Vattenhushållning:</strong> Effektiv bevattning och insamling av regnvatten.</li>
+                    <li><strong>Biologisk mångfald:</strong> Skapa livsmiljöer för pollinerare och nyttodjur.</li>
+                    <li><strong>Korta led:</strong> Minimera transporter genom att sälja direkt från gården och till lokala butiker.</li>
                 </ul>
-                </p>
                 <h2>Vårt Team</h2>
-                <p>Bakom Ådala finns ett dedikerat team som delar en gemensam passion för odling och gästfrihet. Vi älskar det vi gör och ser fram emot att välkomna dig till vår gård!</p>
+                <p>Bakom $place finns ett dedikerat team som delar en gemensam passion för odling och gästfrihet. Vi älskar det vi gör och ser fram emot att välkomna dig till vår gård!</p>
             </article>
         </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>© 2025 Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
-        </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    </main>""",
+    ))
 
     # 9. Cafe HTML
-    create_file(
-        "cafe.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Ådala Café - Ådala Frukt och Grönt</title>
-    <meta name="description" content="Besök Ådala Café för en enkel fika och avkoppling i en charmig lantlig miljö.">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    <li><a href="/index.html">Hem</a></li>
-                    <li><a href="/about.html">Om Ådala</a></li>
-                    <li><a href="/products.html">Våra Produkter</a></li>
-                    <li><a href="/cafe.html" class="active">Café</a></li>
-                    <li><a href="/contact.html">Besök Oss</a></li>
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
+    fs.create_file("cafe.html", render_page(
+        manifest, "cafe.html",
+        title="$place Café - $site_name",
+        description="Besök $place Café för en enkel fika och avkoppling i en charmig lantlig miljö.",
+        main="""    <main>
         <div class="container">
             <article>
-                <h1>Välkommen till Ådala Café</h1>
+                <h1>Välkommen till $place Café</h1>
                 <p>Efter en härlig promenad bland odlingarna eller en tur i vår gårdsbutik, varför inte slå dig ner i vårt enkla men charmiga gårdskafé? Här kan du koppla av med en kopp kaffe och hembakat, ofta med ingredienser direkt från vår egen gård.</p>
-                <img src="/assets/img/cafe-interior.jpg" alt="Interiör i Ådala Café">
+                <img src="/assets/img/cafe-interior.jpg" alt="Interiör i $place Café">
                 <h2>Öppettider</h2>
                 <p>Vi har öppet:</p>
                 <ul>
@@ -851,196 +995,57 @@ footer a {
                 <a href="/contact.html" class="cta-button">Hitta till oss och kontakta oss</a>
             </article>
         </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>© 2025 Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
-        </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    </main>""",
+    ))
 
     # 10. Contact HTML
-    create_file(
-        "contact.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Kontakta Oss - Ådala Frukt och Grönt</title>
-    <meta name="description" content="Hitta till Ådala Frukt och Grönt AB eller kontakta oss med dina frågor.">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    <li><a href="/index.html">Hem</a></li>
-                    <li><a href="/about.html">Om Ådala</a></li>
-                    <li><a href="/products.html">Våra Produkter</a></li>
-                    <li><a href="/cafe.html">Café</a></li>
-                    <li><a href="/contact.html" class="active">Besök Oss</a></li>
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
+    fs.create_file("contact.html", render_page(
+        manifest, "contact.html",
+        title="Kontakta Oss - $site_name",
+        description="Hitta till $company eller kontakta oss med dina frågor.",
+        main="""    <main>
         <div class="container">
             <article>
                 <h1>Besök Oss / Kontakta Oss</h1>
                 <p>Vi ser fram emot att höra från dig eller välkomna dig till vår gård!</p>
 
-                <h2>Hitta till Ådala</h2>
-                <p>Ådala Frukt och Grönt AB<br>
-                Ådalavägen 123<br>
-                573 XX Tranås</p>
-                <p>Vi ligger naturskönt beläget strax utanför Tranås. Följ skyltarna från väg XX.</p>
+                <h2>Hitta till $place</h2>
+                <p>$company<br>
+                $address</p>
+                <p>$directions</p>
                 <img src="/assets/img/map-placeholder.png" alt="Platshållare för karta" style="max-width: 100%;">
 
                 <h2>Kontakta oss</h2>
                 <p>Har du frågor om våra produkter, caféet eller vill boka ett besök? Tveka inte att höra av dig!</p>
-                <ul>
-                    <li>**Telefon:** <a href="tel:+46123456789">0123-45 67 89</a></li>
-                    <li>**E-post:** <a href="mailto:info@adala.se">info@adala.se</a></li>
-                </ul>
-
-                <h2>Följ oss i sociala medier</h2>
-                <p>Håll dig uppdaterad med det senaste från Ådala! Följ oss på:</p>
-                <ul>
-                    <li><a href="https://www.facebook.com/adala" target="_blank">Facebook</a></li>
-                    <li><a href="https://www.instagram.com/adala" target="_blank">Instagram</a></li>
-                </ul>
+                <ul>$phone
+                    <li><strong>E-post:</strong> <a href="mailto:$email">$email</a></li>
+                </ul>$social
             </article>
         </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>© 2025 Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
-        </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    </main>""",
+    ))
 
     # 11. Products HTML
-    create_file(
-        "products.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Våra Produkter - Ådala Frukt och Grönt</title>
-    <meta name="description" content="Utforska det breda utbudet av närproducerade frukter, grönsaker och honung från Ådala Frukt och Grönt.">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    <li><a href="/index.html">Hem</a></li>
-                    <li><a href="/about.html">Om Ådala</a></li>
-                    <li><a href="/products.html" class="active">Våra Produkter</a></li>
-                    <li><a href="/cafe.html">Café</a></li>
-                    <li><a href="/contact.html">Besök Oss</a></li>
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
+    fs.create_file("products.html", render_page(
+        manifest, "products.html",
+        title="Våra Produkter - $site_name",
+        description="Utforska det breda utbudet av närproducerade frukter, grönsaker och honung från $site_name.",
+        main="""    <main>
         <div class="container">
             <article>
                 <h1>Våra Produkter</h1>
-                <p>På Ådala Frukt och Grönt är vi stolta över att kunna erbjuda en mångfald av färska, närproducerade produkter direkt från vår gård. Vårt fokus ligger på kvalitet, smak och hållbarhet.</p>
+                <p>På $site_name är vi stolta över att kunna erbjuda en mångfald av färska, närproducerade produkter direkt från vår gård. Vårt fokus ligger på kvalitet, smak och hållbarhet.</p>
 
                 <div class="grid-container">
-                    <div class="grid-item">
-                        <img src="/assets/img/biodling-thumb.jpg" alt="Bikupa och bin">
-                        <h3>Biodling & Honung</h3>
-                        <p>Våra flitiga bin producerar en fantastisk, nyslungad honung med smak av traktens blommor.</p>
-                        <a href="/biodling.html" class="cta-button-small">Läs mer</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/appeltra-thumb.jpg" alt="Äppelträd med äpplen">
-                        <h3>Äpplen</h3>
-                        <p>Från våra äppelträd skördar vi flera sorters äpplen som passar perfekt för både att äta som de är eller till must och bakning.</p>
-                        <a href="/applen.html" class="cta-button-small">Läs mer</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/hallon-thumb.jpg" alt="Hallonbuskar">
-                        <h3>Hallon</h3>
-                        <p>Under sommaren kan du njuta av söta, saftiga hallon. Perfekta för självplock!</p>
-                        <a href="/hallon.html" class="cta-button-small">Läs mer</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/blabar-thumb.jpg" alt="Blåbärsbuskar">
-                        <h3>Blåbär</h3>
-                        <p>Våra blåbärsbuskar ger riklig skörd av hälsobringande blåbär som är underbara att plocka.</p>
-                        <a href="/blabar.html" class="cta-button-small">Läs mer</a>
-                    </div>
-                    <div class="grid-item">
-                        <img src="/assets/img/gronsaker-thumb.jpg" alt="Grönsaksland">
-                        <h3>Grönsaker</h3>
-                        <p>Ett varierat utbud av säsongsgrönsaker, odlade ekologiskt och med kärlek.</p>
-                        <a href="/gronsaksodling.html" class="cta-button-small">Läs mer</a>
-                    </div>
+$product_grid
                 </div>
             </article>
         </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>© 2025 Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
-        </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    </main>""",
+    ))
 
-    # 12. 404 HTML
-    create_file(
-        "404.html",
-        """<!DOCTYPE html>
-<html lang="sv">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sidan kunde inte hittas (404) - Ådala Frukt och Grönt</title>
-    <meta name="description" content="Sidan du sökte kunde inte hittas på Ådala Frukt och Grönt AB.">
-    <link rel="stylesheet" href="/assets/css/style.css">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Lato:wght@400;700&family=Merriweather:wght@400;700&display=swap" rel="stylesheet">
-    <style>
+    # 12. 404 and offline HTML
+    error_head = """    <style>
         .error-container {
             text-align: center;
             padding: 50px 20px;
@@ -1072,24 +1077,13 @@ footer a {
             background-color: var(--color-secondary-green);
         }
     </style>
-</head>
-<body>
-    <header>
-        <div class="container">
-            <a href="/index.html" class="logo">Ådala Frukt & Grönt</a>
-            <nav>
-                <ul>
-                    <li><a href="/index.html">Hem</a></li>
-                    <li><a href="/about.html">Om Ådala</a></li>
-                    <li><a href="/products.html">Våra Produkter</a></li>
-                    <li><a href="/cafe.html">Café</a></li>
-                    <li><a href="/contact.html">Besök Oss</a></li>
-                </ul>
-            </nav>
-        </div>
-    </header>
-
-    <main>
+"""
+    fs.create_file("404.html", render_page(
+        manifest, "404.html",
+        title="Sidan kunde inte hittas (404) - $site_name",
+        description="Sidan du sökte kunde inte hittas på $company.",
+        head=error_head,
+        main="""    <main>
         <div class="container">
             <div class="error-container">
                 <h1>404</h1>
@@ -1098,31 +1092,34 @@ footer a {
                 <a href="/index.html">Gå till startsidan</a>
             </div>
         </div>
-    </main>
-
-    <footer>
+    </main>""",
+    ))
+    fs.create_file("offline.html", render_page(
+        manifest, "offline.html",
+        title="Ingen anslutning - $site_name",
+        description="Sidan kan inte visas utan internetanslutning.",
+        head=error_head,
+        main="""    <main>
         <div class="container">
-            <p>© 2025 Ådala Frukt och Grönt AB. Alla rättigheter reserverade.</p>
-            <p><a href="/contact.html">Kontakta oss</a></p>
+            <div class="error-container">
+                <h1>Ingen anslutning</h1>
+                <p>Du verkar vara offline, och den här sidan har inte sparats på din enhet. Sidor du redan har besökt går att läsa ändå.</p>
+                <a href="/index.html">Gå till startsidan</a>
+            </div>
         </div>
-    </footer>
-
-    <script src="/assets/js/main.js"></script>
-</body>
-</html>
-"""
-    )
+    </main>""",
+    ))
 
     # 13. README.md
-    create_file(
+    fs.create_file(
         "README.md",
-        """# Ådala Frukt och Grönt AB - Webbplats
+        render_text(manifest, """# $company - Webbplats
 
-Detta repository innehåller webbplatsen för Ådala Frukt och Grönt AB, byggd för att vara enkel att hantera och hosta via GitHub Pages.
+Detta repository innehåller webbplatsen för $company, byggd för att vara enkel att hantera och hosta via GitHub Pages.
 
 ## Projektmål
 
-Syftet med denna webbplats är att presentera Ådalas verksamheter – biodling, äppelträd, hallonbuskar, blåbärsbuskar, grönsaksodling och ett enkelt café – på ett trevligt och användarvänligt sätt.
+Syftet med denna webbplats är att presentera verksamheterna på $place – biodling, äppelträd, hallonbuskar, blåbärsbuskar, grönsaksodling och ett enkelt café – på ett trevligt och användarvänligt sätt.
 
 ## Teknisk Stack
 
@@ -1133,3 +1130,75 @@ Syftet med denna webbplats är att presentera Ådalas verksamheter – biodling,
 
 ## Mappstruktur
 
+* `.github/workflows/` – GitHub Actions-workflow som bygger och publicerar webbplatsen.
+* `.github/scripts/` – Python-skript som genererar HTML från Markdown.
+* `docs/` – Artiklar i Markdown. Engelska översättningar läggs i `docs/en/` med samma filnamn.
+* `assets/` – CSS, JavaScript och bilder.
+* `template.html` – Mall för sidor som genereras från Markdown (`template.en.html` för engelska sidor).
+* `_config.yml` – Webbplatsens namn, adress (`url`) och navigering, som generatorn läser.
+""")
+    )
+
+    # 14. Site configuration read by generate_pages.py
+    fs.create_file("_config.yml", site_config(manifest))
+
+    fs.flush()
+    fs.log(f"Project '{root_dir}' created.")
+    return fs
+
+def scaffold_site(manifest, out_dir, archive_format=None, io_workers=IO_WORKERS):
+    """Scaffolds one site from a manifest into out_dir, as a directory or a single archive."""
+    manifest = site_manifest(manifest)
+    root_dir = manifest['root_dir']
+    if archive_format:
+        fs = create_project_structure(root_dir, MemoryFS(root_dir), manifest)
+        path = os.path.join(out_dir, f"{root_dir}.{'zip' if archive_format == 'zip' else 'tar.gz'}")
+        with open(path, 'wb') as f:
+            fs.write_archive(f, archive_format)
+        return path
+    path = os.path.join(out_dir, root_dir)
+    create_project_structure(root_dir, DiskFS(path, verbose=False, workers=io_workers), manifest)
+    return path
+
+def scaffold_sites(manifests, out_dir, archive_format=None, workers=None, io_workers=IO_WORKERS):
+    """Scaffolds many sites in one run, spread over a pool of worker processes."""
+    os.makedirs(out_dir, exist_ok=True)
+    work = partial(scaffold_site, out_dir=out_dir, archive_format=archive_format, io_workers=io_workers)
+    chunksize = max(1, len(manifests) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(work, manifests, chunksize=chunksize))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaffold the Ådala.se site.")
+    parser.add_argument('root_dir', nargs='?', default='adalapages')
+    parser.add_argument('--archive', help="write a zip/tar.gz archive to this path ('-' for stdout) instead of to disk")
+    parser.add_argument('--format', choices=['zip', 'tar'], help="archive format (default: from the file name, zip for stdout)")
+    parser.add_argument('--manifest', help="JSON file with one site manifest or a list of them; sites are written below root_dir")
+    parser.add_argument('--workers', type=int, help="worker processes for --manifest (default: one per CPU)")
+    parser.add_argument('--sequential-io', action='store_true', help="write files one at a time instead of on a thread pool")
+    args = parser.parse_args(argv)
+
+    io_workers = 0 if args.sequential_io else IO_WORKERS
+    if args.manifest:
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            manifests = json.load(f)
+        if isinstance(manifests, dict):
+            manifests = [manifests]
+        paths = scaffold_sites(manifests, args.root_dir, args.format, args.workers, io_workers)
+        print(f"Scaffolded {len(paths)} sites in {args.root_dir}")
+        return
+
+    if not args.archive:
+        create_project_structure(args.root_dir, io_workers=io_workers)
+        return
+
+    archive_format = args.format or ('tar' if args.archive.endswith(('.tar.gz', '.tgz')) else 'zip')
+    fs = create_project_structure(os.path.basename(args.root_dir), MemoryFS(os.path.basename(args.root_dir)))
+    if args.archive == '-':
+        fs.write_archive(sys.stdout.buffer, archive_format)
+    else:
+        with open(args.archive, 'wb') as f:
+            fs.write_archive(f, archive_format)
+
+if __name__ == '__main__':
+    main()
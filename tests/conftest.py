@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# g.py lives at the root, the generator modules import each other from .github/scripts
+sys.path[:0] = [ROOT, os.path.join(ROOT, '.github', 'scripts')]
@@ -0,0 +1,60 @@
+import json
+import os
+import tarfile
+
+import pytest
+
+from buildcache import content_hash
+from deploy import (TARGET_MANIFEST, _add_bytes, apply_bundle, build_manifest, diff_manifests, manifest_id,
+                    write_bundle)
+
+
+def write_files(directory, files):
+    for path, text in files.items():
+        filepath = directory / path
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(text, encoding='utf-8')
+
+
+def hand_made_bundle(bundle_path, path, data=b'pwned'):
+    """A bundle for an empty target that writes `data` to `path`, as a tampered bundle could."""
+    delta = {'base': manifest_id({}), 'target': 'x', 'changed': {path: content_hash(data)}, 'deleted': [],
+             'manifest': {}}
+    with tarfile.open(bundle_path, 'w:gz') as tar:
+        _add_bytes(tar, 'delta.json', json.dumps(delta).encode('utf-8'))
+        _add_bytes(tar, f"files/{path}", data)
+    return bundle_path
+
+
+@pytest.mark.parametrize('path', ['../x', 'sub/../../x', '/tmp/x', TARGET_MANIFEST, f"sub/../{TARGET_MANIFEST}"])
+def test_apply_rejects_paths_outside_the_site(tmp_path, path):
+    target = tmp_path / 'target'
+    target.mkdir()
+    with pytest.raises(ValueError):
+        apply_bundle(hand_made_bundle(tmp_path / 'bad.tar.gz', path), str(target))
+    assert os.listdir(target) == []
+    assert not (tmp_path / 'x').exists()
+
+
+def test_bundle_carries_only_changed_files(tmp_path):
+    site, target, cache = tmp_path / 'site', tmp_path / 'target', str(tmp_path / 'cache')
+    write_files(site, {'index.html': 'hem', 'about.html': 'om', 'old.html': 'gammal', 'assets/style.css': 'body {}'})
+    first = build_manifest(str(site), cache_dir=cache)
+    write_bundle(tmp_path / 'full.tar.gz', str(site), {}, first)
+    assert apply_bundle(tmp_path / 'full.tar.gz', str(target)) == (4, 0)
+
+    write_files(site, {'index.html': 'ny hem', 'new.html': 'ny'})
+    (site / 'old.html').unlink()
+    second = build_manifest(str(site), cache_dir=cache)
+    assert diff_manifests(first, second) == (['index.html', 'new.html'], ['old.html'])
+
+    assert write_bundle(tmp_path / 'delta.tar.gz', str(site), first, second) == (['index.html', 'new.html'],
+                                                                                 ['old.html'])
+    with tarfile.open(tmp_path / 'delta.tar.gz', 'r:gz') as tar:
+        assert sorted(tar.getnames()) == ['delta.json', 'files/index.html', 'files/new.html']
+    assert apply_bundle(tmp_path / 'delta.tar.gz', str(target)) == (2, 1)
+    assert (target / 'index.html').read_text(encoding='utf-8') == 'ny hem'
+    assert not (target / 'old.html').exists()
+    assert apply_bundle(tmp_path / 'delta.tar.gz', str(target)) == (0, 0)  # Already applied
+    with pytest.raises(ValueError):
+        apply_bundle(tmp_path / 'full.tar.gz', str(target))  # Built against another state
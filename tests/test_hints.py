@@ -0,0 +1,36 @@
+from hints import _parse, format_hints, insert_hints, strip_hints, stylesheet_origins
+
+PAGE = """<html>
+<head>
+    <meta charset="UTF-8">
+    <title>T</title>
+    <link rel="stylesheet" href="/style.css">
+    <link href="https://fonts.googleapis.com/css2?family=Lato" rel="stylesheet">
+</head>
+<body><a href="/a.html">a</a></body>
+</html>"""
+
+
+def test_hints_go_before_the_stylesheets_and_strip_cleanly():
+    hints = format_hints(['/style.css'], [], ['/a.html'])
+    page_html = insert_hints(PAGE, hints)
+    assert page_html.index('<!-- hints -->') > page_html.index('<meta charset')
+    assert page_html.index('<!-- /hints -->') < page_html.index('<title>')
+    assert strip_hints(page_html) == PAGE
+
+
+def test_hints_go_after_head_without_charset():
+    page_html = insert_hints('<html><head><title>T</title></head></html>', '<!-- hints --><!-- /hints -->')
+    assert page_html.startswith('<html><head>\n    <!-- hints -->')
+
+
+def test_remote_stylesheets_get_preconnect():
+    local, origins = stylesheet_origins(_parse(PAGE)['stylesheets'])
+    assert local == ['/style.css']
+    assert origins == [('https://fonts.googleapis.com', False), ('https://fonts.gstatic.com', True)]
+
+
+def test_already_linked_resources():
+    page_html = PAGE.replace('<head>', '<head>\n<link rel="stylesheet" href="/early.css">').replace(
+        '</head>', '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n</head>')
+    assert _parse(page_html)['linked'] == ['/early.css', 'https://fonts.gstatic.com']
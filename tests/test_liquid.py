@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from liquid import compile_layout, render_layout, render_string
+
+SITE = {'url': 'https://example.se', 'baseurl': '/base', 'time': datetime(2025, 5, 21, tzinfo=timezone.utc)}
+
+
+def render(source, **context):
+    return render_string(source, dict({'site': SITE}, **context))
+
+
+def test_output_tags_and_paths():
+    assert render('{{ page.title }} - {{ site.url }}', page={'title': 'Hem'}) == 'Hem - https://example.se'
+    assert render('[{{ page.missing }}]', page={}) == '[]'
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('{{ page.title | upcase }}', 'HEJ & HÅ'),
+    ('{{ page.title | downcase }}', 'hej & hå'),
+    ('{{ page.title | escape }}', 'Hej &amp; hå'),
+    ('{{ page.missing | default: "Ingen" }}', 'Ingen'),
+    ('{{ page.tags | size }}', '3'),
+    ('{{ "/a.html" | relative_url }}', '/base/a.html'),
+    ('{{ "/a.html" | absolute_url }}', 'https://example.se/base/a.html'),
+    ('{{ page.date | date: "%Y" }}', '2025'),
+    ('{{ "now" | date: "%d/%m" }}', '21/05'),
+    ('{{ page.tags | array_to_sentence_string }}', 'a, b, and c'),
+    ('{{ page.tags | array_to_sentence_string: " och " }}', 'a, b och c'),
+])
+def test_filters(source, expected):
+    assert render(source, page={'title': 'Hej & hå', 'tags': ['a', 'b', 'c'], 'date': '2025-05-21'}) == expected
+
+
+def test_for_if_unless_else():
+    source = ('{% for item in items %}{{ forloop.index }}:{{ item.name }}'
+              '{% if item.on %}+{% else %}-{% endif %}{% unless forloop.last %},{% endunless %}{% endfor %}')
+    items = [{'name': 'a', 'on': True}, {'name': 'b', 'on': False}]
+    assert render(source, items=items) == '1:a+,2:b-'
+    assert render('{% for item in items %}x{% endfor %}', items=None) == ''
+    assert render('{% if list %}yes{% else %}no{% endif %}', list=[]) == 'no'
+
+
+def test_whitespace_control():
+    assert render('a  {%- if x -%}  b  {%- endif -%}  c', x=True) == 'abc'
+    assert render('<{{- " x " -}}>') == '< x >'
+
+
+def test_include_and_layout_chain(tmp_path):
+    layouts, includes = tmp_path / '_layouts', tmp_path / '_includes'
+    layouts.mkdir()
+    includes.mkdir()
+    (includes / 'nav.html').write_text('<nav>{{ site.url }}</nav>', encoding='utf-8')
+    (layouts / 'base.html').write_text('<html>{% include nav.html %}{{ content }}</html>', encoding='utf-8')
+    (layouts / 'page.html').write_text('---\nlayout: base\n---\n<main>{{ content }}</main>', encoding='utf-8')
+    html = render_layout('page', '<p>Hej</p>', {'site': SITE}, str(layouts), str(includes))
+    assert html == '<html><nav>https://example.se</nav>\n<main><p>Hej</p></main></html>'
+    assert compile_layout('page', str(layouts), str(includes)) is compile_layout('page', str(layouts), str(includes))
+
+
+@pytest.mark.parametrize('source', [
+    '{{ x | reverse }}',                   # unknown filter
+    '{% assign x = 1 %}',                  # unsupported tag
+    '{% if x %}open',                      # unclosed block
+    '{% endif %}',                         # close without open
+    '{% for x in y %}{% endif %}',         # mismatched close
+    '{% for x %}{% endfor %}',             # malformed for
+    '{% if x %}{% else %}{% else %}{% endif %}',  # second else
+    '{% if page.url == "/" %}a{% endif %}',       # comparison
+    '{% if x != 1 %}a{% endif %}',
+    '{% if x and y %}a{% endif %}',              # boolean operators
+    '{% unless x or y %}a{% endunless %}',
+])
+def test_unsupported_liquid_fails_loudly(source):
+    with pytest.raises(ValueError):
+        render(source, x=1, y=[])
+
+
+def test_layout_cycle_fails(tmp_path):
+    (tmp_path / 'a.html').write_text('---\nlayout: b\n---\n{{ content }}', encoding='utf-8')
+    (tmp_path / 'b.html').write_text('---\nlayout: a\n---\n{{ content }}', encoding='utf-8')
+    (tmp_path / 'self.html').write_text('---\nlayout: self\n---\n{{ content }}', encoding='utf-8')
+    for name in ('a', 'self'):
+        with pytest.raises(ValueError):
+            compile_layout(name, str(tmp_path), str(tmp_path))
+
+
+def test_missing_include_fails(tmp_path):
+    with pytest.raises(OSError):
+        render_string('{% include missing.html %}', {}, str(tmp_path))
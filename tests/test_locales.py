@@ -0,0 +1,11 @@
+from locales import nav_current
+
+SV_NAV = [{'text': 'Hem', 'url': 'index.html'}, {'text': 'Café', 'url': 'cafe.html'}]
+EN_NAV = [{'text': 'Home', 'url': '/index.html'}, {'text': 'Café', 'url': '/cafe'}]
+
+
+def test_nav_current():
+    assert nav_current('cafe.html', 'sv', SV_NAV, 'sv') == 'cafe.html'
+    assert nav_current('en/cafe.html', 'en', EN_NAV, 'sv') == '/cafe'
+    assert nav_current('en/index.html', 'en', EN_NAV, 'sv') == '/index.html'
+    assert nav_current('en/honung.html', 'en', EN_NAV, 'sv') == 'en/honung.html'
@@ -0,0 +1,48 @@
+import g
+
+TENANT = {"site_name": "Björkgården"}
+DEFAULT_SITE_STRINGS = ("Ådala", "ådala", "adala", "dala-poa", "Tranås")
+
+
+def scaffold(manifest):
+    return g.create_project_structure("site", g.MemoryFS("site"), manifest).files
+
+
+def test_tenant_scaffold_has_no_default_site_strings():
+    for path, data in scaffold(TENANT).items():
+        text = data.decode('utf-8', errors='ignore')
+        for needle in DEFAULT_SITE_STRINGS:
+            assert needle not in text, f"{path} contains {needle!r}"
+
+
+def test_tenant_scaffold_uses_manifest_fields():
+    files = scaffold(dict(TENANT, place="Björkby", site_url="https://xn--bjrkgrden-57a8c.se"))
+    assert "<h1>Välkommen till Björkgården AB</h1>" in files["index.html"].decode()
+    assert "Hitta till Björkby" in files["contact.html"].decode()
+    config = files["_config.yml"].decode()
+    assert 'title: "Björkgården"' in config
+    assert 'url: "https://xn--bjrkgrden-57a8c.se"' in config
+
+
+def test_default_scaffold_keeps_the_default_site():
+    files = scaffold(None)
+    assert "Ådalavägen 123" in files["contact.html"].decode()
+    assert 'url: "https://xn--dala-poa.se"' in files["_config.yml"].decode()
+
+
+def test_tenant_product_lines_replace_the_default_highlights():
+    product = {"title": "Jordgubbar", "image": "/assets/img/jordgubbar.jpg", "alt": "Jordgubbar",
+               "text": "Söta jordgubbar.", "url": "/jordgubbar.html"}
+    index = scaffold(dict(TENANT, product_lines=[product]))["index.html"].decode()
+    assert '<a href="/jordgubbar.html" class="cta-button-small">Läs mer</a>' in index
+    assert "/biodling.html" not in index and "/gronsaksodling.html" not in index
+
+
+def test_contact_page_phone_comes_from_the_manifest():
+    assert 'href="tel:+46123456789">0123-45 67 89</a>' in scaffold(None)["contact.html"].decode()
+    assert 'href="tel:+4636112233">036-11 22 33</a>' in scaffold(dict(TENANT, phone="036-11 22 33"))["contact.html"].decode()
+    assert "Telefon" not in scaffold(TENANT)["contact.html"].decode()
+
+
+def test_offline_page_starts_with_h1():
+    assert "<h1>Ingen anslutning</h1>" in scaffold(None)["offline.html"].decode()
@@ -0,0 +1,51 @@
+import os
+import threading
+
+import pytest
+
+import serve
+from serve import HeaderRules, etag_matches
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ('"x",W/"abc" ', True),
+    ('*', True),
+    ('"abcd"', False),
+    ('"ab"', False),
+    ('"abc-gzip"', False),
+    ('', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_header_rules_are_never_empty_during_a_reload(tmp_path, monkeypatch):
+    headers = tmp_path / '_headers'
+    headers.write_text('/index.html\n  Cache-Control: no-cache\n', encoding='utf-8')
+    rules = HeaderRules(str(tmp_path))
+    assert rules.get('/index.html') == {'Cache-Control': 'no-cache'}
+
+    parsing, release = threading.Event(), threading.Event()
+    parse_headers = serve.parse_headers
+
+    def slow_parse(text):
+        parsing.set()
+        release.wait(5)
+        return parse_headers(text)
+    monkeypatch.setattr(serve, 'parse_headers', slow_parse)
+    headers.write_text('/index.html\n  Cache-Control: max-age=60\n', encoding='utf-8')
+    os.utime(headers, ns=(1, 1))
+    reloading = threading.Thread(target=rules.get, args=('/index.html',))
+    reloading.start()
+    parsing.wait(5)
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(rules.get('/index.html')))
+    reader.start()
+    assert rules.rules == {'/index.html': {'Cache-Control': 'no-cache'}}  # Old rules stay until the new ones are parsed
+    release.set()
+    reloading.join()
+    reader.join()
+    assert seen == [{'Cache-Control': 'max-age=60'}]
@@ -0,0 +1,17 @@
+import markdown
+
+from shortcodes import Shortcodes
+
+
+def render(shortcodes, source):
+    md_content, expansions = shortcodes.stash(source)
+    return shortcodes.unstash(markdown.markdown(md_content), expansions)
+
+
+def test_expands_and_keeps_literal_placeholders(tmp_path):
+    (tmp_path / 'kort.html').write_text('<div>{{ params.title | escape }}</div>\n', encoding='utf-8')
+    shortcodes = Shortcodes({}, {}, str(tmp_path))
+    page_html = render(shortcodes, 'Text <!--shortcode:5-->\n\n{{< kort title="A & B" >}}\n')
+    assert '<div>A &amp; B</div>' in page_html
+    assert '<p><div>' not in page_html
+    assert '<!--shortcode:5-->' in page_html
@@ -0,0 +1,84 @@
+import pytest
+
+from siteconfig import load_config, parse_scalar, parse_yaml, split_front_matter
+
+
+def test_scalars():
+    assert parse_scalar('"quoted: # text"') == 'quoted: # text'
+    assert parse_scalar("'single'") == 'single'
+    assert parse_scalar('plain text') == 'plain text'
+    assert parse_scalar('42') == 42
+    assert parse_scalar('-1.5') == -1.5
+    assert parse_scalar('true') is True
+    assert parse_scalar('false') is False
+    assert parse_scalar('~') is None
+    assert parse_scalar('[a, "b", 3]') == ['a', 'b', 3]
+
+
+def test_nested_mappings_and_lists():
+    config = parse_yaml("""
+title: Site # a comment
+empty:
+nested:
+  inner:
+    value: 1
+scalars:
+  - one
+  - "two"
+mappings:
+  - match: index.html
+    html: 20000
+  - match: "*.html"
+    total: 250000
+unindented:
+- a
+- b
+""")
+    assert config == {
+        'title': 'Site',
+        'empty': None,
+        'nested': {'inner': {'value': 1}},
+        'scalars': ['one', 'two'],
+        'mappings': [{'match': 'index.html', 'html': 20000}, {'match': '*.html', 'total': 250000}],
+        'unindented': ['a', 'b'],
+    }
+
+
+def test_comments_need_a_space_and_respect_quotes():
+    assert parse_yaml('url: "https://example.com/#top" # kommentar\ncolor: a#b\n') == {
+        'url': 'https://example.com/#top', 'color': 'a#b'}
+
+
+def test_empty_document():
+    assert parse_yaml('') == {}
+    assert parse_yaml('---\n# only a comment\n') == {}
+
+
+@pytest.mark.parametrize('text', [
+    'text: |\n  line\n',               # block scalar
+    'text: >\n  folded\n',             # folded block scalar
+    'base: &base\n  a: 1\n',           # anchor
+    'copy: *base\n',                   # alias
+    'tagged: !!str 1\n',               # tag
+    'flow: {a: 1}\n',                  # flow mapping
+    'a: 1\n  b: 2\n',                  # nested block after a scalar
+    'a:\n    b: 1\n  c: 2\n',          # dedent to an unknown level
+    '- a: 1\n    b: 2\n',              # misaligned key in a list item
+    'a:\n\t- b\n',                     # tab indentation
+    'just a line\n',                   # neither a key nor a list item
+])
+def test_unsupported_yaml_fails_loudly(text):
+    with pytest.raises(ValueError):
+        parse_yaml(text)
+
+
+def test_front_matter():
+    assert split_front_matter('---\ntitle: "Hej: du"\nlayout: default\n---\nBody') == (
+        {'title': 'Hej: du', 'layout': 'default'}, '\nBody')
+    assert split_front_matter('No front matter') == ({}, 'No front matter')
+
+
+def test_load_config(tmp_path):
+    assert load_config(str(tmp_path / '_config.yml')) == {}
+    (tmp_path / '_config.yml').write_text('title: Ådala\n', encoding='utf-8')
+    assert load_config(str(tmp_path / '_config.yml')) == {'title': 'Ådala'}